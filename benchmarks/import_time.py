@@ -0,0 +1,129 @@
+# coding: utf-8
+
+# (C) Copyright IBM Corp. 2024.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Benchmark of the cold start cost of the package.
+
+Each sample runs in a new interpreter, as a CLI invocation or a serverless
+function would, and times:
+
+* import_package: `import iaesdk`,
+* import_v2: `from iaesdk import IbmAnalyticsEngineApiV2`,
+* import_v3: `from iaesdk import IbmAnalyticsEngineApiV3`,
+* import_v3_async: `from iaesdk import AsyncIbmAnalyticsEngineApiV3`,
+* first_request_v3: importing the v3 client, creating it and preparing a
+  request, without sending it.
+
+The results are written as JSON like those of suite.py, with the p50 and p99
+milliseconds of each measurement. Run `python -X importtime -c "import iaesdk"`
+to see where the time goes.
+
+Usage, with the package installed (pip install -e .) or the root of the
+repository on PYTHONPATH, as `make benchmark` does:
+
+    python benchmarks/import_time.py [--samples N] [--output results.json]
+"""
+
+from typing import Dict, List
+import argparse
+import datetime
+import json
+import platform
+import subprocess
+import sys
+
+from iaesdk.version import __version__
+from suite import percentile
+
+_TIMED = '''
+import time
+start = time.perf_counter()
+{0}
+print(time.perf_counter() - start)
+'''
+
+STATEMENTS = {
+    'import_package': 'import iaesdk',
+    'import_v2': 'from iaesdk import IbmAnalyticsEngineApiV2',
+    'import_v3': 'from iaesdk import IbmAnalyticsEngineApiV3',
+    'import_v3_async': 'from iaesdk import AsyncIbmAnalyticsEngineApiV3',
+    'first_request_v3': (
+        'from ibm_cloud_sdk_core.authenticators.no_auth_authenticator import NoAuthAuthenticator\n'
+        'from iaesdk import IbmAnalyticsEngineApiV3\n'
+        'service = IbmAnalyticsEngineApiV3(authenticator=NoAuthAuthenticator())\n'
+        'service.set_service_url("https://api.us-south.ae.cloud.ibm.com")\n'
+        'service.prepare_request("GET", "/v3/analytics_engines/instance", headers={"User-Agent": "x"})'
+    ),
+}
+
+
+def sample(statement: str) -> float:
+    """Return the seconds `statement` takes in a new interpreter."""
+    output = subprocess.run(
+        [sys.executable, '-c', _TIMED.format(statement)], check=True, capture_output=True, text=True
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def measure(statement: str, samples: int) -> Dict[str, float]:
+    """Return the JSON result of `samples` runs of `statement`."""
+    seconds: List[float] = [sample(statement) for _ in range(samples)]
+    return {
+        'samples': samples,
+        'p50_ms': round(percentile(seconds, 50) * 1000, 3),
+        'p99_ms': round(percentile(seconds, 99) * 1000, 3),
+        'min_ms': round(min(seconds) * 1000, 3),
+    }
+
+
+def main():
+    """Measure each statement in new interpreters and write the JSON results."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--samples', type=int, default=20, help='interpreters started per measurement')
+    parser.add_argument('--only', action='append', help='run only this measurement; may be repeated')
+    parser.add_argument('--output', help='write the JSON results to this file instead of stdout')
+    args = parser.parse_args()
+
+    unknown = set(args.only or ()) - set(STATEMENTS)
+    if unknown:
+        parser.error('unknown measurements: ' + ', '.join(sorted(unknown)))
+
+    results = {}
+    for name, statement in STATEMENTS.items():
+        if args.only and name not in args.only:
+            continue
+        results[name] = measure(statement, args.samples)
+        print('{0:<18} p50 {1[p50_ms]:>9.3f} ms  p99 {1[p99_ms]:>9.3f} ms'.format(name, results[name]), file=sys.stderr)
+
+    report = {
+        'sdk_version': __version__,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'parameters': {'samples': args.samples},
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output:
+            json.dump(report, output, indent=2)
+            output.write('\n')
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,217 @@
+# coding: utf-8
+
+# (C) Copyright IBM Corp. 2024.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Benchmark suite of the clients against a local stand-in for the service.
+
+Runs offline: the requests go to a FakeAnalyticsEngineServer (see
+iaesdk/fake_server.py) on the loopback interface, answering after a
+configurable latency. Measures:
+
+* poll_application_state: sequential get_application_state() calls (v3),
+* poll_instance_state: sequential get_analytics_engine_state_by_id() calls (v2),
+* list_all_applications: ApplicationsPager.get_all() over all the listed
+  applications; the latencies are those of each page,
+* create_application_burst: concurrent create_application() calls,
+* collection_from_dict: ApplicationCollection.from_dict() on large pages
+  listed by the server, without the network.
+
+The results are written as JSON, one object per benchmark with the number of
+operations, the elapsed seconds, operations per second and the p50 and p99
+latencies in milliseconds, so that runs of different releases can be compared.
+
+Usage, with the package installed (pip install -e .) or the root of the
+repository on PYTHONPATH, as `make benchmark` does:
+
+    python benchmarks/suite.py [--latency SECONDS] [--output results.json]
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+import argparse
+import datetime
+import json
+import platform
+import sys
+import time
+
+from ibm_cloud_sdk_core.authenticators.no_auth_authenticator import NoAuthAuthenticator
+
+from iaesdk.fake_server import FakeAnalyticsEngineServer
+from iaesdk.ibm_analytics_engine_api_v2 import IbmAnalyticsEngineApiV2
+from iaesdk.ibm_analytics_engine_api_v3 import ApplicationCollection, ApplicationsPager, IbmAnalyticsEngineApiV3
+from iaesdk.version import __version__
+
+INSTANCE_ID = 'e64c907a-e82f-46fd-addc-ccfafbd28b09'
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Return the `q` percentile of `values` (nearest rank)."""
+    ordered = sorted(values)
+    return ordered[min(int(q / 100 * len(ordered)), len(ordered) - 1)]
+
+
+def summarize(operations: int, elapsed: float, latencies: List[float]) -> Dict[str, float]:
+    """Return the JSON result of a benchmark."""
+    return {
+        'operations': operations,
+        'seconds': round(elapsed, 6),
+        'ops_per_sec': round(operations / elapsed, 2),
+        'p50_ms': round(percentile(latencies, 50) * 1000, 4),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 4),
+    }
+
+
+def timed_calls(function: Callable[[], object], count: int) -> Dict[str, float]:
+    """Call `function` `count` times in a row, and summarize the calls."""
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(count):
+        call_start = time.perf_counter()
+        function()
+        latencies.append(time.perf_counter() - call_start)
+    return summarize(count, time.perf_counter() - start, latencies)
+
+
+def poll_application_state(
+    server: FakeAnalyticsEngineServer, service: IbmAnalyticsEngineApiV3, args
+) -> Dict[str, float]:
+    """Poll the state of one application with the v3 client, one call at a time."""
+    _, page = server.handle('GET', '/v3/analytics_engines/{0}/spark_applications?limit=1'.format(INSTANCE_ID))
+    application_id = page['applications'][0]['id']
+    return timed_calls(lambda: service.get_application_state(INSTANCE_ID, application_id), args.polls)
+
+
+def poll_instance_state(service: IbmAnalyticsEngineApiV2, args) -> Dict[str, float]:
+    """Poll the state of the instance with the v2 client, one call at a time."""
+    return timed_calls(lambda: service.get_analytics_engine_state_by_id(INSTANCE_ID), args.polls)
+
+
+def list_all_applications(service: IbmAnalyticsEngineApiV3, args) -> Dict[str, float]:
+    """List every application of the instance with ApplicationsPager, timing each page."""
+    pager = ApplicationsPager(client=service, instance_id=INSTANCE_ID, limit=args.page_size)
+    latencies = []
+    applications = 0
+    start = time.perf_counter()
+    while pager.has_next():
+        page_start = time.perf_counter()
+        applications += len(pager.get_next())
+        latencies.append(time.perf_counter() - page_start)
+    result = summarize(applications, time.perf_counter() - start, latencies)
+    result['pages'] = len(latencies)
+    return result
+
+
+def create_application_burst(service: IbmAnalyticsEngineApiV3, args) -> Dict[str, float]:
+    """Submit a burst of applications from `args.concurrency` threads."""
+    details = {'application': '/opt/ibm/spark/examples/src/main/python/wordcount.py', 'arguments': ['/opt/words']}
+
+    def submit(_):
+        call_start = time.perf_counter()
+        service.create_application(INSTANCE_ID, application_details=details)
+        return time.perf_counter() - call_start
+
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        start = time.perf_counter()
+        latencies = list(executor.map(submit, range(args.burst)))
+        elapsed = time.perf_counter() - start
+    result = summarize(args.burst, elapsed, latencies)
+    result['concurrency'] = args.concurrency
+    return result
+
+
+def collection_from_dict(server: FakeAnalyticsEngineServer, args) -> Dict[str, float]:
+    """Convert a page of applications with ApplicationCollection.from_dict(), without requests."""
+    _, page = server.handle(
+        'GET', '/v3/analytics_engines/{0}/spark_applications?limit={1}'.format(INSTANCE_ID, args.page_size)
+    )
+    result = timed_calls(lambda: ApplicationCollection.from_dict(page), args.pages)
+    result['applications_per_sec'] = round(result['ops_per_sec'] * args.page_size, 2)
+    return result
+
+
+def main():
+    """Run the benchmarks against a fake server and write their JSON results."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds the server waits before each response')
+    parser.add_argument('--payload-size', type=int, default=0, help='approximate bytes per listed application')
+    parser.add_argument('--polls', type=int, default=2000, help='state polls per polling benchmark')
+    parser.add_argument(
+        '--applications', type=int, default=100000, help='applications listed by the server; at least one'
+    )
+    parser.add_argument('--page-size', type=int, default=200, help='applications per page')
+    parser.add_argument('--burst', type=int, default=1000, help='applications created by the burst')
+    parser.add_argument('--concurrency', type=int, default=16, help='threads creating applications')
+    parser.add_argument('--pages', type=int, default=200, help='pages converted by collection_from_dict')
+    parser.add_argument('--only', action='append', help='run only this benchmark; may be repeated')
+    parser.add_argument('--output', help='write the JSON results to this file instead of stdout')
+    args = parser.parse_args()
+
+    benchmarks = {
+        'poll_application_state': lambda server, v2, v3: poll_application_state(server, v3, args),
+        'poll_instance_state': lambda server, v2, v3: poll_instance_state(v2, args),
+        'list_all_applications': lambda server, v2, v3: list_all_applications(v3, args),
+        'create_application_burst': lambda server, v2, v3: create_application_burst(v3, args),
+        'collection_from_dict': lambda server, v2, v3: collection_from_dict(server, args),
+    }
+    unknown = set(args.only or ()) - set(benchmarks)
+    if unknown:
+        parser.error('unknown benchmarks: ' + ', '.join(sorted(unknown)))
+
+    results = {}
+    with FakeAnalyticsEngineServer(latency=args.latency) as server:
+        # Limits that the burst of applications cannot reach.
+        server.add_instance(INSTANCE_ID, max_cores=1e9, max_memory='1000P')
+        server.add_cluster(INSTANCE_ID)
+        details = {'name': 'benchmark-application'.ljust(args.payload_size, '-')}
+        server.add_applications(INSTANCE_ID, max(args.applications, 1), details=details)
+        v2 = IbmAnalyticsEngineApiV2(authenticator=NoAuthAuthenticator())
+        v2.set_service_url(server.url)
+        v3 = IbmAnalyticsEngineApiV3(authenticator=NoAuthAuthenticator())
+        v3.set_service_url(server.url)
+        if hasattr(v3, 'configure_connection_pool'):
+            # Releases before the pooled transport share the session's default pool.
+            v3.configure_connection_pool(pool_maxsize=args.concurrency)
+        for name, benchmark in benchmarks.items():
+            if args.only and name not in args.only:
+                continue
+            results[name] = benchmark(server, v2, v3)
+            print(
+                '{0:<26} {1[ops_per_sec]:>12.2f} ops/s  p50 {1[p50_ms]:.3f} ms  p99 {1[p99_ms]:.3f} ms'.format(
+                    name, results[name]
+                ),
+                file=sys.stderr,
+            )
+
+    report = {
+        'sdk_version': __version__,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'parameters': {key: value for key, value in vars(args).items() if key not in ('only', 'output')},
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output:
+            json.dump(report, output, indent=2)
+            output.write('\n')
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -15,9 +15,44 @@
 
 """Python client library for the IBM Cloud MySDK Services"""
 
-from ibm_cloud_sdk_core import IAMTokenManager, DetailedResponse, BaseService, ApiException
+from typing import TYPE_CHECKING
+import importlib
 
-from .common import get_sdk_headers
 from .version import __version__
-from .ibm_analytics_engine_api_v2 import IbmAnalyticsEngineApiV2
-from .ibm_analytics_engine_api_v3 import IbmAnalyticsEngineApiV3
+
+if TYPE_CHECKING:  # pragma: no cover
+    from ibm_cloud_sdk_core import IAMTokenManager, DetailedResponse, BaseService, ApiException
+
+    from .common import get_sdk_headers
+    from .ibm_analytics_engine_api_v2 import IbmAnalyticsEngineApiV2
+    from .ibm_analytics_engine_api_v3 import IbmAnalyticsEngineApiV3
+    from .ibm_analytics_engine_api_v3_async import AsyncIbmAnalyticsEngineApiV3
+
+# The names exported by the package, and the modules defining them. The modules
+# are imported on first access (PEP 562), so that importing the package does not
+# load the service modules, ibm_cloud_sdk_core and aiohttp.
+_LAZY_NAMES = {
+    "IAMTokenManager": "ibm_cloud_sdk_core",
+    "DetailedResponse": "ibm_cloud_sdk_core",
+    "BaseService": "ibm_cloud_sdk_core",
+    "ApiException": "ibm_cloud_sdk_core",
+    "get_sdk_headers": ".common",
+    "IbmAnalyticsEngineApiV2": ".ibm_analytics_engine_api_v2",
+    "IbmAnalyticsEngineApiV3": ".ibm_analytics_engine_api_v3",
+    "AsyncIbmAnalyticsEngineApiV3": ".ibm_analytics_engine_api_v3_async",
+}
+
+__all__ = ["__version__"] + list(_LAZY_NAMES)
+
+
+def __getattr__(name):
+    module_name = _LAZY_NAMES.get(name)
+    if module_name is None:
+        raise AttributeError("module {0!r} has no attribute {1!r}".format(__name__, name))
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_NAMES))
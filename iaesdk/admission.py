@@ -0,0 +1,508 @@
+# coding: utf-8
+
+# (C) Copyright IBM Corp. 2024.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Client-side admission control of Spark application submissions against the
+resource consumption limits of an Analytics Engine instance.
+"""
+
+from collections import deque
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from typing import Dict, Union
+import logging
+import math
+import re
+import threading
+import time
+
+from ibm_cloud_sdk_core import ApiException
+
+from .ibm_analytics_engine_api_v3 import (
+    ApplicationRequestApplicationDetails,
+    ApplicationResponse,
+    IbmAnalyticsEngineApiV3,
+)
+
+logger = logging.getLogger(__name__)
+
+# Spark defaults used for settings that neither the application nor the
+# instance default configuration provide.
+DEFAULT_SPARK_CONF = {
+    'spark.driver.cores': '1',
+    'spark.driver.memory': '1g',
+    'spark.executor.cores': '1',
+    'spark.executor.memory': '1g',
+    'spark.executor.instances': '2',
+}
+
+_MEMORY_PATTERN = re.compile(r'^\s*(\d+(?:\.\d+)?)\s*([kmgtp]?)i?b?\s*$', re.IGNORECASE)
+_MEMORY_UNITS = {'k': 1.0 / 1024, 'm': 1, 'g': 1024, 't': 1024**2, 'p': 1024**3}
+
+
+def parse_memory(value: Union[str, int, float], default_unit: str = 'm') -> int:
+    """
+    Convert a Spark or service memory size such as `4g`, `4096m` or `600G` to MiB.
+
+    :param value: The memory size. Numbers, and strings without a unit, are in
+           `default_unit`.
+    :param str default_unit: (optional) The unit of sizes given without one.
+    :return: The size in MiB, rounded up.
+    :rtype: int
+    """
+    if isinstance(value, (int, float)):
+        amount, unit = float(value), default_unit
+    else:
+        match = _MEMORY_PATTERN.match(str(value))
+        if match is None:
+            raise ValueError('invalid memory size: {0!r}'.format(value))
+        amount, unit = float(match.group(1)), match.group(2) or default_unit
+    return int(math.ceil(amount * _MEMORY_UNITS[unit.lower()]))
+
+
+def parse_cores(value: Union[str, int, float]) -> float:
+    """
+    Convert a core count returned by the service or set in Spark configuration to a number.
+    """
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise ValueError('invalid core count: {0!r}'.format(value)) from None
+
+
+class ResourceFootprint:
+    """
+    An amount of cores and memory.
+
+    :attr float cores: Number of cores.
+    :attr int memory: Memory in MiB.
+    """
+
+    __slots__ = ('cores', 'memory')
+
+    def __init__(self, cores: float = 0, memory: int = 0) -> None:
+        self.cores = cores
+        self.memory = memory
+
+    def fits(self, capacity: 'ResourceFootprint') -> bool:
+        """True when this footprint fits within `capacity`."""
+        return self.cores <= capacity.cores and self.memory <= capacity.memory
+
+    def __add__(self, other: 'ResourceFootprint') -> 'ResourceFootprint':
+        return ResourceFootprint(self.cores + other.cores, self.memory + other.memory)
+
+    def __sub__(self, other: 'ResourceFootprint') -> 'ResourceFootprint':
+        return ResourceFootprint(self.cores - other.cores, self.memory - other.memory)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, ResourceFootprint):
+            return False
+        return self.cores == other.cores and self.memory == other.memory
+
+    def __ne__(self, other: object) -> bool:
+        return not self == other
+
+    def __repr__(self) -> str:
+        return 'ResourceFootprint(cores={0:g}, memory={1}m)'.format(self.cores, self.memory)
+
+
+def estimate_footprint(
+    application_details: Union[ApplicationRequestApplicationDetails, dict], default_conf: Dict[str, str] = None
+) -> ResourceFootprint:
+    """
+    Estimate the cores and memory a Spark application will hold once all its
+    executors are running.
+
+    The estimate covers the driver and the executors. With dynamic allocation
+    enabled, `spark.dynamicAllocation.maxExecutors` is used as the executor count
+    so that the application can scale up without exceeding the instance limits.
+
+    :param application_details: The application details to be submitted.
+    :param Dict[str, str] default_conf: (optional) Spark configuration used for
+           settings missing from the application's `conf`. Settings missing from
+           both fall back to `DEFAULT_SPARK_CONF`.
+    :return: The estimated footprint.
+    :rtype: ResourceFootprint
+    """
+    if isinstance(application_details, ApplicationRequestApplicationDetails):
+        application_details = application_details.to_dict()
+    conf = dict(DEFAULT_SPARK_CONF)
+    conf.update(default_conf or {})
+    conf.update(application_details.get('conf') or {})
+
+    executors = int(conf['spark.executor.instances'])
+    if str(conf.get('spark.dynamicAllocation.enabled', 'false')).lower() == 'true':
+        executors = int(conf.get('spark.dynamicAllocation.maxExecutors', executors))
+
+    cores = parse_cores(conf['spark.driver.cores']) + executors * parse_cores(conf['spark.executor.cores'])
+    memory = parse_memory(conf['spark.driver.memory']) + executors * parse_memory(conf['spark.executor.memory'])
+    return ResourceFootprint(cores, memory)
+
+
+class _Admission:
+    # A queued submission.
+    __slots__ = ('application_details', 'kwargs', 'footprint', 'future')
+
+    def __init__(self, application_details, kwargs: dict, footprint: ResourceFootprint, future: Future) -> None:
+        self.application_details = application_details
+        self.kwargs = kwargs
+        self.footprint = footprint
+        self.future = future
+
+
+class _Reservation:
+    # The footprint of a submitted application, held against the room left on
+    # the instance until its consumption includes the application.
+    __slots__ = ('footprint', 'admitted', 'application_id', 'left_accepted')
+
+    def __init__(self, footprint: ResourceFootprint) -> None:
+        self.footprint = footprint
+        # When the application was released for submission, and when it was
+        # seen in a state other than accepted; monotonic times.
+        self.admitted = time.monotonic()
+        self.application_id = None
+        self.left_accepted = None
+
+
+class AdmissionScheduler:
+    """
+    Queues Spark application submissions and releases each one only when the
+    instance has room for it.
+
+    The room left on the instance is its resource consumption limits, minus its
+    current resource consumption, minus the footprint of applications this
+    scheduler submitted that the last consumption snapshot does not include yet.
+    The service counts applications in the consumption once they start, so the
+    footprint of an application is reserved until it is seen in a state other
+    than `accepted`, or until the consumption grows by that footprint. The
+    consumption is refreshed every `refresh_interval` seconds while submissions
+    are waiting.
+
+    By default, an application that fits is released even if applications queued
+    before it do not fit yet, which keeps the instance as full as possible; a
+    steady stream of small applications can therefore delay a large one. Set
+    `backfill=False` to release applications strictly in order.
+
+    >>> with AdmissionScheduler(service, instance_id) as scheduler:
+    ...     futures = [scheduler.submit(details) for details in applications]
+    >>> responses = [future.result() for future in futures]
+    """
+
+    DEFAULT_REFRESH_INTERVAL = 10.0
+
+    def __init__(
+        self,
+        client: IbmAnalyticsEngineApiV3,
+        instance_id: str,
+        *,
+        max_workers: int = 4,
+        refresh_interval: float = DEFAULT_REFRESH_INTERVAL,
+        backfill: bool = True,
+        default_conf: Dict[str, str] = None,
+        use_instance_default_configs: bool = True,
+    ) -> None:
+        """
+        Initialize a AdmissionScheduler object.
+
+        :param IbmAnalyticsEngineApiV3 client: The client used to submit applications.
+        :param str instance_id: The identifier of the Analytics Engine instance to
+               which the applications are submitted.
+        :param int max_workers: (optional) Maximum number of submissions in flight.
+        :param float refresh_interval: (optional) Seconds between refreshes of the
+               instance's current resource consumption while submissions wait.
+        :param bool backfill: (optional) Release applications that fit ahead of
+               earlier applications that do not.
+        :param Dict[str, str] default_conf: (optional) Spark configuration assumed
+               for settings missing from an application's `conf`.
+        :param bool use_instance_default_configs: (optional) Also take the
+               instance's default Spark configuration into account, on top of
+               `default_conf`.
+        """
+        if not instance_id:
+            raise ValueError('instance_id must be provided')
+        if max_workers < 1:
+            raise ValueError('max_workers must be at least 1')
+        self._client = client
+        self._instance_id = instance_id
+        self._max_workers = max_workers
+        self._refresh_interval = refresh_interval
+        self._backfill = backfill
+        self._default_conf = dict(default_conf or {})
+        self._use_instance_default_configs = use_instance_default_configs
+
+        self._condition = threading.Condition()
+        self._queue = deque()
+        # The _Reservation of each submitted application not included in
+        # `_consumption` yet, by future, in the order of submission.
+        self._reservations = {}
+        self._submitting = 0
+        self._limits = None
+        self._consumption = None
+        self._refreshed = None
+        self._executor = None
+        self._thread = None
+        self._stopped = False
+
+    def __enter__(self) -> 'AdmissionScheduler':
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close(wait=exc_info[0] is None)
+
+    @property
+    def pending(self) -> int:
+        """Number of submissions waiting for room on the instance."""
+        with self._condition:
+            return len(self._queue)
+
+    @property
+    def reserved(self) -> ResourceFootprint:
+        """Footprint of submitted applications not yet reflected in the instance's consumption."""
+        with self._condition:
+            return sum((reservation.footprint for reservation in self._reservations.values()), ResourceFootprint())
+
+    def submit(self, application_details: Union[ApplicationRequestApplicationDetails, dict], **kwargs) -> Future:
+        """
+        Queue a Spark application for submission.
+
+        :param application_details: The application details to submit.
+        :param dict headers: A `dict` containing the request headers
+        :return: A future resolving to the `ApplicationResponse` of the
+                 submission, or to the error that made it fail. Applications that
+                 need more than the instance limits fail with `ValueError`.
+        :rtype: concurrent.futures.Future
+        """
+        if application_details is None:
+            raise ValueError('application_details must be provided')
+        future = Future()
+        with self._condition:
+            if self._stopped:
+                raise RuntimeError('cannot submit after close()')
+            self._queue.append(_Admission(application_details, kwargs, None, future))
+            self._condition.notify_all()
+        self.start()
+        return future
+
+    def start(self) -> None:
+        """
+        Start releasing submissions on background threads. `submit()` starts the
+        scheduler automatically.
+        """
+        with self._condition:
+            if self._thread is not None or self._stopped:
+                return
+            self._executor = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix='iaesdk-admission')
+            self._thread = threading.Thread(target=self._run, name='iaesdk-admission-scheduler', daemon=True)
+            self._thread.start()
+
+    def close(self, wait: bool = True) -> None:
+        """
+        Stop the scheduler.
+
+        :param bool wait: (optional) Wait until every queued application has been
+               submitted. When False, queued applications are cancelled;
+               submissions already in flight are completed.
+        """
+        with self._condition:
+            self._stopped = True
+            if not wait:
+                while self._queue:
+                    self._queue.popleft().future.cancel()
+            self._condition.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join()
+        with self._condition:
+            executor, self._executor = self._executor, None
+            self._thread = None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def _run(self) -> None:
+        try:
+            self._load_defaults()
+        except Exception as error:  # pylint: disable=broad-except
+            logger.warning(
+                'Could not read the default Spark configuration of instance %s: %s', self._instance_id, error
+            )
+        refreshed = False
+        while True:
+            with self._condition:
+                # A submission in flight may still be rejected and queued again.
+                while not self._queue and not (self._stopped and not self._in_flight()):
+                    self._condition.wait()
+                if not self._queue:
+                    return
+                # Checked and admitted under the same lock: a rejected submission
+                # clears `_refreshed` to have the consumption refreshed first.
+                if self._refreshed is not None and (
+                    refreshed or time.monotonic() - self._refreshed < self._refresh_interval
+                ):
+                    refreshed = False
+                    if not self._admit():
+                        # Nothing fits: wait for the next refresh, or for a change
+                        # such as a failed submission releasing its reservation.
+                        self._condition.wait(max(0.0, self._refreshed + self._refresh_interval - time.monotonic()))
+                    continue
+            try:
+                self._refresh()
+                refreshed = True
+            except Exception as error:  # pylint: disable=broad-except
+                logger.warning('Could not read the resource consumption of instance %s: %s', self._instance_id, error)
+                with self._condition:
+                    self._condition.wait(self._refresh_interval)
+
+    def _in_flight(self) -> bool:
+        return self._submitting > 0
+
+    def _load_defaults(self) -> None:
+        default_conf = dict(self._default_conf)
+        if self._use_instance_default_configs:
+            instance_conf = self._client.get_instance_default_configs(self._instance_id).get_result()
+            default_conf.update(instance_conf or {})
+        with self._condition:
+            self._default_conf = default_conf
+
+    def _refresh(self) -> None:
+        started = time.monotonic()
+        if self._limits is None:
+            limits = self._client.get_resource_consumption_limits(self._instance_id).get_result()
+            self._limits = ResourceFootprint(parse_cores(limits['max_cores']), parse_memory(limits['max_memory']))
+        consumption = self._client.get_current_resource_consumption(self._instance_id).get_result()
+        consumption = ResourceFootprint(parse_cores(consumption['cores']), parse_memory(consumption['memory']))
+        with self._condition:
+            growth = consumption - (self._consumption or consumption)
+            self._consumption = consumption
+            self._refreshed = time.monotonic()
+            # Applications released before the snapshot was requested are in it
+            # if they were seen to start before then. The others are assumed to
+            # be, in order of release, as far as the consumption has grown since
+            # the previous snapshot.
+            started_footprint = ResourceFootprint()
+            accepted = []
+            for future, reservation in list(self._reservations.items()):
+                if reservation.admitted >= started:
+                    continue
+                if reservation.left_accepted is not None and reservation.left_accepted < started:
+                    del self._reservations[future]
+                    continue
+                started_footprint = started_footprint + reservation.footprint
+                if started_footprint.fits(growth):
+                    del self._reservations[future]
+                elif reservation.left_accepted is None and reservation.application_id:
+                    accepted.append(reservation)
+        # Applications that have started since are in the next snapshot.
+        for reservation in accepted:
+            try:
+                state = self._client.get_application_state(self._instance_id, reservation.application_id)
+                state = state.get_result().get('state')
+            except ApiException as error:
+                if error.status_code != 404:
+                    logger.debug('Could not read the state of application %s: %s', reservation.application_id, error)
+                    continue
+                state = None
+            except Exception as error:  # pylint: disable=broad-except
+                logger.debug('Could not read the state of application %s: %s', reservation.application_id, error)
+                continue
+            if state != 'accepted':
+                with self._condition:
+                    reservation.left_accepted = time.monotonic()
+
+    def _admit(self) -> bool:
+        # Release every queued application that fits. Called with the lock held.
+        headroom = self._limits - self._consumption
+        for reservation in self._reservations.values():
+            headroom = headroom - reservation.footprint
+        admitted = False
+        for admission in list(self._queue):
+            if admission.future.cancelled():
+                self._queue.remove(admission)
+                continue
+            if admission.footprint is None:
+                try:
+                    admission.footprint = estimate_footprint(admission.application_details, self._default_conf)
+                except (KeyError, TypeError, ValueError) as error:
+                    self._queue.remove(admission)
+                    admission.future.set_exception(error)
+                    continue
+            if not admission.footprint.fits(self._limits):
+                self._queue.remove(admission)
+                admission.future.set_exception(
+                    ValueError(
+                        'application requires {0!r}, more than the instance limits {1!r}'.format(
+                            admission.footprint, self._limits
+                        )
+                    )
+                )
+                continue
+            if admission.footprint.fits(headroom):
+                self._queue.remove(admission)
+                if not admission.future.set_running_or_notify_cancel():
+                    continue
+                headroom = headroom - admission.footprint
+                self._reservations[admission.future] = _Reservation(admission.footprint)
+                self._submitting += 1
+                self._executor.submit(self._submit, admission)
+                admitted = True
+            elif not self._backfill:
+                break
+        return admitted
+
+    def _submit(self, admission: _Admission) -> None:
+        try:
+            result = self._client.create_application(
+                self._instance_id, application_details=admission.application_details, **admission.kwargs
+            ).get_result()
+        except Exception as error:  # pylint: disable=broad-except
+            with self._condition:
+                self._submitting -= 1
+                self._reservations.pop(admission.future, None)
+                if isinstance(error, ApiException) and error.status_code == 429:
+                    # The instance was fuller than estimated: queue the
+                    # application again and refresh the consumption first.
+                    logger.debug('Submission rejected by the service, retrying: %s', error)
+                    admission.future = _requeued(admission.future)
+                    self._queue.appendleft(admission)
+                    self._refreshed = None
+                    self._condition.notify_all()
+                    return
+                self._condition.notify_all()
+            admission.future.set_exception(error)
+            return
+        with self._condition:
+            self._submitting -= 1
+            reservation = self._reservations.get(admission.future)
+            if reservation is not None:
+                reservation.application_id = result.get('id')
+            self._condition.notify_all()
+        admission.future.set_result(ApplicationResponse.from_dict(result))
+
+
+def _requeued(future: Future) -> Future:
+    # A running future cannot go back to pending; hand the result over from a
+    # fresh future instead.
+    requeued = Future()
+
+    def forward(done: Future) -> None:
+        if done.cancelled():
+            future.set_exception(CancelledError())
+        elif done.exception() is not None:
+            future.set_exception(done.exception())
+        else:
+            future.set_result(done.result())
+
+    requeued.add_done_callback(forward)
+    return requeued
@@ -0,0 +1,195 @@
+# coding: utf-8
+
+# (C) Copyright IBM Corp. 2024.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Client-side caching of responses from read-mostly operations.
+"""
+
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Optional, Tuple
+import copy
+import functools
+import threading
+import time
+
+from ibm_cloud_sdk_core import DetailedResponse
+import requests
+
+
+def copy_detailed_response(response: DetailedResponse) -> DetailedResponse:
+    """
+    Return a copy of a `DetailedResponse` whose result can be modified without
+    affecting the original. Non-JSON results, which are `requests.Response`
+    objects, are shared rather than copied.
+    """
+    result = response.get_result()
+    if not isinstance(result, requests.Response):
+        result = copy.deepcopy(result)
+    return DetailedResponse(
+        response=result,
+        headers=copy.copy(response.get_headers()),
+        status_code=response.get_status_code(),
+    )
+
+
+class ResponseCache:
+    """
+    Thread-safe cache of `DetailedResponse` objects with a time-to-live per
+    operation and least-recently-used eviction beyond `max_entries`.
+
+    Entries are keyed by `(operation_id, instance_id)`. Responses are copied on
+    the way in and out, so callers may modify the results they get.
+    """
+
+    def __init__(self, ttls: Dict[str, float], *, max_entries: int = 256) -> None:
+        """
+        Initialize a ResponseCache object.
+
+        :param Dict[str, float] ttls: Seconds to keep the responses of each
+               operation. Operations without an entry are not cached.
+        :param int max_entries: (optional) Maximum number of cached responses.
+        """
+        if max_entries < 1:
+            raise ValueError('max_entries must be at least 1')
+        self.ttls = dict(ttls)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._epoch = 0
+        self._generations = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def generation(self, instance_id: Hashable) -> Tuple[int, int]:
+        """
+        Return a token to pass to `put()`. Invalidating `instance_id` in between
+        makes `put()` discard the response, which may be stale by then.
+        """
+        with self._lock:
+            return self._epoch, self._generations.get(instance_id, 0)
+
+    def get(self, operation_id: str, instance_id: Hashable) -> Optional[DetailedResponse]:
+        """
+        Return a copy of the cached response, or None if there is no fresh one.
+        """
+        key = (operation_id, instance_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            response = entry[1]
+        return copy_detailed_response(response)
+
+    def put(
+        self, operation_id: str, instance_id: Hashable, response: DetailedResponse, generation: Tuple[int, int]
+    ) -> None:
+        """
+        Cache a response, unless `instance_id` was invalidated since `generation`
+        was obtained.
+        """
+        ttl = self.ttls.get(operation_id)
+        if not ttl or ttl <= 0:
+            return
+        response = copy_detailed_response(response)
+        key = (operation_id, instance_id)
+        with self._lock:
+            if (self._epoch, self._generations.get(instance_id, 0)) != generation:
+                return
+            self._entries[key] = (time.monotonic() + ttl, response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, instance_id: Hashable = None, operation_ids: Tuple[str, ...] = None) -> None:
+        """
+        Remove cached responses.
+
+        :param instance_id: (optional) Only remove responses for this instance.
+        :param Tuple[str, ...] operation_ids: (optional) Only remove responses of
+               these operations.
+        """
+        with self._lock:
+            if instance_id is None:
+                self._epoch += 1
+            else:
+                self._generations[instance_id] = self._generations.get(instance_id, 0) + 1
+            for key in list(self._entries):
+                if (instance_id is None or key[1] == instance_id) and (
+                    operation_ids is None or key[0] in operation_ids
+                ):
+                    del self._entries[key]
+
+
+def _instance_id(args: tuple, kwargs: dict) -> Optional[str]:
+    return args[0] if args else kwargs.get('instance_id')
+
+
+def cached_response(operation_id: str) -> Callable:
+    """
+    Decorate a service method so that its responses are served from the
+    service's response cache, when one is enabled. Calls that pass extra
+    arguments, such as request headers, bypass the cache.
+    """
+
+    def decorator(method: Callable) -> Callable:
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            cache = self._response_cache
+            if cache is None or len(args) + len(kwargs) != 1:
+                return method(self, *args, **kwargs)
+            instance_id = _instance_id(args, kwargs)
+            response = cache.get(operation_id, instance_id)
+            if response is not None:
+                return response
+            generation = cache.generation(instance_id)
+            response = method(self, *args, **kwargs)
+            cache.put(operation_id, instance_id, response, generation)
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+def invalidates_cached_responses(*operation_ids: str) -> Callable:
+    """
+    Decorate a service method that modifies an instance so that cached responses
+    of `operation_ids` for that instance are dropped once it completes, whether
+    or not it succeeds.
+    """
+
+    def decorator(method: Callable) -> Callable:
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                cache = self._response_cache
+                if cache is not None:
+                    cache.invalidate(_instance_id(args, kwargs), operation_ids)
+
+        return wrapper
+
+    return decorator
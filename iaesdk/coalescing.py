@@ -0,0 +1,112 @@
+# coding: utf-8
+
+# (C) Copyright IBM Corp. 2024.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Coalescing of concurrent identical requests into a single network call.
+"""
+
+from typing import Callable, Hashable, Optional
+import threading
+
+from ibm_cloud_sdk_core import DetailedResponse
+
+from .caching import copy_detailed_response
+
+
+class _Call:
+    # A request in flight and the threads waiting for its outcome.
+    __slots__ = ('done', 'response', 'error', 'waiters')
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.response = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Runs at most one call per key at a time. Threads asking for a key whose call
+    is already in flight wait for it and share its outcome instead of making a
+    call of their own.
+    """
+
+    def __init__(self) -> None:
+        self.coalesced = 0
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, send: Callable[[], DetailedResponse]) -> DetailedResponse:
+        """
+        Return the response of `send()`, or of the identical call already in
+        flight for `key`.
+
+        Waiting threads receive a copy of the response, so every caller may
+        modify its result. If the call fails, every waiting thread raises its
+        exception.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                call.waiters += 1
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return copy_detailed_response(call.response)
+
+        response = None
+        try:
+            response = send()
+        except BaseException as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+                waiters = call.waiters
+            if waiters and call.error is None:
+                # Waiters copy from their own snapshot, so the caller may
+                # modify the original right away.
+                call.response = copy_detailed_response(response)
+            call.done.set()
+        return response
+
+
+def request_key(request: dict, kwargs: dict) -> Optional[Hashable]:
+    """
+    Return the key identifying a prepared GET request for `SingleFlight`, or
+    None if the request must not be coalesced.
+    """
+    if request.get('method') != 'GET' or kwargs.get('stream'):
+        return None
+    try:
+        key = (
+            request.get('url'),
+            tuple(sorted((request.get('params') or {}).items())),
+            tuple(sorted((request.get('headers') or {}).items())),
+            tuple(sorted((k, v) for k, v in kwargs.items() if k != 'headers')),
+        )
+        hash(key)
+        return key
+    except TypeError:
+        # Unorderable or unhashable values, such as a custom `verify` object.
+        return None
@@ -0,0 +1,249 @@
+# coding: utf-8
+
+# (C) Copyright IBM Corp. 2024.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Columnar export of Spark applications for analytics with NumPy, pandas or Arrow.
+
+NumPy, pandas and pyarrow are optional dependencies (`pip install
+"iaesdk[columnar]"`), imported by the methods that convert to their types.
+"""
+
+from array import array
+from datetime import datetime, timezone
+from types import ModuleType
+from typing import Any, Dict, Iterable, Sequence, Union
+import importlib
+
+from ibm_cloud_sdk_core.utils import string_to_datetime
+
+# Stored in timestamp columns for missing values. This is the NaT value of
+# NumPy and pandas, so the columns convert to datetime64[ns] without copying.
+NULL_TIMESTAMP = -(2**63)
+
+# Stored in the state column for missing values; pandas reads it as NaN.
+NULL_STATE = -1
+
+STRING_COLUMNS = ('id', 'href', 'spark_application_id', 'spark_application_name', 'spark_ui')
+TIMESTAMP_COLUMNS = ('submission_time', 'start_time', 'end_time', 'finish_time', 'auto_termination_time')
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _require(module_name: str, method_name: str) -> ModuleType:
+    # Imports an optional dependency of the columnar extra.
+    try:
+        return importlib.import_module(module_name)
+    except ImportError as error:
+        raise ImportError(
+            '{0} is required for ApplicationColumns.{1}(); install "iaesdk[columnar]"'.format(
+                module_name.split('.')[0], method_name
+            )
+        ) from error
+
+
+def _get_attribute(application: 'Application', name: str) -> Any:
+    # The attribute of a model, or None if it is not set.
+    return getattr(application, name, None)
+
+
+def datetime_to_epoch_ns(value: Union[datetime, str, None]) -> int:
+    """
+    Convert a datetime, or an ISO 8601 string, into nanoseconds since the Unix
+    epoch. Naive datetimes are taken to be UTC.
+
+    :param value: The datetime or string.
+    :return: The timestamp, or NULL_TIMESTAMP if `value` is None.
+    :rtype: int
+    """
+    if value is None:
+        return NULL_TIMESTAMP
+    if isinstance(value, str):
+        try:
+            # Much faster than string_to_datetime() for the timestamps the
+            # service returns, such as 2023-01-01T12:00:00.000Z.
+            value = datetime.fromisoformat(value[:-1] + '+00:00' if value.endswith('Z') else value)
+        except ValueError:
+            value = string_to_datetime(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    delta = value - _EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1000000000 + delta.microseconds * 1000
+
+
+class ApplicationColumns:
+    """
+    Spark applications in columnar form, built in a single pass over the
+    applications:
+
+    - `strings`: the IDs, names and URLs as lists of str (or None), keyed by
+      attribute name (see STRING_COLUMNS).
+    - `timestamps`: the times as `array('q')` of nanoseconds since the Unix epoch
+      in UTC, keyed by attribute name (see TIMESTAMP_COLUMNS). Missing times are
+      NULL_TIMESTAMP.
+    - `state_codes`: the states as an `array('h')` of indexes into
+      `state_categories`. Missing states are NULL_STATE.
+
+    The columns convert to NumPy, pandas and Arrow without further per-application
+    work, see `to_numpy()`, `to_pandas()` and `to_arrow()`. The conversions copy
+    the columns, which can be extended afterwards.
+    """
+
+    def __init__(self, state_categories: Sequence[str] = ()) -> None:
+        """
+        Initialize an empty ApplicationColumns object.
+
+        :param Sequence[str] state_categories: (optional) The known states, in the
+               order of their codes. States not listed are added in the order they
+               are seen.
+        """
+        self.strings = {name: [] for name in STRING_COLUMNS}
+        self.timestamps = {name: array('q') for name in TIMESTAMP_COLUMNS}
+        self.state_codes = array('h')
+        self.state_categories = list(state_categories)
+        self._state_index = {state: code for code, state in enumerate(self.state_categories)}
+
+    def __len__(self) -> int:
+        return len(self.state_codes)
+
+    def extend(self, applications: Iterable[Union['Application', Dict]]) -> 'ApplicationColumns':
+        """
+        Append applications to the columns.
+
+        :param applications: Application or CompactApplication objects, or dicts
+               of their JSON representation, such as those returned by
+               `ApplicationsPager`.
+        :return: This object.
+        :rtype: ApplicationColumns
+        """
+        string_columns = [(name, self.strings[name].append) for name in STRING_COLUMNS]
+        timestamp_columns = [(name, self.timestamps[name].append) for name in TIMESTAMP_COLUMNS]
+        append_state = self.state_codes.append
+        state_index = self._state_index
+        to_epoch_ns = datetime_to_epoch_ns
+
+        for application in applications:
+            # Both take the application and the attribute name.
+            if isinstance(application, dict):
+                get = get_time = dict.get
+            else:
+                get = _get_attribute
+                # Avoids parsing the times of CompactApplication objects.
+                get_time = getattr(type(application), 'get_datetime_string', get)
+
+            for name, append in string_columns:
+                append(get(application, name))
+            for name, append in timestamp_columns:
+                append(to_epoch_ns(get_time(application, name)))
+
+            state = get(application, 'state')
+            if state is None:
+                append_state(NULL_STATE)
+            else:
+                code = state_index.get(state)
+                if code is None:
+                    code = state_index[state] = len(self.state_categories)
+                    self.state_categories.append(state)
+                append_state(code)
+        return self
+
+    def to_numpy(self) -> Dict[str, 'numpy.ndarray']:
+        """
+        Return the columns as NumPy arrays: `datetime64[ns]` arrays (in UTC, with
+        NaT for missing times) for the times, `object` arrays for the strings and
+        an `int16` array of codes for the states. The categories are returned
+        under `state_categories`.
+
+        Requires numpy.
+
+        :rtype: Dict[str, numpy.ndarray]
+        """
+        numpy = _require('numpy', 'to_numpy')
+        columns = {name: numpy.array(values, dtype=object) for name, values in self.strings.items()}
+        # Copied: arrays viewing the buffer of an array('q') would keep it
+        # from growing, and extend() would raise BufferError.
+        for name, values in self.timestamps.items():
+            columns[name] = numpy.frombuffer(values, dtype=numpy.int64).astype('datetime64[ns]')
+        columns['state'] = numpy.frombuffer(self.state_codes, dtype=numpy.int16).copy()
+        columns['state_categories'] = numpy.array(self.state_categories, dtype=object)
+        return columns
+
+    def to_pandas(self) -> 'pandas.DataFrame':
+        """
+        Return the columns as a pandas DataFrame, with UTC datetime columns for the
+        times and a categorical column for the states.
+
+        Requires pandas.
+
+        :rtype: pandas.DataFrame
+        """
+        pandas = _require('pandas', 'to_pandas')
+        columns = self.to_numpy()
+        data = {name: columns[name] for name in STRING_COLUMNS}
+        data['state'] = pandas.Categorical.from_codes(columns['state'], categories=self.state_categories)
+        for name in TIMESTAMP_COLUMNS:
+            data[name] = pandas.DatetimeIndex(columns[name]).tz_localize('UTC')
+        return pandas.DataFrame(data)
+
+    def to_arrow(self) -> 'pyarrow.Table':
+        """
+        Return the columns as an Arrow table, with `timestamp[ns, tz=UTC]` columns
+        for the times, `string` columns for the strings and a dictionary-encoded
+        column for the states.
+
+        Requires pyarrow.
+
+        :rtype: pyarrow.Table
+        """
+        pyarrow = _require('pyarrow', 'to_arrow')
+        compute = _require('pyarrow.compute', 'to_arrow')
+        columns = {name: pyarrow.array(values, type=pyarrow.string()) for name, values in self.strings.items()}
+        columns['state'] = pyarrow.DictionaryArray.from_arrays(
+            _arrow_array(pyarrow, compute, pyarrow.int16(), self.state_codes, NULL_STATE),
+            pyarrow.array(self.state_categories, type=pyarrow.string()),
+        )
+        for name, values in self.timestamps.items():
+            columns[name] = _arrow_array(pyarrow, compute, pyarrow.timestamp('ns', tz='UTC'), values, NULL_TIMESTAMP)
+        return pyarrow.table({name: columns[name] for name in STRING_COLUMNS + ('state',) + TIMESTAMP_COLUMNS})
+
+
+def _arrow_array(
+    pyarrow: ModuleType, compute: ModuleType, arrow_type: 'pyarrow.DataType', values: array, null: int
+) -> 'pyarrow.Array':
+    # Wraps a copy of the buffer of `values`, with a validity bitmap marking the
+    # `null` entries when there are any. Wrapping the buffer itself would keep
+    # `values` from growing.
+    data = pyarrow.py_buffer(values.tobytes())
+    integer_type = pyarrow.int16() if values.typecode == 'h' else pyarrow.int64()
+    raw = pyarrow.Array.from_buffers(integer_type, len(values), [None, data])
+    validity = None
+    if null in values:
+        validity = compute.not_equal(raw, pyarrow.scalar(null, type=raw.type)).buffers()[1]
+    return pyarrow.Array.from_buffers(arrow_type, len(values), [validity, data])
+
+
+def to_columns(
+    applications: Iterable[Union['Application', Dict]], state_categories: Sequence[str] = ()
+) -> ApplicationColumns:
+    """
+    Convert applications to columnar form in a single pass.
+
+    :param applications: Application objects or dicts of their JSON
+           representation.
+    :param Sequence[str] state_categories: (optional) The known states, in the
+           order of their codes.
+    :rtype: ApplicationColumns
+    """
+    return ApplicationColumns(state_categories).extend(applications)
@@ -19,8 +19,18 @@ This module provides common methods for use across all service modules.
 """
 
 import platform
+import re
+import string
+from typing import TYPE_CHECKING, Optional
+
+from ibm_cloud_sdk_core import BaseService
+
 from iaesdk.version import __version__
 
+if TYPE_CHECKING:  # pragma: no cover
+    from .metrics import MetricsRecorder
+    from .transport import PooledTransport
+
 HEADER_NAME_USER_AGENT = "User-Agent"
 SDK_NAME = "ibm-iae-python-sdk"
 
@@ -36,14 +46,26 @@ def get_system_info():
     )  # Python version
 
 
+_user_agent = None
+
+
 def get_user_agent():
     """
     Get the value to be sent in the User-Agent header
     """
-    return USER_AGENT
+    # Computed on first use rather than at import: the platform queries are
+    # paid by the first request, not by every process importing the package.
+    global _user_agent  # pylint: disable=global-statement
+    if _user_agent is None:
+        _user_agent = "{0}-{1} {2}".format(SDK_NAME, __version__, get_system_info())
+    return _user_agent
 
 
-USER_AGENT = "{0}-{1} {2}".format(SDK_NAME, __version__, get_system_info())
+def __getattr__(name):
+    # USER_AGENT is kept as a module attribute, computed on first access.
+    if name == "USER_AGENT":
+        return get_user_agent()
+    raise AttributeError("module {0!r} has no attribute {1!r}".format(__name__, name))
 
 
 def get_sdk_headers(service_name, service_version, operation_id):
@@ -54,3 +76,378 @@ def get_sdk_headers(service_name, service_version, operation_id):
     headers = {}
     headers[HEADER_NAME_USER_AGENT] = get_user_agent()
     return headers
+
+
+class OperationRoute:
+    """
+    An operation of a service: its HTTP method and URL path template, with path
+    parameters in braces. Used to tell which operation a prepared request
+    belongs to.
+    """
+
+    __slots__ = ("operation_id", "method", "path", "path_param_keys")
+
+    def __init__(self, operation_id, method, path):
+        """
+        :param str operation_id: The name of the operation.
+        :param str method: The HTTP method.
+        :param str path: The URL path, with path parameters in braces.
+        """
+        self.operation_id = operation_id
+        self.method = method
+        self.path = path
+        self.path_param_keys = tuple(name for _, name, _, _ in string.Formatter().parse(path) if name)
+
+    def pattern(self):
+        """
+        Return a regular expression matching the end of the URLs of the operation.
+        """
+        pattern = ""
+        for literal, name, _, _ in string.Formatter().parse(self.path):
+            pattern += re.escape(literal) + ("[^/]+" if name else "")
+        return pattern + "$"
+
+
+class OperationRouteMixin:
+    """
+    Mixin for the `BaseService` classes of the services, which lists their
+    operations in `_OPERATION_ROUTES` to match prepared requests to the
+    operation they belong to.
+    """
+
+    _OPERATION_ROUTES = ()
+
+    def get_operation_id(self, request):
+        """
+        Return the operation that a request prepared by this service belongs to,
+        or None if it matches none of the operations of the service.
+
+        :param dict request: The prepared request.
+        :rtype: str
+        """
+        patterns = type(self).__dict__.get("_operation_patterns")
+        if patterns is None:
+            # Compiled on first use, one expression per HTTP method, with a
+            # group named after each operation.
+            alternatives = {}
+            for route in self._OPERATION_ROUTES:
+                alternatives.setdefault(route.method, []).append(
+                    "(?P<{0}>{1})".format(route.operation_id, route.pattern())
+                )
+            patterns = {method: re.compile("|".join(groups)) for method, groups in alternatives.items()}
+            type(self)._operation_patterns = patterns
+        pattern = patterns.get(request.get("method"))
+        match = pattern.search(request.get("url") or "") if pattern is not None else None
+        return match.lastgroup if match is not None else None
+
+
+class RequestPipelineMixin:
+    """
+    Mixin for the `BaseService` classes of the services, which sends requests
+    through the features enabled on the client, in this order: tracing, metrics,
+    latency routing, request coalescing and trace context propagation.
+
+    The features are the attributes below, set by the `enable_*()` and `set_*()`
+    methods of the clients; None disables a feature.
+    """
+
+    _request_tracer = None
+    _request_meter = None
+    _latency_router = None
+    _single_flight = None
+
+    def send(self, request, *, operation_id=None, **kwargs):
+        """
+        Send a request, routing GET requests for an instance to the fastest
+        endpoint when latency routing is enabled, and sharing the response of an
+        identical GET request already in flight when request coalescing is enabled.
+
+        :param dict request: The prepared request.
+        :param str operation_id: (optional) The operation sending the request, for
+               the metrics recorder and the trace. Defaults to the operation of
+               the service whose URL the request matches.
+        :rtype: DetailedResponse
+        """
+        request_tracer = self._request_tracer
+        if operation_id is None and (request_tracer is not None or self._request_meter is not None):
+            operation_id = self.get_operation_id(request)
+        if request_tracer is None:
+            return self._route(request, operation_id, kwargs)
+        return request_tracer.trace(request, operation_id, lambda: self._route(request, operation_id, kwargs))
+
+    def _route(self, request, operation_id, kwargs):
+        request_meter = self._request_meter
+        sample = request_meter.start(request, operation_id) if request_meter is not None else None
+        latency_router = self._latency_router
+        if latency_router is None:
+            return self._send(request, sample, kwargs)
+        # The checks of which endpoints serve the instance are not measured:
+        # they would be recorded as the caller's request.
+        return latency_router.send(
+            request,
+            self.service_url,
+            lambda routed: self._send(routed, sample, kwargs),
+            lambda state_request: self._send(state_request, None, kwargs),
+        )
+
+    def _send(self, request, sample, kwargs):
+        single_flight = self._single_flight
+        if single_flight is None:
+            return self._transmit(request, sample, kwargs)
+        from .coalescing import request_key  # pylint: disable=import-outside-toplevel
+
+        key = request_key(request, kwargs)
+        if key is None:
+            return self._transmit(request, sample, kwargs)
+        return single_flight.do(key, lambda: self._transmit(request, sample, kwargs))
+
+    def _transmit(self, request, sample, kwargs):
+        request_tracer = self._request_tracer
+        if request_tracer is not None:
+            # After the coalescing key is computed: the trace context headers
+            # differ between calls.
+            request, kwargs = request_tracer.prepare(request, kwargs)
+        request_meter = self._request_meter
+        if sample is None or request_meter is None:
+            return BaseService.send(self, request, **kwargs)
+        return request_meter.send(
+            sample, lambda prepared, **options: BaseService.send(self, prepared, **options), request, kwargs
+        )
+
+
+class ClientFeaturesMixin:
+    """
+    Mixin for the `BaseService` classes of the services, with the methods that
+    enable the optional features of the clients shared by the services: request
+    coalescing, metrics, tracing, token pre-refresh, the shared token cache and
+    pooled connections.
+
+    The modules of the features are imported when a feature is enabled.
+    """
+
+    _transport = None
+
+    def prepare_request(self, method: str, url: str, **kwargs) -> dict:
+        request_meter = self._request_meter
+        if request_meter is None:
+            return super().prepare_request(method, url, **kwargs)
+        return request_meter.prepare(super().prepare_request, method, url, **kwargs)
+
+    prepare_request.__doc__ = BaseService.prepare_request.__doc__
+
+    def enable_request_coalescing(self) -> None:
+        """
+        Collapse concurrent identical GET requests into a single network call.
+
+        While a GET request is in flight, threads of this client that send the
+        same request (same URL, query, headers and options) wait for it and
+        receive a copy of its `DetailedResponse`, or the same exception, instead
+        of sending their own. Requests are not shared once they have completed.
+        """
+        from .coalescing import SingleFlight  # pylint: disable=import-outside-toplevel
+
+        self._single_flight = SingleFlight()
+
+    def disable_request_coalescing(self) -> None:
+        """
+        Send every request separately.
+        """
+        self._single_flight = None
+
+    def set_metrics_recorder(self, recorder: Optional["MetricsRecorder"]) -> None:
+        """
+        Measure every request sent by this client, and pass the measurements to
+        `recorder`: the operation, status code, bytes sent and received, retries,
+        and the time spent preparing the request, on the network and decoding
+        the response.
+
+        Requests answered without being sent, by the response cache of the V3
+        client or by an identical request in flight when request coalescing is
+        enabled, are not measured.
+
+        :param MetricsRecorder recorder: Receives the measurements, such as an
+               `InMemoryMetrics`. Several clients can share a recorder. None stops
+               measuring requests.
+        """
+        from .metrics import RequestMeter  # pylint: disable=import-outside-toplevel
+
+        self._request_meter = RequestMeter(recorder) if recorder is not None else None
+
+    def enable_tracing(self, tracer_provider=None, *, propagate_context: bool = True) -> None:
+        """
+        Trace every call of this client with OpenTelemetry: one CLIENT span per
+        call, named after the operation, with the instance and application ids
+        of the call, the HTTP status code and the number of retries as
+        attributes.
+
+        Requires the `opentelemetry-api` package. Tracing is disabled by default,
+        and costs nothing then.
+
+        :param TracerProvider tracer_provider: (optional) The tracer provider.
+               Defaults to the global tracer provider of OpenTelemetry.
+        :param bool propagate_context: (optional) Add the trace context headers,
+               such as `traceparent`, to the requests.
+        """
+        from .tracing import RequestTracer  # pylint: disable=import-outside-toplevel
+
+        self._request_tracer = RequestTracer(tracer_provider, propagate_context=propagate_context)
+
+    def disable_tracing(self) -> None:
+        """
+        Stop tracing the calls of this client.
+        """
+        self._request_tracer = None
+
+    def enable_token_prerefresh(self, *, lead_time: float = 60.0) -> None:
+        """
+        Refresh the access token on a background thread ahead of its refresh
+        time, instead of within the first request made after it.
+
+        A single background refresh serves every client sharing this client's
+        authenticator. Authenticators that do not fetch tokens, such as
+        BearerTokenAuthenticator, are not affected.
+
+        :param float lead_time: (optional) Seconds before the authenticator's
+               refresh time to refresh the token.
+        """
+        from .tokens import TokenRefresher, get_token_manager  # pylint: disable=import-outside-toplevel
+
+        token_manager = get_token_manager(self.authenticator)
+        if token_manager is not None:
+            TokenRefresher.for_token_manager(token_manager, lead_time=lead_time).start()
+
+    def disable_token_prerefresh(self) -> None:
+        """
+        Stop refreshing the access token in the background, for every client
+        sharing this client's authenticator.
+        """
+        from .tokens import TokenRefresher, get_token_manager  # pylint: disable=import-outside-toplevel
+
+        token_manager = get_token_manager(self.authenticator)
+        if token_manager is not None:
+            TokenRefresher.for_token_manager(token_manager).stop()
+
+    def enable_shared_token_cache(self, path: str = None, *, margin: float = 300.0) -> None:
+        """
+        Share access tokens with the other processes of this host through a
+        cache file, instead of fetching a token in each process.
+
+        Processes using the same credentials and cache file fetch one token
+        between them, at startup and at every refresh. Authenticators that do not
+        fetch tokens, such as BearerTokenAuthenticator, are not affected.
+
+        :param str path: (optional) Path of the cache file. Defaults to
+               `~/.cache/iaesdk/tokens.json`.
+        :param float margin: (optional) Seconds before their refresh time that
+               cached tokens are no longer used.
+        """
+        from .tokens import FileTokenCache, get_token_manager  # pylint: disable=import-outside-toplevel
+
+        token_manager = get_token_manager(self.authenticator)
+        if token_manager is not None:
+            FileTokenCache(path, margin=margin).install(token_manager)
+
+    def disable_shared_token_cache(self) -> None:
+        """
+        Fetch access tokens in this process only.
+        """
+        from .tokens import FileTokenCache, get_token_manager  # pylint: disable=import-outside-toplevel
+
+        token_manager = get_token_manager(self.authenticator)
+        if token_manager is not None:
+            FileTokenCache.uninstall(token_manager)
+
+    def configure_connection_pool(
+        self,
+        *,
+        pool_connections: int = 10,
+        pool_maxsize: int = 10,
+        pool_block: bool = False,
+        keep_alive: bool = True,
+        idle_timeout: float = None,
+    ) -> "PooledTransport":
+        """
+        Use new HTTP connection pools with the given settings for this client.
+
+        The settings are kept when retries or SSL verification are reconfigured
+        later. Pass the returned transport to `set_transport()` of other clients
+        to share the connections with them.
+
+        :param int pool_connections: (optional) Number of hosts to keep a
+               connection pool for.
+        :param int pool_maxsize: (optional) Maximum number of connections kept per
+               host. Set it to at least the number of concurrent requests.
+        :param bool pool_block: (optional) When all `pool_maxsize` connections to a
+               host are in use, wait for one to be returned instead of opening an
+               extra connection.
+        :param bool keep_alive: (optional) Enable TCP keep-alive on the
+               connections.
+        :param float idle_timeout: (optional) Close pooled connections that have
+               been idle for longer than this many seconds, instead of reusing them.
+        :return: The transport holding the connection pools.
+        :rtype: PooledTransport
+        """
+        from .transport import PooledTransport  # pylint: disable=import-outside-toplevel
+
+        transport = PooledTransport(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+            keep_alive=keep_alive,
+            idle_timeout=idle_timeout,
+        )
+        self.set_transport(transport)
+        return transport
+
+    def set_transport(self, transport: "PooledTransport") -> None:
+        """
+        Send the requests of this client over the connection pools of `transport`,
+        which may be shared with other clients. The client keeps its own retry and
+        SSL verification settings.
+
+        :param PooledTransport transport: The transport.
+        """
+        self._transport = transport
+        self._mount_transport()
+
+    def enable_retries(self, max_retries: int = 4, retry_interval: float = 30.0) -> None:
+        BaseService.enable_retries(self, max_retries=max_retries, retry_interval=retry_interval)
+        self._mount_transport()
+
+    enable_retries.__doc__ = BaseService.enable_retries.__doc__
+
+    def disable_retries(self) -> None:
+        BaseService.disable_retries(self)
+        self._mount_transport()
+
+    disable_retries.__doc__ = BaseService.disable_retries.__doc__
+
+    def set_disable_ssl_verification(self, status: bool = False) -> None:
+        BaseService.set_disable_ssl_verification(self, status)
+        self._mount_transport()
+
+    set_disable_ssl_verification.__doc__ = BaseService.set_disable_ssl_verification.__doc__
+
+    def _mount_transport(self) -> None:
+        # BaseService mounts a new default adapter whenever retries or SSL
+        # verification are reconfigured; replace it with one of the transport.
+        if self._transport is None:
+            return
+        self.http_adapter = self._transport.adapter(
+            max_retries=self.retry_config, disable_ssl_verification=self.disable_ssl_verification
+        )
+        self.http_client.mount("http://", self.http_adapter)
+        self.http_client.mount("https://", self.http_adapter)
+
+
+def with_response_hook(kwargs, hook):
+    """
+    Return the keyword arguments of a `send()` call, with `hook` added to the
+    response hooks of requests after those already in `kwargs`.
+    """
+    hooks = dict(kwargs.get("hooks") or {})
+    response_hooks = hooks.get("response") or []
+    if callable(response_hooks):
+        response_hooks = [response_hooks]
+    hooks["response"] = list(response_hooks) + [hook]
+    return dict(kwargs, hooks=hooks)
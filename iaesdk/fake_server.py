@@ -0,0 +1,880 @@
+# coding: utf-8
+
+# (C) Copyright IBM Corp. 2024.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+An in-process fake of the IBM Analytics Engine v2 and v3 APIs, for load tests
+and CI runs that must not reach IBM Cloud.
+"""
+
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+import heapq
+import itertools
+import json
+import logging
+import re
+import threading
+import time
+import uuid
+
+from .admission import ResourceFootprint, estimate_footprint, parse_memory
+from .ibm_analytics_engine_api_v3 import TERMINAL_APPLICATION_STATES
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_PAGE_SIZE = 50
+
+
+class FakeApiError(Exception):
+    """
+    An error answered by the fake server with `status_code`.
+    """
+
+    def __init__(self, status_code: int, code: str, message: str) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+        self.code = code
+        self.message = message
+
+
+def _timestamp(value: Optional[float]) -> Optional[str]:
+    # Seconds since the epoch as the service formats them.
+    if value is None:
+        return None
+    return datetime.fromtimestamp(value, timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'
+
+
+def _format_memory(memory: int) -> str:
+    # MiB as the service formats memory sizes, such as `8G` or `1536M`.
+    if memory % 1024 == 0:
+        return '{0}G'.format(memory // 1024)
+    return '{0}M'.format(memory)
+
+
+def _parse_interval(value: str) -> Tuple[float, float]:
+    # `<lower>,<upper>` with ISO 8601 timestamps, BEGINNING and CURRENT, as seconds.
+    try:
+        lower, upper = value.split(',')
+        bounds = []
+        for bound, keyword in ((lower.strip(), 'BEGINNING'), (upper.strip(), 'CURRENT')):
+            if bound == keyword:
+                bounds.append(None)
+            else:
+                bounds.append(datetime.fromisoformat(bound.replace('Z', '+00:00')).timestamp())
+    except ValueError:
+        raise FakeApiError(400, 'bad_request', 'invalid time interval: {0}'.format(value)) from None
+    return float('-inf') if bounds[0] is None else bounds[0], float('inf') if bounds[1] is None else bounds[1]
+
+
+class _Application:
+    # A Spark application, whose state follows from the clock: accepted until
+    # `start_at`, running until `finish_at`, then `outcome`; or `ended_state`
+    # from `end_time` once it has ended.
+    __slots__ = (
+        'id',
+        'index',
+        'details',
+        'footprint',
+        'submission_time',
+        'start_at',
+        'finish_at',
+        'outcome',
+        'ended_state',
+        'end_time',
+        'listed',
+    )
+
+    def __init__(self, index: int, details: dict, footprint: ResourceFootprint, submitted: float) -> None:
+        self.id = str(uuid.uuid4())
+        self.index = index
+        self.details = details
+        self.footprint = footprint
+        self.submission_time = submitted
+        self.start_at = None
+        self.finish_at = None
+        self.outcome = 'finished'
+        self.ended_state = None
+        self.end_time = None
+        # The listing entry, once the application has ended and no longer changes.
+        self.listed = None
+
+    def state(self, now: float) -> str:
+        if self.ended_state is not None:
+            return self.ended_state
+        if now < self.start_at:
+            return 'accepted'
+        if now < self.finish_at:
+            return 'running'
+        return self.outcome
+
+    def start_time(self, now: float) -> Optional[float]:
+        if now < self.start_at or (self.end_time is not None and self.end_time < self.start_at):
+            return None
+        return self.start_at
+
+    def to_dict(self, now: float, href: str) -> dict:
+        if self.listed is not None:
+            return self.listed
+        start_time = self.start_time(now)
+        result = {
+            'id': self.id,
+            'href': href,
+            'state': self.state(now),
+            'submission_time': _timestamp(self.submission_time),
+            'start_time': _timestamp(start_time),
+            'end_time': _timestamp(self.end_time),
+            'finish_time': _timestamp(self.end_time),
+        }
+        if start_time is not None:
+            result['spark_application_id'] = 'spark-application-{0}'.format(self.index)
+        if self.details.get('name'):
+            result['spark_application_name'] = self.details['name']
+        result = {key: value for key, value in result.items() if value is not None}
+        if self.ended_state is not None:
+            self.listed = result
+        return result
+
+
+class _Instance:
+    # A v3 serverless instance and its applications.
+
+    def __init__(self, instance_id: str, created: float, max_cores: float, max_memory: int) -> None:
+        self.id = instance_id
+        self.state = 'active'
+        self.state_change_time = created
+        self.max_cores = max_cores
+        self.max_memory = max_memory
+        self.default_runtime = {'spark_version': '3.4'}
+        self.default_config: Dict[str, str] = {}
+        self.instance_home = None
+        self.log_forwarding = {'enabled': False, 'sources': ['spark-driver', 'spark-executor'], 'tags': []}
+        self.logging = {'components': [], 'log_server': {'type': 'ibm-log-analysis'}, 'enable': False}
+        self.history_server = {'state': 'stopped'}
+        self.applications: List[_Application] = []
+        self.by_id: Dict[str, _Application] = {}
+        self.consumption = ResourceFootprint()
+        # (finish_at, index) of the applications holding resources.
+        self.running: List[Tuple[float, int]] = []
+
+    def advance(self, now: float) -> None:
+        # Release the resources of the applications that have finished by now.
+        while self.running and self.running[0][0] <= now:
+            _, index = heapq.heappop(self.running)
+            application = self.applications[index]
+            if application.ended_state is None:
+                application.ended_state = application.outcome
+                application.end_time = application.finish_at
+                self.consumption = self.consumption - application.footprint
+
+
+class _Cluster:
+    # A v2 cluster.
+
+    def __init__(self, instance_guid: str, created: float) -> None:
+        self.id = instance_guid
+        self.created = created
+        self.state = 'Active'
+        self.compute_nodes = 1
+        self.task_nodes = 0
+        self.customization_requests: Dict[str, dict] = {}
+        self.log_config = None
+        self.whitelist: List[str] = []
+
+
+class FakeAnalyticsEngineServer:
+    """
+    An HTTP server on the loopback interface implementing the routes of
+    IbmAnalyticsEngineApiV3 and IbmAnalyticsEngineApiV2 in memory.
+
+    Serverless (v3) instances:
+
+    * Submitted applications are `accepted` for `accept_time` seconds, then
+      `running` for `run_time` seconds, then `finished` (or the state returned
+      by `outcome`). Deleting an application that has not ended stops it.
+    * Submissions are checked against the resource consumption limits of the
+      instance, with the footprint estimated from the application's Spark
+      configuration; those that do not fit are rejected with status 429. The
+      current resource consumption only includes applications that have
+      started, as the service reports it.
+    * Application listings are paginated with `limit` and `next.start`, and
+      filtered by state and time intervals.
+    * The Spark history server can be started and stopped, and holds resources
+      while started.
+
+    Clusters (v2) answer every route of the v2 API.
+
+    Instances are created with `add_instance()` and `add_cluster()`, or on first
+    use with `auto_create=True`. Each connection is served by its own thread.
+    """
+
+    def __init__(
+        self,
+        *,
+        host: str = '127.0.0.1',
+        port: int = 0,
+        accept_time: float = 1.0,
+        run_time: float = 10.0,
+        outcome: Callable[[dict], str] = None,
+        max_cores: float = 150,
+        max_memory: str = '600G',
+        latency: float = 0.0,
+        auto_create: bool = False,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """
+        Initialize a FakeAnalyticsEngineServer object. The server is started with
+        `start()`, or by using it as a context manager.
+
+        :param str host: (optional) The address to listen on.
+        :param int port: (optional) The port to listen on; a free port by default.
+        :param float accept_time: (optional) Seconds applications stay accepted.
+        :param float run_time: (optional) Seconds applications run.
+        :param outcome: (optional) Returns the final state of an application, such
+               as `finished` or `failed`, given its application details.
+        :param float max_cores: (optional) The core limit of new instances.
+        :param str max_memory: (optional) The memory limit of new instances.
+        :param float latency: (optional) Seconds to wait before each response.
+        :param bool auto_create: (optional) Create unknown instances and clusters
+               on their first request, instead of answering 404.
+        :param clock: (optional) Returns the current time in seconds since the
+               epoch; a controllable clock makes the state transitions
+               deterministic.
+        """
+        self.accept_time = accept_time
+        self.run_time = run_time
+        self.outcome = outcome
+        self.max_cores = max_cores
+        self.max_memory = parse_memory(max_memory)
+        self.latency = latency
+        self.auto_create = auto_create
+        self.clock = clock
+        self.request_count = 0
+        self._instances: Dict[str, _Instance] = {}
+        self._clusters: Dict[str, _Cluster] = {}
+        self._request_ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._httpd = _HTTPServer((host, port), self)
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        """The service URL of the server, for `set_service_url()` of the clients."""
+        host, port = self._httpd.server_address[:2]
+        return 'http://{0}:{1}'.format(host, port)
+
+    def start(self) -> 'FakeAnalyticsEngineServer':
+        """
+        Serve requests on a background thread.
+
+        :return: This server.
+        """
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._httpd.serve_forever, args=(0.05,), name='iaesdk-fake-server', daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """
+        Stop serving requests and close the listening socket.
+        """
+        if self._thread is not None:
+            self._httpd.shutdown()
+            self._thread = None
+        self._httpd.server_close()
+
+    def __enter__(self) -> 'FakeAnalyticsEngineServer':
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def add_instance(self, instance_id: str = None, *, max_cores: float = None, max_memory: str = None) -> str:
+        """
+        Create a serverless (v3) instance.
+
+        :param str instance_id: (optional) The instance id; a new GUID by default.
+        :param float max_cores: (optional) The core limit of the instance.
+        :param str max_memory: (optional) The memory limit of the instance, such
+               as `600G`.
+        :return: The instance id.
+        :rtype: str
+        """
+        instance_id = instance_id or str(uuid.uuid4())
+        with self._lock:
+            self._instances[instance_id] = _Instance(
+                instance_id,
+                self.clock(),
+                self.max_cores if max_cores is None else max_cores,
+                self.max_memory if max_memory is None else parse_memory(max_memory),
+            )
+        return instance_id
+
+    def add_cluster(self, instance_guid: str = None) -> str:
+        """
+        Create a cluster (v2) instance.
+
+        :param str instance_guid: (optional) The instance GUID; a new GUID by
+               default.
+        :return: The instance GUID.
+        :rtype: str
+        """
+        instance_guid = instance_guid or str(uuid.uuid4())
+        with self._lock:
+            self._clusters[instance_guid] = _Cluster(instance_guid, self.clock())
+        return instance_guid
+
+    def add_applications(
+        self, instance_id: str, count: int, *, state: str = 'finished', details: dict = None
+    ) -> List[str]:
+        """
+        Add applications that have already ended to an instance, such as to
+        exercise pagination.
+
+        :param str instance_id: The instance id.
+        :param int count: Number of applications.
+        :param str state: (optional) The terminal state of the applications.
+        :param dict details: (optional) The application details of the
+               applications; their `name` is listed.
+        :return: The application ids.
+        :rtype: List[str]
+        """
+        if state not in TERMINAL_APPLICATION_STATES:
+            raise ValueError('state must be a terminal state')
+        with self._lock:
+            instance = self._instance(instance_id)
+            now = self.clock()
+            added = []
+            for _ in range(count):
+                application = self._new_application(instance, dict(details or {}), ResourceFootprint(), now)
+                application.start_at = application.finish_at = application.end_time = now
+                application.ended_state = state
+                added.append(application.id)
+        return added
+
+    def handle(self, method: str, path: str, body: bytes = b'') -> Tuple[int, object]:
+        """
+        Answer a request without HTTP, as the server does.
+
+        :param str method: The HTTP method.
+        :param str path: The path, with the query string.
+        :param bytes body: (optional) The JSON request body.
+        :return: The status code and the JSON response, or None if it has no body.
+        :rtype: Tuple[int, object]
+        """
+        url = urlsplit(path)
+        for route_method, pattern, handler in _ROUTES:
+            if route_method != method:
+                continue
+            match = pattern.fullmatch(url.path)
+            if match is None:
+                continue
+            try:
+                payload = json.loads(body) if body else {}
+            except ValueError:
+                return 400, _error_body('bad_request', 'The request body is not valid JSON')
+            # Every route of the API takes a JSON object.
+            if not isinstance(payload, dict):
+                return 400, _error_body('bad_request', 'The request body must be a JSON object')
+            query = parse_qs(url.query)
+            try:
+                with self._lock:
+                    self.request_count += 1
+                    return handler(self, self.clock(), *map(unquote, match.groups()), query=query, body=payload)
+            except FakeApiError as error:
+                return error.status_code, _error_body(error.code, error.message)
+        return 404, _error_body('not_found', 'No route for {0} {1}'.format(method, url.path))
+
+    #########################
+    # v3
+    #########################
+
+    def _instance(self, instance_id: str) -> _Instance:
+        instance = self._instances.get(instance_id)
+        if instance is None:
+            if not self.auto_create:
+                raise FakeApiError(404, 'not_found', 'Instance {0} not found'.format(instance_id))
+            instance = self._instances[instance_id] = _Instance(
+                instance_id, self.clock(), self.max_cores, self.max_memory
+            )
+        return instance
+
+    def _application(self, instance: _Instance, application_id: str) -> _Application:
+        application = instance.by_id.get(application_id)
+        if application is None:
+            raise FakeApiError(404, 'not_found', 'Application {0} not found'.format(application_id))
+        return application
+
+    def _new_application(
+        self, instance: _Instance, details: dict, footprint: ResourceFootprint, now: float
+    ) -> _Application:
+        application = _Application(len(instance.applications), details, footprint, now)
+        instance.applications.append(application)
+        instance.by_id[application.id] = application
+        return application
+
+    def _application_href(self, instance: _Instance, application: _Application) -> str:
+        return '{0}/v3/analytics_engines/{1}/spark_applications/{2}'.format(self.url, instance.id, application.id)
+
+    def _get_instance(self, now, instance_id, **_) -> Tuple[int, dict]:
+        instance = self._instance(instance_id)
+        result = {
+            'id': instance.id,
+            'href': '{0}/v3/analytics_engines/{1}'.format(self.url, instance.id),
+            'state': instance.state,
+            'state_change_time': _timestamp(instance.state_change_time),
+            'default_runtime': dict(instance.default_runtime),
+            'default_config': dict(instance.default_config),
+        }
+        if instance.instance_home is not None:
+            result['instance_home'] = dict(instance.instance_home)
+        return 200, result
+
+    def _get_instance_state(self, now, instance_id, **_) -> Tuple[int, dict]:
+        instance = self._instance(instance_id)
+        return 200, {'id': instance.id, 'state': instance.state}
+
+    def _set_instance_home(self, now, instance_id, body, **_) -> Tuple[int, dict]:
+        instance = self._instance(instance_id)
+        instance.instance_home = {key: value for key, value in body.items() if key != 'instance_id'}
+        return 200, dict(instance.instance_home, instance_id=instance.id)
+
+    def _update_instance_home_credentials(self, now, instance_id, body, **_) -> Tuple[int, dict]:
+        instance = self._instance(instance_id)
+        if instance.instance_home is None:
+            raise FakeApiError(400, 'bad_request', 'The instance has no instance home')
+        instance.instance_home.update(body)
+        return 200, dict(instance.instance_home, instance_id=instance.id)
+
+    def _get_default_configs(self, now, instance_id, **_) -> Tuple[int, dict]:
+        return 200, dict(self._instance(instance_id).default_config)
+
+    def _replace_default_configs(self, now, instance_id, body, **_) -> Tuple[int, dict]:
+        instance = self._instance(instance_id)
+        instance.default_config = {key: str(value) for key, value in body.items()}
+        return 200, dict(instance.default_config)
+
+    def _update_default_configs(self, now, instance_id, body, **_) -> Tuple[int, dict]:
+        instance = self._instance(instance_id)
+        for key, value in body.items():
+            if value is None:
+                instance.default_config.pop(key, None)
+            else:
+                instance.default_config[key] = str(value)
+        return 200, dict(instance.default_config)
+
+    def _get_default_runtime(self, now, instance_id, **_) -> Tuple[int, dict]:
+        return 200, dict(self._instance(instance_id).default_runtime)
+
+    def _replace_default_runtime(self, now, instance_id, body, **_) -> Tuple[int, dict]:
+        instance = self._instance(instance_id)
+        instance.default_runtime = {'spark_version': body.get('spark_version')}
+        return 200, dict(instance.default_runtime)
+
+    def _create_application(self, now, instance_id, body, **_) -> Tuple[int, dict]:
+        instance = self._instance(instance_id)
+        details = body.get('application_details')
+        if not isinstance(details, dict) or not details.get('application'):
+            raise FakeApiError(400, 'bad_request', 'application_details.application must be provided')
+        try:
+            footprint = estimate_footprint(details, instance.default_config)
+        except (KeyError, TypeError, ValueError) as error:
+            raise FakeApiError(400, 'bad_request', str(error)) from None
+        instance.advance(now)
+        limits = ResourceFootprint(instance.max_cores, instance.max_memory)
+        if not (instance.consumption + footprint).fits(limits):
+            raise FakeApiError(
+                429,
+                'quota_exceeded',
+                'The application requires {0:g} cores and {1}, over the available resources of the instance'.format(
+                    footprint.cores, _format_memory(footprint.memory)
+                ),
+            )
+        application = self._new_application(instance, details, footprint, now)
+        application.start_at = now + self.accept_time
+        application.finish_at = application.start_at + self.run_time
+        if self.outcome is not None:
+            application.outcome = self.outcome(details)
+        instance.consumption = instance.consumption + footprint
+        heapq.heappush(instance.running, (application.finish_at, application.index))
+        return 202, {'id': application.id, 'state': 'accepted'}
+
+    def _list_applications(self, now, instance_id, query, **_) -> Tuple[int, dict]:
+        instance = self._instance(instance_id)
+        instance.advance(now)
+        try:
+            limit = int(query.get('limit', [_DEFAULT_PAGE_SIZE])[0])
+            start = int(query.get('start', ['0'])[0])
+        except ValueError:
+            raise FakeApiError(400, 'bad_request', 'limit and start must be integers') from None
+        if limit < 1:
+            raise FakeApiError(400, 'bad_request', 'limit must be at least 1')
+        states = {state for value in query.get('state', []) for state in value.lower().split(',') if state}
+        intervals = []
+        for name, attribute in (
+            ('submission_time_interval', lambda application: application.submission_time),
+            ('start_time_interval', lambda application: application.start_time(now)),
+            ('end_time_interval', lambda application: application.end_time),
+        ):
+            if name in query:
+                intervals.append((attribute,) + _parse_interval(query[name][0]))
+
+        def selected(application: _Application) -> bool:
+            if states and application.state(now) not in states:
+                return False
+            for attribute, lower, upper in intervals:
+                value = attribute(application)
+                if value is None or not lower <= value < upper:
+                    return False
+            return True
+
+        base = '{0}/v3/analytics_engines/{1}/spark_applications?limit={2}'.format(self.url, instance.id, limit)
+        page = []
+        index = max(start, 0)
+        applications = instance.applications
+        while index < len(applications) and len(page) < limit:
+            if selected(applications[index]):
+                page.append(applications[index])
+            index += 1
+        while index < len(applications) and not selected(applications[index]):
+            index += 1
+
+        result = {
+            'applications': [
+                application.to_dict(now, self._application_href(instance, application)) for application in page
+            ],
+            'first': {'href': base},
+            'limit': limit,
+        }
+        if index < len(applications):
+            result['next'] = {'href': '{0}&start={1}'.format(base, index), 'start': str(index)}
+        return 200, result
+
+    def _get_application(self, now, instance_id, application_id, **_) -> Tuple[int, dict]:
+        instance = self._instance(instance_id)
+        instance.advance(now)
+        application = self._application(instance, application_id)
+        result = dict(application.to_dict(now, self._application_href(instance, application)))
+        del result['href']
+        result['application_details'] = application.details
+        return 200, result
+
+    def _delete_application(self, now, instance_id, application_id, **_) -> Tuple[int, None]:
+        instance = self._instance(instance_id)
+        instance.advance(now)
+        application = self._application(instance, application_id)
+        if application.ended_state is None:
+            application.ended_state = 'stopped'
+            application.end_time = now
+            instance.consumption = instance.consumption - application.footprint
+        return 204, None
+
+    def _get_application_state(self, now, instance_id, application_id, **_) -> Tuple[int, dict]:
+        instance = self._instance(instance_id)
+        instance.advance(now)
+        application = self._application(instance, application_id)
+        result = application.to_dict(now, self._application_href(instance, application))
+        return 200, {
+            key: result[key] for key in ('id', 'state', 'start_time', 'end_time', 'finish_time') if key in result
+        }
+
+    def _get_current_resource_consumption(self, now, instance_id, **_) -> Tuple[int, dict]:
+        instance = self._instance(instance_id)
+        instance.advance(now)
+        # Like the service, the reported consumption leaves out the applications
+        # that have not started yet, which submissions are still checked against.
+        consumption = instance.consumption
+        for _, index in instance.running:
+            application = instance.applications[index]
+            if application.ended_state is None and now < application.start_at:
+                consumption = consumption - application.footprint
+        if instance.history_server['state'] == 'started':
+            consumption = consumption + _history_server_footprint()
+        return 200, {'cores': '{0:g}'.format(consumption.cores), 'memory': _format_memory(consumption.memory)}
+
+    def _get_resource_consumption_limits(self, now, instance_id, **_) -> Tuple[int, dict]:
+        instance = self._instance(instance_id)
+        return 200, {'max_cores': '{0:g}'.format(instance.max_cores), 'max_memory': _format_memory(instance.max_memory)}
+
+    def _replace_log_forwarding_config(self, now, instance_id, body, **_) -> Tuple[int, dict]:
+        instance = self._instance(instance_id)
+        instance.log_forwarding.update({key: value for key, value in body.items() if value is not None})
+        return 200, self._log_forwarding_config(instance)
+
+    def _get_log_forwarding_config(self, now, instance_id, **_) -> Tuple[int, dict]:
+        return 200, self._log_forwarding_config(self._instance(instance_id))
+
+    @staticmethod
+    def _log_forwarding_config(instance: _Instance) -> dict:
+        return dict(instance.log_forwarding, log_server={'type': 'ibm-log-analysis'})
+
+    def _configure_platform_logging(self, now, instance_id, body, **_) -> Tuple[int, dict]:
+        instance = self._instance(instance_id)
+        instance.logging['enable'] = bool(body.get('enable'))
+        instance.logging['components'] = ['spark-driver', 'spark-executor'] if instance.logging['enable'] else []
+        return 201, dict(instance.logging)
+
+    def _get_logging_configuration(self, now, instance_id, **_) -> Tuple[int, dict]:
+        return 200, dict(self._instance(instance_id).logging)
+
+    def _start_spark_history_server(self, now, instance_id, **_) -> Tuple[int, dict]:
+        instance = self._instance(instance_id)
+        instance.advance(now)
+        if instance.history_server['state'] != 'started':
+            footprint = _history_server_footprint()
+            if not (instance.consumption + footprint).fits(ResourceFootprint(instance.max_cores, instance.max_memory)):
+                raise FakeApiError(429, 'quota_exceeded', 'Not enough resources to start the Spark history server')
+            instance.history_server = {
+                'state': 'started',
+                'cores': '{0:g}'.format(footprint.cores),
+                'memory': _format_memory(footprint.memory),
+                'start_time': _timestamp(now),
+            }
+        return 200, dict(instance.history_server)
+
+    def _get_spark_history_server(self, now, instance_id, **_) -> Tuple[int, dict]:
+        return 200, dict(self._instance(instance_id).history_server)
+
+    def _stop_spark_history_server(self, now, instance_id, **_) -> Tuple[int, None]:
+        instance = self._instance(instance_id)
+        if instance.history_server['state'] == 'started':
+            instance.history_server = dict(instance.history_server, state='stopped', stop_time=_timestamp(now))
+        return 204, None
+
+    #########################
+    # v2
+    #########################
+
+    def _cluster(self, instance_guid: str) -> _Cluster:
+        cluster = self._clusters.get(instance_guid)
+        if cluster is None:
+            if not self.auto_create:
+                raise FakeApiError(404, 'not_found', 'Instance {0} not found'.format(instance_guid))
+            cluster = self._clusters[instance_guid] = _Cluster(instance_guid, self.clock())
+        return cluster
+
+    def _get_all_analytics_engines(self, now, **_) -> Tuple[int, list]:
+        return 200, []
+
+    def _get_analytics_engine_by_id(self, now, instance_guid, **_) -> Tuple[int, dict]:
+        cluster = self._cluster(instance_guid)
+        created = _timestamp(cluster.created)
+        nodes = [{'id': 1, 'fqdn': 'chs-mn001.fake', 'type': 'management', 'state': 'Active'}]
+        for node_type, count in (('data', cluster.compute_nodes), ('task', cluster.task_nodes)):
+            for number in range(count):
+                nodes.append(
+                    {
+                        'id': len(nodes) + 1,
+                        'fqdn': 'chs-{0}{1:03d}.fake'.format(node_type[0] + 'n', number + 1),
+                        'type': node_type,
+                        'state': 'Active',
+                    }
+                )
+        return 200, {
+            'id': cluster.id,
+            'name': 'Analytics Engine',
+            'service_plan': 'standard-hourly',
+            'hardware_size': 'default',
+            'software_package': 'ae-1.2-hadoop-spark',
+            'domain': 'fake',
+            'creation_time': created,
+            'commision_time': created,
+            'decommision_time': created,
+            'deletion_time': created,
+            'state_change_time': created,
+            'state': cluster.state,
+            'nodes': nodes,
+            'user_credentials': {'user': 'clsadmin'},
+            'private_endpoint_whitelist': list(cluster.whitelist),
+        }
+
+    def _get_analytics_engine_state_by_id(self, now, instance_guid, **_) -> Tuple[int, dict]:
+        return 200, {'state': self._cluster(instance_guid).state}
+
+    def _create_customization_request(self, now, instance_guid, body, **_) -> Tuple[int, dict]:
+        cluster = self._cluster(instance_guid)
+        if not body.get('target') or not body.get('custom_actions'):
+            raise FakeApiError(400, 'bad_request', 'target and custom_actions must be provided')
+        request_id = next(self._request_ids)
+        cluster.customization_requests[str(request_id)] = {
+            'id': str(request_id),
+            'run_status': 'Completed',
+            'run_details': {'overall_status': 'success', 'details': []},
+        }
+        return 200, {'request_id': request_id}
+
+    def _get_all_customization_requests(self, now, instance_guid, **_) -> Tuple[int, list]:
+        return 200, [{'id': request_id} for request_id in self._cluster(instance_guid).customization_requests]
+
+    def _get_customization_request_by_id(self, now, instance_guid, request_id, **_) -> Tuple[int, dict]:
+        request = self._cluster(instance_guid).customization_requests.get(request_id)
+        if request is None:
+            raise FakeApiError(404, 'not_found', 'Customization request {0} not found'.format(request_id))
+        return 200, request
+
+    def _resize_cluster(self, now, instance_guid, body, **_) -> Tuple[int, dict]:
+        cluster = self._cluster(instance_guid)
+        if 'compute_nodes_count' in body:
+            cluster.compute_nodes = _node_count(body, 'compute_nodes_count')
+        elif 'task_nodes_count' in body:
+            cluster.task_nodes = _node_count(body, 'task_nodes_count')
+        else:
+            raise FakeApiError(400, 'bad_request', 'compute_nodes_count or task_nodes_count must be provided')
+        return 200, {'request_id': str(next(self._request_ids))}
+
+    def _reset_cluster_password(self, now, instance_guid, **_) -> Tuple[int, dict]:
+        cluster = self._cluster(instance_guid)
+        return 200, {'id': cluster.id, 'user_credentials': {'user': 'clsadmin', 'password': uuid.uuid4().hex}}
+
+    def _configure_logging(self, now, instance_guid, body, **_) -> Tuple[int, None]:
+        cluster = self._cluster(instance_guid)
+        if not body.get('log_specs') or not body.get('log_server'):
+            raise FakeApiError(400, 'bad_request', 'log_specs and log_server must be provided')
+        if not isinstance(body['log_specs'], list) or not all(isinstance(spec, dict) for spec in body['log_specs']):
+            raise FakeApiError(400, 'bad_request', 'log_specs must be a list of objects')
+        cluster.log_config = {'log_specs': body['log_specs'], 'log_server': body['log_server']}
+        return 202, None
+
+    def _get_logging_config(self, now, instance_guid, **_) -> Tuple[int, dict]:
+        cluster = self._cluster(instance_guid)
+        if cluster.log_config is None:
+            raise FakeApiError(404, 'not_found', 'Logging is not configured')
+        status = [
+            {'node_type': spec.get('node_type'), 'node_id': '1', 'action': 'configure', 'status': 'success'}
+            for spec in cluster.log_config['log_specs']
+        ]
+        return 200, dict(cluster.log_config, log_config_status=status)
+
+    def _delete_logging_config(self, now, instance_guid, **_) -> Tuple[int, None]:
+        self._cluster(instance_guid).log_config = None
+        return 202, None
+
+    def _update_private_endpoint_whitelist(self, now, instance_guid, body, **_) -> Tuple[int, dict]:
+        cluster = self._cluster(instance_guid)
+        ip_ranges = body.get('ip_ranges') or []
+        if not isinstance(ip_ranges, list):
+            raise FakeApiError(400, 'bad_request', 'ip_ranges must be a list')
+        if body.get('action') == 'add':
+            cluster.whitelist.extend(ip_range for ip_range in ip_ranges if ip_range not in cluster.whitelist)
+        elif body.get('action') == 'delete':
+            cluster.whitelist = [ip_range for ip_range in cluster.whitelist if ip_range not in ip_ranges]
+        else:
+            raise FakeApiError(400, 'bad_request', 'action must be add or delete')
+        return 200, {'private_endpoint_whitelist': list(cluster.whitelist)}
+
+
+def _node_count(body: dict, key: str) -> int:
+    # A node count of a resize request.
+    count = body[key]
+    if isinstance(count, bool) or not isinstance(count, int) or count < 0:
+        raise FakeApiError(400, 'bad_request', '{0} must be a non-negative integer'.format(key))
+    return count
+
+
+def _history_server_footprint() -> ResourceFootprint:
+    return ResourceFootprint(1, 4096)
+
+
+def _error_body(code: str, message: str) -> dict:
+    return {'errors': [{'code': code, 'message': message}], 'trace': uuid.uuid4().hex}
+
+
+def _route(method: str, path: str, handler: Callable) -> Tuple[str, 're.Pattern', Callable]:
+    return method, re.compile(re.sub(r'\{[a-z_]+\}', '([^/]+)', path)), handler
+
+
+_V3 = '/v3/analytics_engines/{instance_id}'
+_V2 = '/v2/analytics_engines/{instance_guid}'
+_Server = FakeAnalyticsEngineServer
+# pylint: disable=protected-access
+_ROUTES = [
+    _route('GET', _V3, _Server._get_instance),
+    _route('GET', _V3 + '/state', _Server._get_instance_state),
+    _route('PUT', _V3 + '/instance_home', _Server._set_instance_home),
+    _route('PATCH', _V3 + '/instance_home', _Server._update_instance_home_credentials),
+    _route('GET', _V3 + '/default_configs', _Server._get_default_configs),
+    _route('PUT', _V3 + '/default_configs', _Server._replace_default_configs),
+    _route('PATCH', _V3 + '/default_configs', _Server._update_default_configs),
+    _route('GET', _V3 + '/default_runtime', _Server._get_default_runtime),
+    _route('PUT', _V3 + '/default_runtime', _Server._replace_default_runtime),
+    _route('POST', _V3 + '/spark_applications', _Server._create_application),
+    _route('GET', _V3 + '/spark_applications', _Server._list_applications),
+    _route('GET', _V3 + '/spark_applications/{application_id}', _Server._get_application),
+    _route('DELETE', _V3 + '/spark_applications/{application_id}', _Server._delete_application),
+    _route('GET', _V3 + '/spark_applications/{application_id}/state', _Server._get_application_state),
+    _route('GET', _V3 + '/current_resource_consumption', _Server._get_current_resource_consumption),
+    _route('GET', _V3 + '/resource_consumption_limits', _Server._get_resource_consumption_limits),
+    _route('PUT', _V3 + '/log_forwarding_config', _Server._replace_log_forwarding_config),
+    _route('GET', _V3 + '/log_forwarding_config', _Server._get_log_forwarding_config),
+    _route('PUT', _V3 + '/logging', _Server._configure_platform_logging),
+    _route('GET', _V3 + '/logging', _Server._get_logging_configuration),
+    _route('POST', _V3 + '/spark_history_server', _Server._start_spark_history_server),
+    _route('GET', _V3 + '/spark_history_server', _Server._get_spark_history_server),
+    _route('DELETE', _V3 + '/spark_history_server', _Server._stop_spark_history_server),
+    _route('GET', '/v2/analytics_engines', _Server._get_all_analytics_engines),
+    _route('GET', _V2, _Server._get_analytics_engine_by_id),
+    _route('GET', _V2 + '/state', _Server._get_analytics_engine_state_by_id),
+    _route('POST', _V2 + '/customization_requests', _Server._create_customization_request),
+    _route('GET', _V2 + '/customization_requests', _Server._get_all_customization_requests),
+    _route('GET', _V2 + '/customization_requests/{request_id}', _Server._get_customization_request_by_id),
+    _route('POST', _V2 + '/resize', _Server._resize_cluster),
+    _route('POST', _V2 + '/reset_password', _Server._reset_cluster_password),
+    _route('PUT', _V2 + '/log_config', _Server._configure_logging),
+    _route('GET', _V2 + '/log_config', _Server._get_logging_config),
+    _route('DELETE', _V2 + '/log_config', _Server._delete_logging_config),
+    _route('PATCH', _V2 + '/private_endpoint_whitelist', _Server._update_private_endpoint_whitelist),
+]
+# pylint: enable=protected-access
+
+
+class _HTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(self, address: Tuple[str, int], fake: FakeAnalyticsEngineServer) -> None:
+        self.fake = fake
+        super().__init__(address, _Handler)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are written separately; without TCP_NODELAY the body
+    # waits for the client's delayed ACK, adding 40 ms to every response.
+    disable_nagle_algorithm = True
+
+    def _handle(self) -> None:
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        fake = self.server.fake
+        status, payload = fake.handle(self.command, self.path, body)
+        if fake.latency:
+            time.sleep(fake.latency)
+        data = b'' if payload is None else json.dumps(payload, separators=(',', ':')).encode('utf-8')
+        self.send_response(status)
+        if payload is not None:
+            self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        if data:
+            self.wfile.write(data)
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _handle
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        logger.debug('%s - %s', self.address_string(), format % args)
@@ -0,0 +1,177 @@
+# coding: utf-8
+
+# (C) Copyright IBM Corp. 2024.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Concurrent read operations across a fleet of Analytics Engine instances.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List
+
+from ibm_cloud_sdk_core import DetailedResponse
+
+from .ibm_analytics_engine_api_v3 import IbmAnalyticsEngineApiV3
+
+# The operations of IbmAnalyticsEngineApiV3 that FleetClient.run() accepts.
+READ_OPERATIONS = frozenset(
+    [
+        'get_instance',
+        'get_instance_state',
+        'get_instance_default_configs',
+        'get_instance_default_runtime',
+        'get_log_forwarding_config',
+        'get_resource_consumption_limits',
+        'get_current_resource_consumption',
+        'get_spark_history_server',
+        'list_applications',
+    ]
+)
+
+
+class FleetResult:
+    """
+    The outcome of an operation run across a fleet of instances.
+
+    :attr Dict[str, DetailedResponse] responses: The response of each instance
+          for which the operation succeeded.
+    :attr Dict[str, Exception] errors: The exception raised for each instance for
+          which the operation failed.
+    """
+
+    def __init__(self, responses: Dict[str, DetailedResponse], errors: Dict[str, Exception]) -> None:
+        self.responses = responses
+        self.errors = errors
+
+    @property
+    def ok(self) -> bool:
+        """True if the operation succeeded for every instance."""
+        return not self.errors
+
+    def results(self) -> Dict[str, object]:
+        """
+        Return the result of each instance for which the operation succeeded.
+
+        :rtype: Dict[str, object]
+        """
+        return {instance_id: response.get_result() for instance_id, response in self.responses.items()}
+
+    def __repr__(self) -> str:
+        return '<FleetResult: {0} succeeded, {1} failed>'.format(len(self.responses), len(self.errors))
+
+
+class FleetClient:
+    """
+    Runs read operations of IbmAnalyticsEngineApiV3 across many instances
+    concurrently, with at most `max_concurrency` requests in flight across all
+    the operations running at the same time.
+
+    Per-instance failures do not stop the others; they are reported in
+    `FleetResult.errors`.
+    """
+
+    def __init__(
+        self, client: IbmAnalyticsEngineApiV3, instance_ids: Iterable[str], *, max_concurrency: int = 16
+    ) -> None:
+        """
+        Initialize a FleetClient object.
+
+        :param IbmAnalyticsEngineApiV3 client: The client used for every instance.
+               Its connection pool should allow `max_concurrency` connections, see
+               `configure_connection_pool()`.
+        :param Iterable[str] instance_ids: The identifiers of the instances.
+        :param int max_concurrency: (optional) Maximum number of requests in
+               flight at any time.
+        """
+        if client is None:
+            raise ValueError('client must be provided')
+        if max_concurrency < 1:
+            raise ValueError('max_concurrency must be at least 1')
+        self.client = client
+        self.instance_ids: List[str] = list(dict.fromkeys(instance_ids))
+        self.max_concurrency = max_concurrency
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix='iaesdk-fleet')
+
+    def run(self, operation: str, **kwargs) -> FleetResult:
+        """
+        Run a read operation of IbmAnalyticsEngineApiV3 for every instance.
+
+        :param str operation: The name of the operation, one of READ_OPERATIONS.
+        :param kwargs: Further arguments of the operation, passed for every
+               instance.
+        :rtype: FleetResult
+        """
+        if operation not in READ_OPERATIONS:
+            raise ValueError('operation must be one of: ' + ', '.join(sorted(READ_OPERATIONS)))
+        method = getattr(self.client, operation)
+        futures = {
+            instance_id: self._executor.submit(method, instance_id, **kwargs) for instance_id in self.instance_ids
+        }
+
+        responses = {}
+        errors = {}
+        for instance_id, future in futures.items():
+            error = future.exception()
+            if error is None:
+                responses[instance_id] = future.result()
+            else:
+                errors[instance_id] = error
+        return FleetResult(responses, errors)
+
+    def get_instance_state(self, **kwargs) -> FleetResult:
+        """
+        Get the state of every instance.
+
+        :rtype: FleetResult
+        """
+        return self.run('get_instance_state', **kwargs)
+
+    def get_current_resource_consumption(self, **kwargs) -> FleetResult:
+        """
+        Get the current resource consumption of every instance.
+
+        :rtype: FleetResult
+        """
+        return self.run('get_current_resource_consumption', **kwargs)
+
+    def list_applications(self, **kwargs) -> FleetResult:
+        """
+        List the applications of every instance. Returns the first page of each
+        instance; use `limit` and the `next` links of the results for more.
+
+        :param kwargs: Further arguments of `list_applications()`, such as `state`.
+        :rtype: FleetResult
+        """
+        return self.run('list_applications', **kwargs)
+
+    def get_spark_history_server(self, **kwargs) -> FleetResult:
+        """
+        Get the Spark history server of every instance.
+
+        :rtype: FleetResult
+        """
+        return self.run('get_spark_history_server', **kwargs)
+
+    def close(self) -> None:
+        """
+        Release the worker threads, after the operations in progress complete.
+        """
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self) -> 'FleetClient':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
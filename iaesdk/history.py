@@ -0,0 +1,359 @@
+# coding: utf-8
+
+# (C) Copyright IBM Corp. 2024.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Local SQLite mirror of the Spark application history of an instance.
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+import json
+import logging
+import sqlite3
+import threading
+import time
+
+from ibm_cloud_sdk_core.utils import datetime_to_string
+
+from .columnar import NULL_TIMESTAMP, datetime_to_epoch_ns
+from .ibm_analytics_engine_api_v3 import ApplicationsPager, IbmAnalyticsEngineApiV3, TERMINAL_APPLICATION_STATES
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA_VERSION = 2
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS applications (
+    instance_id TEXT NOT NULL,
+    id TEXT NOT NULL,
+    state TEXT,
+    spark_application_id TEXT,
+    spark_application_name TEXT,
+    submission_time INTEGER,
+    start_time INTEGER,
+    end_time INTEGER,
+    application TEXT NOT NULL,
+    removed INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (instance_id, id)
+);
+CREATE INDEX IF NOT EXISTS applications_state ON applications (instance_id, state);
+CREATE INDEX IF NOT EXISTS applications_submission_time ON applications (instance_id, submission_time);
+CREATE INDEX IF NOT EXISTS applications_name ON applications (instance_id, spark_application_name);
+CREATE TABLE IF NOT EXISTS sync_state (
+    instance_id TEXT PRIMARY KEY,
+    watermark INTEGER,
+    synced_at REAL NOT NULL
+);
+'''
+
+# The statements upgrading the schema from each earlier version.
+_MIGRATIONS = {
+    1: 'ALTER TABLE applications ADD COLUMN removed INTEGER NOT NULL DEFAULT 0',
+}
+
+_UPSERT = (
+    'INSERT OR REPLACE INTO applications (instance_id, id, state, spark_application_id, spark_application_name, '
+    'submission_time, start_time, end_time, application) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)'
+)
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+class ApplicationHistory:
+    """
+    A local SQLite database mirroring the Spark applications of an Analytics
+    Engine instance, for querying the application history offline.
+
+    The first `sync()` lists every application of the instance. Later syncs only
+    list the applications submitted since the last one (the watermark), together
+    with those still in a non-terminal state, so their state stays current.
+    Applications removed by the service are kept. Those removed before they
+    reached a terminal state are marked `removed` once a sync no longer lists
+    them, and are no longer listed again.
+
+    Times are stored as nanoseconds since the Unix epoch, and every application
+    is stored as received from the service. The database is indexed on state,
+    submission time and application name.
+
+    ApplicationHistory objects may be shared between threads.
+    """
+
+    def __init__(
+        self,
+        database: str,
+        *,
+        client: IbmAnalyticsEngineApiV3 = None,
+        instance_id: str,
+        overlap: float = 300.0,
+        limit: int = None,
+    ) -> None:
+        """
+        Open or create an application history.
+
+        :param str database: Path of the SQLite database file, or ':memory:'. A
+               database may hold the history of several instances.
+        :param IbmAnalyticsEngineApiV3 client: (optional) The client used to list
+               applications. Without a client, the history can be queried but not
+               synced.
+        :param str instance_id: The identifier of the Analytics Engine instance
+               associated with the Spark application(s).
+        :param float overlap: (optional) Seconds before the watermark that each
+               sync lists again, so that applications that became visible late
+               are not missed.
+        :param int limit: (optional) Number of application entries requested per
+               page.
+        """
+        if not instance_id:
+            raise ValueError('instance_id must be provided')
+        if overlap < 0:
+            raise ValueError('overlap must not be negative')
+        self.client = client
+        self.instance_id = instance_id
+        self.overlap = overlap
+        self.limit = limit
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(database, check_same_thread=False)
+        self._connection.row_factory = sqlite3.Row
+        try:
+            self._open_schema(database)
+        except BaseException:
+            self._connection.close()
+            raise
+
+    def sync(self) -> int:
+        """
+        Bring the history up to date with the service.
+
+        Applications without an `id` cannot be stored, and are skipped.
+
+        :return: The number of applications received.
+        :rtype: int
+        """
+        if self.client is None:
+            raise ValueError('client must be provided')
+        with self._lock:
+            lower = self._sync_lower_bound()
+        pager = ApplicationsPager(
+            client=self.client,
+            instance_id=self.instance_id,
+            submission_time_interval='{0},CURRENT'.format(
+                'BEGINNING' if lower is None else datetime_to_string(_from_epoch_ns(lower))
+            ),
+            limit=self.limit,
+        )
+
+        received = 0
+        listed = set()
+        while pager.has_next():
+            page = pager.get_next()
+            rows = [self._row(application) for application in page if application.get('id') is not None]
+            if len(rows) < len(page):
+                logger.warning('Skipping %d applications without an id', len(page) - len(rows))
+            with self._lock, self._connection:
+                self._connection.executemany(_UPSERT, rows)
+            listed.update(row[1] for row in rows)
+            received += len(page)
+
+        with self._lock, self._connection:
+            self._mark_removed(lower, listed)
+            self._connection.execute(
+                'INSERT OR REPLACE INTO sync_state (instance_id, watermark, synced_at) VALUES '
+                '(?, (SELECT MAX(submission_time) FROM applications WHERE instance_id = ?), ?)',
+                (self.instance_id, self.instance_id, time.time()),
+            )
+        return received
+
+    def query(
+        self,
+        *,
+        state: List[str] = None,
+        name: str = None,
+        submitted_after: datetime = None,
+        submitted_before: datetime = None,
+        limit: int = None,
+    ) -> List[dict]:
+        """
+        Return applications from the history, most recently submitted first.
+
+        :param List[str] state: (optional) Only return applications in these
+               states.
+        :param str name: (optional) Only return applications with this Spark
+               application name.
+        :param datetime submitted_after: (optional) Inclusive lower bound of the
+               submission time.
+        :param datetime submitted_before: (optional) Exclusive upper bound of the
+               submission time.
+        :param int limit: (optional) Maximum number of applications to return.
+        :return: A List[dict], where each element is a dict that represents an instance of Application.
+        :rtype: List[dict]
+        """
+        conditions = ['instance_id = ?']
+        parameters = [self.instance_id]
+        if state:
+            states = [getattr(s, 'value', s) for s in state]
+            conditions.append('state IN ({0})'.format(', '.join('?' * len(states))))
+            parameters.extend(states)
+        if name is not None:
+            conditions.append('spark_application_name = ?')
+            parameters.append(name)
+        if submitted_after is not None:
+            conditions.append('submission_time >= ?')
+            parameters.append(datetime_to_epoch_ns(submitted_after))
+        if submitted_before is not None:
+            conditions.append('submission_time < ?')
+            parameters.append(datetime_to_epoch_ns(submitted_before))
+        sql = 'SELECT application FROM applications WHERE {0} ORDER BY submission_time DESC'.format(
+            ' AND '.join(conditions)
+        )
+        if limit is not None:
+            sql += ' LIMIT ?'
+            parameters.append(limit)
+        with self._lock:
+            rows = self._connection.execute(sql, parameters).fetchall()
+        return [json.loads(row['application']) for row in rows]
+
+    def count(self) -> int:
+        """
+        Return the number of applications in the history of the instance.
+
+        :rtype: int
+        """
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT COUNT(*) FROM applications WHERE instance_id = ?', (self.instance_id,)
+            ).fetchone()
+        return row[0]
+
+    @property
+    def watermark(self) -> Optional[datetime]:
+        """The latest submission time received by the last sync, or None before the first sync."""
+        with self._lock:
+            row = self._sync_state()
+        if row is None or row['watermark'] is None:
+            return None
+        return _from_epoch_ns(row['watermark'])
+
+    @property
+    def synced_at(self) -> Optional[float]:
+        """The time of the last sync, in seconds since the epoch, or None before the first sync."""
+        with self._lock:
+            row = self._sync_state()
+        return None if row is None else row['synced_at']
+
+    def connection(self) -> sqlite3.Connection:
+        """
+        Return the underlying SQLite connection, for queries `query()` does not
+        cover. Do not use it while other threads use this object.
+
+        :rtype: sqlite3.Connection
+        """
+        return self._connection
+
+    def close(self) -> None:
+        """
+        Close the database.
+        """
+        self._connection.close()
+
+    def __enter__(self) -> 'ApplicationHistory':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _open_schema(self, database: str) -> None:
+        with self._connection:
+            version = self._connection.execute('PRAGMA user_version').fetchone()[0]
+            if version > _SCHEMA_VERSION:
+                raise ValueError(
+                    'The application history {0} has schema version {1}, newer than the supported version {2}'.format(
+                        database, version, _SCHEMA_VERSION
+                    )
+                )
+            if version == 0:
+                self._connection.executescript(_SCHEMA)
+            else:
+                for from_version in range(version, _SCHEMA_VERSION):
+                    self._connection.execute(_MIGRATIONS[from_version])
+            self._connection.execute('PRAGMA user_version = {0}'.format(_SCHEMA_VERSION))
+
+    def _sync_state(self) -> Optional[sqlite3.Row]:
+        return self._connection.execute(
+            'SELECT watermark, synced_at FROM sync_state WHERE instance_id = ?', (self.instance_id,)
+        ).fetchone()
+
+    def _sync_lower_bound(self) -> Optional[int]:
+        # The earliest submission time the next sync must list: the watermark
+        # less the overlap, or the oldest application that may still change.
+        row = self._sync_state()
+        if row is None or row['watermark'] is None:
+            return None
+        lower = row['watermark'] - int(self.overlap * 1000000000)
+        states = sorted(TERMINAL_APPLICATION_STATES)
+        active = self._connection.execute(
+            'SELECT MIN(submission_time) FROM applications WHERE instance_id = ? AND submission_time IS NOT NULL '
+            'AND removed = 0 AND (state IS NULL OR state NOT IN ({0}))'.format(', '.join('?' * len(states))),
+            [self.instance_id] + states,
+        ).fetchone()[0]
+        if active is not None:
+            lower = min(lower, active)
+        return lower
+
+    def _mark_removed(self, lower: Optional[int], listed: set) -> None:
+        # Marks the applications that may still change and were submitted
+        # within the listing, but were not listed: the service removed them
+        # before they reached a terminal state.
+        states = sorted(TERMINAL_APPLICATION_STATES)
+        sql = (
+            'SELECT id FROM applications WHERE instance_id = ? AND removed = 0 '
+            'AND (state IS NULL OR state NOT IN ({0}))'.format(', '.join('?' * len(states)))
+        )
+        parameters = [self.instance_id] + states
+        if lower is not None:
+            sql += ' AND submission_time >= ?'
+            parameters.append(lower)
+        removed = [
+            (self.instance_id, row['id'])
+            for row in self._connection.execute(sql, parameters)
+            if row['id'] not in listed
+        ]
+        if removed:
+            logger.debug('Marking %d applications no longer listed by the service as removed', len(removed))
+            self._connection.executemany(
+                'UPDATE applications SET removed = 1 WHERE instance_id = ? AND id = ?', removed
+            )
+
+    def _row(self, application: dict) -> tuple:
+        return (
+            self.instance_id,
+            application.get('id'),
+            application.get('state'),
+            application.get('spark_application_id'),
+            application.get('spark_application_name'),
+            _epoch_ns_or_none(application.get('submission_time')),
+            _epoch_ns_or_none(application.get('start_time')),
+            _epoch_ns_or_none(application.get('end_time')),
+            json.dumps(application),
+        )
+
+
+def _epoch_ns_or_none(value: Optional[str]) -> Optional[int]:
+    epoch_ns = datetime_to_epoch_ns(value)
+    return None if epoch_ns == NULL_TIMESTAMP else epoch_ns
+
+
+def _from_epoch_ns(epoch_ns: int) -> datetime:
+    return _EPOCH + timedelta(microseconds=epoch_ns // 1000)
@@ -37,19 +37,47 @@ from ibm_cloud_sdk_core.utils import (
     string_to_datetime,
 )
 
-from .common import get_sdk_headers
+from .common import ClientFeaturesMixin, OperationRoute, OperationRouteMixin, RequestPipelineMixin, get_sdk_headers
 
 ##############################################################################
 # Service
 ##############################################################################
 
 
-class IbmAnalyticsEngineApiV2(BaseService):
+class IbmAnalyticsEngineApiV2(OperationRouteMixin, ClientFeaturesMixin, RequestPipelineMixin, BaseService):
     """The IBM Analytics Engine API V2 service."""
 
     DEFAULT_SERVICE_URL = "https://ibm-analytics-engine-api.cloud.ibm.com"
     DEFAULT_SERVICE_NAME = "ibm_analytics_engine_api"
 
+    # The operations of the service, for OperationRouteMixin.
+    _OPERATION_ROUTES = (
+        OperationRoute("get_all_analytics_engines", "GET", "/v2/analytics_engines"),
+        OperationRoute("get_analytics_engine_by_id", "GET", "/v2/analytics_engines/{instance_guid}"),
+        OperationRoute("get_analytics_engine_state_by_id", "GET", "/v2/analytics_engines/{instance_guid}/state"),
+        OperationRoute(
+            "create_customization_request", "POST", "/v2/analytics_engines/{instance_guid}/customization_requests"
+        ),
+        OperationRoute(
+            "get_all_customization_requests", "GET", "/v2/analytics_engines/{instance_guid}/customization_requests"
+        ),
+        OperationRoute(
+            "get_customization_request_by_id",
+            "GET",
+            "/v2/analytics_engines/{instance_guid}/customization_requests/{request_id}",
+        ),
+        OperationRoute("resize_cluster", "POST", "/v2/analytics_engines/{instance_guid}/resize"),
+        OperationRoute("reset_cluster_password", "POST", "/v2/analytics_engines/{instance_guid}/reset_password"),
+        OperationRoute("configure_logging", "PUT", "/v2/analytics_engines/{instance_guid}/log_config"),
+        OperationRoute("get_logging_config", "GET", "/v2/analytics_engines/{instance_guid}/log_config"),
+        OperationRoute("delete_logging_config", "DELETE", "/v2/analytics_engines/{instance_guid}/log_config"),
+        OperationRoute(
+            "update_private_endpoint_whitelist",
+            "PATCH",
+            "/v2/analytics_engines/{instance_guid}/private_endpoint_whitelist",
+        ),
+    )
+
     @classmethod
     def new_instance(
         cls,
@@ -76,6 +104,10 @@ class IbmAnalyticsEngineApiV2(BaseService):
                about initializing the authenticator of your choice.
         """
         BaseService.__init__(self, service_url=self.DEFAULT_SERVICE_URL, authenticator=authenticator)
+        self._single_flight = None
+        self._transport = None
+        self._request_meter = None
+        self._request_tracer = None
 
     #########################
     # Analytics Engines V2
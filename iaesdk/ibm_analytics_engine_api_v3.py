@@ -22,25 +22,36 @@ Manage serverless Spark instances and run applications.
 API Version: 3.0.0
 """
 
-from datetime import datetime
+from collections import deque
+from datetime import date, datetime, timezone
 from enum import Enum
-from typing import Dict, List
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, List, Optional, Tuple, Union
 import json
 import logging
+import random
+import re
+import threading
+import time
 
 from ibm_cloud_sdk_core import BaseService, DetailedResponse
 from ibm_cloud_sdk_core.authenticators.authenticator import Authenticator
 from ibm_cloud_sdk_core.get_authenticator import get_authenticator_from_environment
 from ibm_cloud_sdk_core.utils import convert_list, convert_model, datetime_to_string, string_to_datetime
 
-from .common import get_sdk_headers
+from .caching import ResponseCache, cached_response, invalidates_cached_responses
+from .common import ClientFeaturesMixin, OperationRoute, OperationRouteMixin, RequestPipelineMixin, get_sdk_headers
+
+# The modules of the optional features are imported when a feature is enabled.
+if TYPE_CHECKING:  # pragma: no cover
+    from .columnar import ApplicationColumns
+    from .routing import LatencyRouter
 
 ##############################################################################
 # Service
 ##############################################################################
 
 
-class IbmAnalyticsEngineApiV3(BaseService):
+class IbmAnalyticsEngineApiV3(OperationRouteMixin, ClientFeaturesMixin, RequestPipelineMixin, BaseService):
     """The IBM Analytics Engine API V3 service."""
 
     DEFAULT_SERVICE_URL = 'https://api.us-south.ae.cloud.ibm.com'
@@ -51,6 +62,71 @@ class IbmAnalyticsEngineApiV3(BaseService):
         'eu-de': 'https://api.eu-de.ae.cloud.ibm.com',
     }
 
+    # Seconds for which enable_response_cache() keeps the responses of each
+    # read-mostly operation.
+    DEFAULT_RESPONSE_CACHE_TTLS = {
+        'get_instance': 30.0,
+        'get_instance_default_configs': 300.0,
+        'get_instance_default_runtime': 300.0,
+        'get_log_forwarding_config': 300.0,
+        'get_resource_consumption_limits': 300.0,
+    }
+
+    # The operations of the service, for OperationRouteMixin.
+    _OPERATION_ROUTES = (
+        OperationRoute('get_instance', 'GET', '/v3/analytics_engines/{instance_id}'),
+        OperationRoute('get_instance_state', 'GET', '/v3/analytics_engines/{instance_id}/state'),
+        OperationRoute('set_instance_home', 'PUT', '/v3/analytics_engines/{instance_id}/instance_home'),
+        OperationRoute(
+            'update_instance_home_credentials', 'PATCH', '/v3/analytics_engines/{instance_id}/instance_home'
+        ),
+        OperationRoute('get_instance_default_configs', 'GET', '/v3/analytics_engines/{instance_id}/default_configs'),
+        OperationRoute(
+            'replace_instance_default_configs', 'PUT', '/v3/analytics_engines/{instance_id}/default_configs'
+        ),
+        OperationRoute(
+            'update_instance_default_configs', 'PATCH', '/v3/analytics_engines/{instance_id}/default_configs'
+        ),
+        OperationRoute('get_instance_default_runtime', 'GET', '/v3/analytics_engines/{instance_id}/default_runtime'),
+        OperationRoute(
+            'replace_instance_default_runtime', 'PUT', '/v3/analytics_engines/{instance_id}/default_runtime'
+        ),
+        OperationRoute('create_application', 'POST', '/v3/analytics_engines/{instance_id}/spark_applications'),
+        OperationRoute('list_applications', 'GET', '/v3/analytics_engines/{instance_id}/spark_applications'),
+        OperationRoute(
+            'get_application', 'GET', '/v3/analytics_engines/{instance_id}/spark_applications/{application_id}'
+        ),
+        OperationRoute(
+            'delete_application', 'DELETE', '/v3/analytics_engines/{instance_id}/spark_applications/{application_id}'
+        ),
+        OperationRoute(
+            'get_application_state',
+            'GET',
+            '/v3/analytics_engines/{instance_id}/spark_applications/{application_id}/state',
+        ),
+        OperationRoute(
+            'get_current_resource_consumption',
+            'GET',
+            '/v3/analytics_engines/{instance_id}/current_resource_consumption',
+        ),
+        OperationRoute(
+            'get_resource_consumption_limits', 'GET', '/v3/analytics_engines/{instance_id}/resource_consumption_limits'
+        ),
+        OperationRoute(
+            'replace_log_forwarding_config', 'PUT', '/v3/analytics_engines/{instance_id}/log_forwarding_config'
+        ),
+        OperationRoute('get_log_forwarding_config', 'GET', '/v3/analytics_engines/{instance_id}/log_forwarding_config'),
+        OperationRoute('configure_platform_logging', 'PUT', '/v3/analytics_engines/{instance_guid}/logging'),
+        OperationRoute('get_logging_configuration', 'GET', '/v3/analytics_engines/{instance_guid}/logging'),
+        OperationRoute(
+            'start_spark_history_server', 'POST', '/v3/analytics_engines/{instance_id}/spark_history_server'
+        ),
+        OperationRoute('get_spark_history_server', 'GET', '/v3/analytics_engines/{instance_id}/spark_history_server'),
+        OperationRoute(
+            'stop_spark_history_server', 'DELETE', '/v3/analytics_engines/{instance_id}/spark_history_server'
+        ),
+    )
+
     @classmethod
     def new_instance(
         cls,
@@ -91,11 +167,18 @@ class IbmAnalyticsEngineApiV3(BaseService):
                about initializing the authenticator of your choice.
         """
         BaseService.__init__(self, service_url=self.DEFAULT_SERVICE_URL, authenticator=authenticator)
+        self._response_cache = None
+        self._single_flight = None
+        self._transport = None
+        self._latency_router = None
+        self._request_meter = None
+        self._request_tracer = None
 
     #########################
     # Analytics Engines V3
     #########################
 
+    @cached_response('get_instance')
     def get_instance(self, instance_id: str, **kwargs) -> DetailedResponse:
         """
         Find Analytics Engine by id.
@@ -166,6 +249,7 @@ class IbmAnalyticsEngineApiV3(BaseService):
         response = self.send(request, **kwargs)
         return response
 
+    @invalidates_cached_responses('get_instance')
     def set_instance_home(
         self,
         instance_id: str,
@@ -241,6 +325,7 @@ class IbmAnalyticsEngineApiV3(BaseService):
         response = self.send(request, **kwargs)
         return response
 
+    @invalidates_cached_responses('get_instance')
     def update_instance_home_credentials(
         self, instance_id: str, hmac_access_key: str, hmac_secret_key: str, **kwargs
     ) -> DetailedResponse:
@@ -298,6 +383,7 @@ class IbmAnalyticsEngineApiV3(BaseService):
         response = self.send(request, **kwargs)
         return response
 
+    @cached_response('get_instance_default_configs')
     def get_instance_default_configs(self, instance_id: str, **kwargs) -> DetailedResponse:
         """
         Get instance default Spark configurations.
@@ -333,6 +419,7 @@ class IbmAnalyticsEngineApiV3(BaseService):
         response = self.send(request, **kwargs)
         return response
 
+    @invalidates_cached_responses('get_instance', 'get_instance_default_configs')
     def replace_instance_default_configs(self, instance_id: str, body: dict, **kwargs) -> DetailedResponse:
         """
         Replace instance default Spark configurations.
@@ -377,6 +464,7 @@ class IbmAnalyticsEngineApiV3(BaseService):
         response = self.send(request, **kwargs)
         return response
 
+    @invalidates_cached_responses('get_instance', 'get_instance_default_configs')
     def update_instance_default_configs(self, instance_id: str, body: dict, **kwargs) -> DetailedResponse:
         """
         Update instance default Spark configurations.
@@ -420,6 +508,7 @@ class IbmAnalyticsEngineApiV3(BaseService):
         response = self.send(request, **kwargs)
         return response
 
+    @cached_response('get_instance_default_runtime')
     def get_instance_default_runtime(self, instance_id: str, **kwargs) -> DetailedResponse:
         """
         Get instance default runtime.
@@ -455,6 +544,7 @@ class IbmAnalyticsEngineApiV3(BaseService):
         response = self.send(request, **kwargs)
         return response
 
+    @invalidates_cached_responses('get_instance', 'get_instance_default_runtime')
     def replace_instance_default_runtime(
         self, instance_id: str, *, spark_version: str = None, **kwargs
     ) -> DetailedResponse:
@@ -794,6 +884,7 @@ class IbmAnalyticsEngineApiV3(BaseService):
         response = self.send(request, **kwargs)
         return response
 
+    @cached_response('get_resource_consumption_limits')
     def get_resource_consumption_limits(self, instance_id: str, **kwargs) -> DetailedResponse:
         """
         Get resource consumption limits.
@@ -829,6 +920,7 @@ class IbmAnalyticsEngineApiV3(BaseService):
         response = self.send(request, **kwargs)
         return response
 
+    @invalidates_cached_responses('get_log_forwarding_config')
     def replace_log_forwarding_config(
         self, instance_id: str, *, enabled: bool = None, sources: List[str] = None, tags: List[str] = None, **kwargs
     ) -> DetailedResponse:
@@ -881,6 +973,7 @@ class IbmAnalyticsEngineApiV3(BaseService):
         response = self.send(request, **kwargs)
         return response
 
+    @cached_response('get_log_forwarding_config')
     def get_log_forwarding_config(self, instance_id: str, **kwargs) -> DetailedResponse:
         """
         Get log forwarding configuration.
@@ -1109,6 +1202,267 @@ class IbmAnalyticsEngineApiV3(BaseService):
         response = self.send(request, **kwargs)
         return response
 
+    #########################
+    # Convenience methods
+    #########################
+
+    def enable_latency_routing(
+        self,
+        endpoints: Dict[str, str],
+        *,
+        probe_interval: float = 300.0,
+        probe_timeout: float = 2.0,
+        check_ttl: float = 3600.0,
+    ) -> 'LatencyRouter':
+        """
+        Send read-only requests for an instance to the endpoint with the lowest
+        round-trip latency among those serving the instance, instead of always to
+        the service URL.
+
+        Latencies are measured in the background and measured again every
+        `probe_interval` seconds; until the first measurement completes, requests
+        go to the service URL. Whether an endpoint serves an instance is checked
+        with a request for the instance state, whose answer is kept for
+        `check_ttl` seconds. Requests that change resources always go to the
+        service URL.
+
+        The requests routed to an endpoint, and those checking whether it serves
+        an instance, carry the credentials of the client, such as its bearer
+        token. List only endpoints trusted with them.
+
+        :param Dict[str, str] endpoints: The endpoints trusted with the
+               credentials of the client, by name, such as REGIONAL_ENDPOINTS.
+        :param float probe_interval: (optional) Seconds after which latencies are
+               measured again.
+        :param float probe_timeout: (optional) Timeout of each latency probe, in
+               seconds.
+        :param float check_ttl: (optional) Seconds for which the answer of a
+               check of whether an endpoint serves an instance is kept.
+        :return: The router, for inspecting the measured latencies.
+        :rtype: LatencyRouter
+        """
+        from .routing import LatencyRouter  # pylint: disable=import-outside-toplevel
+
+        self._latency_router = LatencyRouter(
+            endpoints,
+            probe_interval=probe_interval,
+            probe_timeout=probe_timeout,
+            check_ttl=check_ttl,
+            session=self.http_client,
+        )
+        return self._latency_router
+
+    def disable_latency_routing(self) -> None:
+        """
+        Send every request to the service URL.
+        """
+        self._latency_router = None
+
+    def enable_response_cache(self, ttls: Dict[str, float] = None, *, max_entries: int = 256) -> None:
+        """
+        Serve repeated calls to read-mostly operations from an in-memory cache.
+
+        The cached operations are `get_instance`, `get_instance_default_configs`,
+        `get_instance_default_runtime`, `get_log_forwarding_config` and
+        `get_resource_consumption_limits`. Their responses are kept for the
+        number of seconds in `DEFAULT_RESPONSE_CACHE_TTLS`, unless overridden by
+        `ttls`; a TTL of 0 disables caching for that operation. Calls made through
+        this client that modify an instance drop its affected responses; changes
+        made by other clients are only seen once the TTL has expired.
+
+        Calls that pass request headers bypass the cache.
+
+        :param Dict[str, float] ttls: (optional) Time-to-live in seconds for the
+               responses of each operation, keyed by operation name.
+        :param int max_entries: (optional) Maximum number of cached responses. The
+               least recently used responses are evicted first.
+        """
+        self._response_cache = ResponseCache(
+            dict(self.DEFAULT_RESPONSE_CACHE_TTLS, **(ttls or {})), max_entries=max_entries
+        )
+
+    def disable_response_cache(self) -> None:
+        """
+        Stop caching responses and drop all cached responses.
+        """
+        self._response_cache = None
+
+    def invalidate_response_cache(self, instance_id: str = None) -> None:
+        """
+        Drop cached responses.
+
+        :param str instance_id: (optional) Only drop the responses for this
+               instance.
+        """
+        if self._response_cache is not None:
+            self._response_cache.invalidate(instance_id)
+
+    def iter_applications(
+        self,
+        instance_id: str,
+        *,
+        state: List[str] = None,
+        start_time_interval: str = None,
+        submission_time_interval: str = None,
+        end_time_interval: str = None,
+        limit: int = None,
+        prefetch_depth: int = 0,
+        as_dict: bool = False,
+        compact: bool = False,
+    ) -> Iterator[Union['Application', 'CompactApplication', dict]]:
+        """
+        Iterate over the Spark applications of an instance.
+
+        Pages of the "list_applications" operation are requested as the iterator
+        advances and each page is released once its applications have been yielded,
+        so memory use does not grow with the length of the instance history. Closing
+        the iterator (or leaving a `for` loop early) stops further requests.
+
+        :param str instance_id: The identifier of the Analytics Engine instance
+               associated with the Spark application(s).
+        :param List[str] state: (optional) List of Spark application states that
+               will be used to filter the response.
+        :param str start_time_interval: (optional) Time interval to use for
+               filtering applications by their start time.
+        :param str submission_time_interval: (optional) Time interval to use for
+               filtering applications by their submission time.
+        :param str end_time_interval: (optional) Time interval to use for filtering
+               applications by their end time.
+        :param int limit: (optional) Number of application entries requested per
+               page.
+        :param int prefetch_depth: (optional) Number of pages to request ahead on a
+               background thread. See `ApplicationsPager`.
+        :param bool as_dict: (optional) Yield the raw `dict` of each application
+               instead of an `Application` object.
+        :param bool compact: (optional) Yield `CompactApplication` objects, which
+               take less memory and parse their times when first read, instead of
+               `Application` objects.
+        :return: An iterator of `Application` objects, of `CompactApplication`
+                 objects when `compact` is set, or of `dict` when `as_dict` is set.
+        :rtype: Iterator[Application]
+        """
+
+        if not instance_id:
+            raise ValueError('instance_id must be provided')
+        if as_dict and compact:
+            raise ValueError('as_dict and compact cannot both be set')
+        pager = ApplicationsPager(
+            client=self,
+            instance_id=instance_id,
+            state=state,
+            start_time_interval=start_time_interval,
+            submission_time_interval=submission_time_interval,
+            end_time_interval=end_time_interval,
+            limit=limit,
+            prefetch_depth=prefetch_depth,
+        )
+        return self._iter_pages(pager, None if as_dict else CompactApplication if compact else Application)
+
+    def wait_for_application(
+        self,
+        instance_id: str,
+        application_id: str,
+        *,
+        target_states: List[str] = None,
+        timeout: float = None,
+        initial_interval: float = 1.0,
+        max_interval: float = 30.0,
+        backoff_factor: float = 2.0,
+        jitter: float = 0.2,
+        auto_termination_grace: float = 60.0,
+        **kwargs,
+    ) -> 'ApplicationGetStateResponse':
+        """
+        Wait for a Spark application to reach one of the given states.
+
+        The application state is polled with exponential backoff: the first poll is
+        immediate, then the wait between polls starts at `initial_interval` and is
+        multiplied by `backoff_factor` up to `max_interval`, with each wait randomized
+        by +/- `jitter`. Waiting also stops when the application reaches a terminal
+        state, even if that state is not one of `target_states`.
+
+        The application's `auto_termination_time` acts as a deadline: the service
+        stops the application at that time, so polling continues for at most
+        `auto_termination_grace` seconds after it.
+
+        :param str instance_id: Identifier of the instance to which the
+               application belongs.
+        :param str application_id: Identifier of the application to wait for.
+        :param List[str] target_states: (optional) States to wait for. Defaults to
+               the terminal states.
+        :param float timeout: (optional) Maximum number of seconds to wait.
+        :param float initial_interval: (optional) Seconds to wait before the second
+               poll.
+        :param float max_interval: (optional) Upper bound of the wait between polls.
+        :param float backoff_factor: (optional) Factor the wait grows by after each
+               poll.
+        :param float jitter: (optional) Relative amount of randomization applied to
+               each wait.
+        :param float auto_termination_grace: (optional) Seconds to keep polling after
+               the application's `auto_termination_time`.
+        :param dict headers: A `dict` containing the request headers
+        :return: The state of the application when waiting stopped.
+        :rtype: ApplicationGetStateResponse
+        :raises TimeoutError: if the application did not reach a target or
+                terminal state before the deadline.
+        """
+
+        if not instance_id:
+            raise ValueError('instance_id must be provided')
+        if not application_id:
+            raise ValueError('application_id must be provided')
+        target_states = {getattr(s, 'value', s) for s in target_states or TERMINAL_APPLICATION_STATES}
+        deadline = None if timeout is None else time.monotonic() + timeout
+        interval = initial_interval
+
+        while True:
+            result = self.get_application_state(instance_id, application_id, **kwargs).get_result()
+            state = result.get('state')
+            if state in target_states or state in TERMINAL_APPLICATION_STATES:
+                return ApplicationGetStateResponse.from_dict(result)
+
+            now = time.monotonic()
+            wait_deadline = deadline
+            auto_termination_time = result.get('auto_termination_time')
+            if auto_termination_time is not None:
+                until_termination = (
+                    string_to_datetime(auto_termination_time) - datetime.now(timezone.utc)
+                ).total_seconds()
+                termination_deadline = now + until_termination + auto_termination_grace
+                if wait_deadline is None or termination_deadline < wait_deadline:
+                    wait_deadline = termination_deadline
+            else:
+                until_termination = None
+            if wait_deadline is not None and now >= wait_deadline:
+                raise TimeoutError(
+                    'application {0} is still in state {1!r} after waiting for it'.format(application_id, state)
+                )
+
+            delay = interval * random.uniform(1.0 - jitter, 1.0 + jitter)
+            # Poll as soon as the application is due to be terminated, rather than
+            # sleeping past it.
+            if until_termination is not None and 0 < until_termination < delay:
+                delay = until_termination
+            if wait_deadline is not None:
+                delay = min(delay, wait_deadline - now)
+            time.sleep(max(delay, 0.0))
+            interval = min(interval * backoff_factor, max_interval)
+
+    @staticmethod
+    def _iter_pages(pager: 'ApplicationsPager', model: Optional[type]) -> Iterator[Union['Application', dict]]:
+        # Yields the dicts of the applications, or the `model` objects built from them.
+        try:
+            while pager.has_next():
+                page = pager.get_next()
+                if model is None:
+                    yield from page
+                else:
+                    for application in page:
+                        yield model.from_dict(application)
+                del page
+        finally:
+            pager.close()
+
 
 class ListApplicationsEnums:
     """
@@ -1129,6 +1483,18 @@ class ListApplicationsEnums:
         OPS_TERMINATED = 'ops_terminated'
 
 
+# Spark application states from which an application does not move on.
+TERMINAL_APPLICATION_STATES = frozenset(
+    {
+        ListApplicationsEnums.State.FINISHED.value,
+        ListApplicationsEnums.State.FAILED.value,
+        ListApplicationsEnums.State.STOPPED.value,
+        ListApplicationsEnums.State.AUTO_TERMINATED.value,
+        ListApplicationsEnums.State.OPS_TERMINATED.value,
+    }
+)
+
+
 ##############################################################################
 # Models
 ##############################################################################
@@ -1314,6 +1680,243 @@ class Application:
         OPS_TERMINATED = 'ops_terminated'
 
 
+# The codes of the states in ApplicationColumns.
+_APPLICATION_STATES = tuple(state.value for state in Application.StateEnum)
+
+# The form of the timestamps sent by the service, such as
+# 2021-01-30T08:30:00.000Z.
+_TIMESTAMP_PATTERN = re.compile(
+    r'(\d{4})-(0[1-9]|1[0-2])-(0[1-9]|[12]\d|3[01])T([01]\d|2[0-3]):[0-5]\d'
+    r'(?::[0-5]\d(?:\.\d{1,9})?)?(?:Z|[+-](?:[01]\d|2[0-3]):?[0-5]\d)?'
+)
+
+
+def _is_timestamp(value: str) -> bool:
+    # True when `value` is a timestamp that string_to_datetime() parses.
+    match = _TIMESTAMP_PATTERN.fullmatch(value)
+    if match is None:
+        return False
+    year, month, day = match.group(1, 2, 3)
+    if day > '28' or year == '0000':
+        try:
+            date(int(year), int(month), int(day))
+        except ValueError:
+            return False
+    return True
+
+
+class _LazyDatetime:
+    """
+    A datetime attribute of a compact model that keeps the string it was set to,
+    and only parses it into a `datetime` when the attribute is first read. The
+    parsed value replaces the string.
+
+    Strings that are not timestamps of the form sent by the service are parsed
+    when set, so that invalid values raise from `from_dict()`.
+
+    The value is held in the `_<name>` slot of the model.
+    """
+
+    __slots__ = ('name', 'slot')
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.name = name
+        self.slot = '_' + name
+
+    def __get__(self, obj: 'CompactApplication', objtype: type = None) -> Optional[datetime]:
+        if obj is None:
+            return self
+        value = getattr(obj, self.slot)
+        if isinstance(value, str):
+            value = string_to_datetime(value)
+            setattr(obj, self.slot, value)
+        return value
+
+    def __set__(self, obj: 'CompactApplication', value: Union[datetime, str, None]) -> None:
+        if isinstance(value, str) and not _is_timestamp(value):
+            value = string_to_datetime(value)
+        setattr(obj, self.slot, value)
+
+    def string(self, obj: 'CompactApplication') -> Optional[str]:
+        """The value as an ISO 8601 string: the original string, if not parsed yet."""
+        value = getattr(obj, self.slot)
+        if value is None or isinstance(value, str):
+            return value
+        return datetime_to_string(value)
+
+
+class CompactApplication:
+    """
+    Details of a Spark application, in a compact form for keeping large numbers of
+    applications in memory. It has the attributes, `from_dict()` and `to_dict()`
+    of `Application`, but stores its attributes in `__slots__` rather than in a
+    per-instance dictionary, and keeps the times received from the service as
+    strings until they are first read. Attributes that `Application` does not
+    define cannot be set.
+
+    Returned by `IbmAnalyticsEngineApiV3.iter_applications()` with `compact` set.
+    """
+
+    __slots__ = (
+        'id',
+        'href',
+        'runtime',
+        'spark_application_id',
+        'spark_application_name',
+        'state',
+        'spark_ui',
+        '_submission_time',
+        '_start_time',
+        '_end_time',
+        '_finish_time',
+        '_auto_termination_time',
+    )
+
+    submission_time = _LazyDatetime()
+    start_time = _LazyDatetime()
+    end_time = _LazyDatetime()
+    finish_time = _LazyDatetime()
+    auto_termination_time = _LazyDatetime()
+
+    StateEnum = Application.StateEnum
+
+    def __init__(
+        self,
+        *,
+        id: str = None,
+        href: str = None,
+        runtime: 'Runtime' = None,
+        spark_application_id: str = None,
+        spark_application_name: str = None,
+        state: str = None,
+        spark_ui: str = None,
+        submission_time: Union[datetime, str] = None,
+        start_time: Union[datetime, str] = None,
+        end_time: Union[datetime, str] = None,
+        finish_time: Union[datetime, str] = None,
+        auto_termination_time: Union[datetime, str] = None,
+    ) -> None:
+        """
+        Initialize a CompactApplication object. The parameters are those of
+        `Application`; times can also be given as ISO 8601 strings.
+        """
+        self.id = id
+        self.href = href
+        self.runtime = runtime
+        self.spark_application_id = spark_application_id
+        self.spark_application_name = spark_application_name
+        self.state = state
+        self.spark_ui = spark_ui
+        self.submission_time = submission_time
+        self.start_time = start_time
+        self.end_time = end_time
+        self.finish_time = finish_time
+        self.auto_termination_time = auto_termination_time
+
+    @classmethod
+    def from_dict(cls, _dict: Dict) -> 'CompactApplication':
+        """Initialize a CompactApplication object from a json dictionary."""
+        args = {}
+        if 'id' in _dict:
+            args['id'] = _dict.get('id')
+        if 'href' in _dict:
+            args['href'] = _dict.get('href')
+        if 'runtime' in _dict:
+            args['runtime'] = Runtime.from_dict(_dict.get('runtime'))
+        if 'spark_application_id' in _dict:
+            args['spark_application_id'] = _dict.get('spark_application_id')
+        if 'spark_application_name' in _dict:
+            args['spark_application_name'] = _dict.get('spark_application_name')
+        if 'state' in _dict:
+            args['state'] = _dict.get('state')
+        if 'spark_ui' in _dict:
+            args['spark_ui'] = _dict.get('spark_ui')
+        # The times are parsed when first read.
+        if 'submission_time' in _dict:
+            args['submission_time'] = _dict.get('submission_time')
+        if 'start_time' in _dict:
+            args['start_time'] = _dict.get('start_time')
+        if 'end_time' in _dict:
+            args['end_time'] = _dict.get('end_time')
+        if 'finish_time' in _dict:
+            args['finish_time'] = _dict.get('finish_time')
+        if 'auto_termination_time' in _dict:
+            args['auto_termination_time'] = _dict.get('auto_termination_time')
+        return cls(**args)
+
+    @classmethod
+    def from_application(cls, application: Application) -> 'CompactApplication':
+        """Initialize a CompactApplication object from an Application object."""
+        return cls(**{name.lstrip('_'): getattr(application, name.lstrip('_')) for name in cls.__slots__})
+
+    def to_application(self) -> Application:
+        """Return an Application object with the attributes of this object."""
+        return Application(**{name.lstrip('_'): getattr(self, name.lstrip('_')) for name in self.__slots__})
+
+    def to_dict(self) -> Dict:
+        """Return a json dictionary representing this model."""
+        _dict = {}
+        if self.id is not None:
+            _dict['id'] = self.id
+        if self.href is not None:
+            _dict['href'] = self.href
+        if self.runtime is not None:
+            if isinstance(self.runtime, dict):
+                _dict['runtime'] = self.runtime
+            else:
+                _dict['runtime'] = self.runtime.to_dict()
+        if self.spark_application_id is not None:
+            _dict['spark_application_id'] = self.spark_application_id
+        if self.spark_application_name is not None:
+            _dict['spark_application_name'] = self.spark_application_name
+        if self.state is not None:
+            _dict['state'] = self.state
+        if self.spark_ui is not None:
+            _dict['spark_ui'] = self.spark_ui
+        for name in ('submission_time', 'start_time', 'end_time', 'finish_time', 'auto_termination_time'):
+            value = self.get_datetime_string(name)
+            if value is not None:
+                _dict[name] = value
+        return _dict
+
+    def get_datetime_string(self, name: str) -> Optional[str]:
+        """
+        Return the value of the datetime attribute `name` as an ISO 8601 string,
+        without parsing it. For values received from the service that have not
+        been read yet, this is the string exactly as received.
+
+        :param str name: The name of the datetime attribute, such as
+               `submission_time`.
+        :return: The string, or None if the attribute is not set.
+        :rtype: str
+        """
+        descriptor = getattr(type(self), name, None)
+        if not isinstance(descriptor, _LazyDatetime):
+            raise ValueError('{0} is not a datetime attribute'.format(name))
+        return descriptor.string(self)
+
+    def __str__(self) -> str:
+        """Return a `str` version of this CompactApplication object."""
+        return json.dumps(self.to_dict(), indent=2)
+
+    def __eq__(self, other: 'CompactApplication') -> bool:
+        """Return `true` when self and other are equal, false otherwise."""
+        if not isinstance(other, self.__class__):
+            return False
+        for name in self.__slots__:
+            # The slots of the times are compared first, so that equal strings
+            # are not parsed.
+            if getattr(self, name) != getattr(other, name) and (
+                not name.startswith('_') or getattr(self, name[1:]) != getattr(other, name[1:])
+            ):
+                return False
+        return True
+
+    def __ne__(self, other: 'CompactApplication') -> bool:
+        """Return `true` when self and other are not equal, false otherwise."""
+        return not self == other
+
+
 class ApplicationCollection:
     """
     A paginated collection of applications.
@@ -1414,6 +2017,25 @@ class ApplicationCollection:
         """Return a json dictionary representing this model."""
         return self.to_dict()
 
+    def to_columns(self) -> 'ApplicationColumns':
+        """
+        Return the applications in columnar form, for vectorized analytics with
+        NumPy, pandas or Arrow.
+
+        :rtype: ApplicationColumns
+        """
+        from .columnar import to_columns  # pylint: disable=import-outside-toplevel
+
+        return to_columns(self.applications, state_categories=_APPLICATION_STATES)
+
+    def to_arrow(self) -> 'pyarrow.Table':
+        """
+        Return the applications as an Arrow table. Requires pyarrow.
+
+        :rtype: pyarrow.Table
+        """
+        return self.to_columns().to_arrow()
+
     def __str__(self) -> str:
         """Return a `str` version of this ApplicationCollection object."""
         return json.dumps(self.to_dict(), indent=2)
@@ -3388,6 +4010,8 @@ class ApplicationsPager:
         submission_time_interval: str = None,
         end_time_interval: str = None,
         limit: int = None,
+        prefetch_depth: int = 0,
+        max_prefetched_items: int = None,
     ) -> None:
         """
         Initialize a ApplicationsPager object.
@@ -3418,7 +4042,15 @@ class ApplicationsPager:
                whereas the upper timestamp limit is exclusive.
         :param int limit: (optional) Number of application entries to be included
                in the response.
+        :param int prefetch_depth: (optional) Number of pages to request ahead of
+               the caller on a background thread. The default of 0 fetches each page
+               only when get_next() is called.
+        :param int max_prefetched_items: (optional) Upper bound on the number of
+               applications held in prefetched pages. At least one page is always
+               prefetched, regardless of its size.
         """
+        if prefetch_depth < 0:
+            raise ValueError('prefetch_depth must not be negative')
         self._has_next = True
         self._client = client
         self._page_context = {'next': None}
@@ -3428,6 +4060,9 @@ class ApplicationsPager:
         self._submission_time_interval = submission_time_interval
         self._end_time_interval = end_time_interval
         self._limit = limit
+        self._prefetch_depth = prefetch_depth
+        self._max_prefetched_items = max_prefetched_items
+        self._prefetcher = None
 
     def has_next(self) -> bool:
         """
@@ -3444,25 +4079,23 @@ class ApplicationsPager:
         if not self.has_next():
             raise StopIteration(message='No more results available')
 
-        result = self._client.list_applications(
-            instance_id=self._instance_id,
-            state=self._state,
-            start_time_interval=self._start_time_interval,
-            submission_time_interval=self._submission_time_interval,
-            end_time_interval=self._end_time_interval,
-            limit=self._limit,
-            start=self._page_context.get('next'),
-        ).get_result()
-
-        next = None
-        next_page_link = result.get('next')
-        if next_page_link is not None:
-            next = next_page_link.get('start')
+        if self._prefetch_depth > 0:
+            if self._prefetcher is None:
+                self._prefetcher = _PagePrefetcher(
+                    self._fetch_page,
+                    self._page_context.get('next'),
+                    depth=self._prefetch_depth,
+                    max_items=self._max_prefetched_items,
+                )
+            applications, self._has_next = self._prefetcher.next_page()
+            return applications
+
+        applications, next = self._fetch_page(self._page_context.get('next'))
         self._page_context['next'] = next
         if next is None:
             self._has_next = False
 
-        return result.get('applications')
+        return applications
 
     def get_all(self) -> List[dict]:
         """
@@ -3476,3 +4109,128 @@ class ApplicationsPager:
             next_page = self.get_next()
             results.extend(next_page)
         return results
+
+    def to_columns(self) -> 'ApplicationColumns':
+        """
+        Returns all remaining results in columnar form, for vectorized analytics
+        with NumPy, pandas or Arrow. Each page is converted as it is retrieved,
+        without keeping the pages themselves.
+        :rtype: ApplicationColumns
+        """
+        from .columnar import ApplicationColumns  # pylint: disable=import-outside-toplevel
+
+        columns = ApplicationColumns(state_categories=_APPLICATION_STATES)
+        while self.has_next():
+            columns.extend(self.get_next())
+        return columns
+
+    def to_arrow(self) -> 'pyarrow.Table':
+        """
+        Returns all remaining results as an Arrow table. Requires pyarrow.
+        :rtype: pyarrow.Table
+        """
+        return self.to_columns().to_arrow()
+
+    def close(self) -> None:
+        """
+        Stops prefetching further pages. Pages already received are discarded.
+        """
+        if self._prefetcher is not None:
+            self._prefetcher.close()
+        self._has_next = False
+
+    def _fetch_page(self, start: Optional[str]) -> Tuple[List[dict], Optional[str]]:
+        result = self._client.list_applications(
+            instance_id=self._instance_id,
+            state=self._state,
+            start_time_interval=self._start_time_interval,
+            submission_time_interval=self._submission_time_interval,
+            end_time_interval=self._end_time_interval,
+            limit=self._limit,
+            start=start,
+        ).get_result()
+
+        next = None
+        next_page_link = result.get('next')
+        if next_page_link is not None:
+            next = next_page_link.get('start')
+        return result.get('applications'), next
+
+
+class _PagePrefetcher:
+    """
+    Fetches the pages of a collection on a background thread, staying at most
+    `depth` pages (and `max_items` items) ahead of the consumer.
+    """
+
+    def __init__(
+        self,
+        fetch_page: Callable[[Optional[str]], Tuple[List[dict], Optional[str]]],
+        start: Optional[str],
+        *,
+        depth: int,
+        max_items: int = None,
+    ) -> None:
+        self._fetch_page = fetch_page
+        self._depth = depth
+        self._max_items = max_items
+        self._condition = threading.Condition()
+        self._pages = deque()
+        self._buffered_items = 0
+        self._exhausted = False
+        self._error = None
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, args=(start,), name='iaesdk-pager-prefetch', daemon=True)
+        self._thread.start()
+
+    def next_page(self) -> Tuple[List[dict], bool]:
+        """
+        Wait for the next page. Returns the page and whether more pages follow.
+        """
+        with self._condition:
+            while not self._pages and self._error is None:
+                self._condition.wait()
+            if not self._pages:
+                raise self._error
+            page = self._pages.popleft()
+            self._buffered_items -= len(page)
+            self._condition.notify_all()
+            return page, bool(self._pages) or not self._exhausted
+
+    def close(self) -> None:
+        with self._condition:
+            self._closed = True
+            self._pages.clear()
+            self._condition.notify_all()
+
+    def _is_full(self) -> bool:
+        if len(self._pages) >= self._depth:
+            return True
+        return bool(self._pages) and self._max_items is not None and self._buffered_items >= self._max_items
+
+    def _run(self, start: Optional[str]) -> None:
+        while True:
+            with self._condition:
+                while self._is_full() and not self._closed:
+                    self._condition.wait()
+                if self._closed:
+                    return
+            try:
+                page, start = self._fetch_page(start)
+                # A page without its collection property has no items.
+                page = page or []
+                with self._condition:
+                    if self._closed:
+                        return
+                    self._pages.append(page)
+                    self._buffered_items += len(page)
+                    self._exhausted = start is None
+                    self._condition.notify_all()
+            except Exception as error:  # pylint: disable=broad-except
+                # Raised by next_page(), rather than leaving the consumer waiting.
+                with self._condition:
+                    self._error = error
+                    self._condition.notify_all()
+                return
+            if start is None:
+                return
@@ -0,0 +1,700 @@
+# coding: utf-8
+
+# (C) Copyright IBM Corp. 2024.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+asyncio client for the IBM Analytics Engine API V3.
+
+Requests are built by the synchronous IbmAnalyticsEngineApiV3 client, so URLs,
+headers and bodies are identical; only the transport differs. Requests are
+authenticated in the event loop's default executor, so that fetching or
+refreshing an access token does not block the loop. This module requires the
+optional `aiohttp` dependency (`pip install "iaesdk[async]"`).
+"""
+
+from email.utils import parsedate_to_datetime
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import logging
+import time
+
+from ibm_cloud_sdk_core import ApiException, DetailedResponse
+from ibm_cloud_sdk_core.authenticators import (
+    Authenticator,
+    BasicAuthenticator,
+    BearerTokenAuthenticator,
+    NoAuthAuthenticator,
+)
+from ibm_cloud_sdk_core.get_authenticator import get_authenticator_from_environment
+from ibm_cloud_sdk_core.utils import is_json_mimetype
+from requests.exceptions import JSONDecodeError
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+import requests
+
+from .ibm_analytics_engine_api_v3 import ApplicationRequestApplicationDetails, IbmAnalyticsEngineApiV3
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover
+    aiohttp = None
+
+logger = logging.getLogger(__name__)
+
+##############################################################################
+# Service
+##############################################################################
+
+
+# Authenticators that only set a header, without I/O, and so can run on the
+# event loop.
+_NON_BLOCKING_AUTHENTICATORS = (NoAuthAuthenticator, BasicAuthenticator, BearerTokenAuthenticator)
+
+
+class _DeferredAuthenticator(Authenticator):
+    """
+    Stands in for the authenticator of the request builder, so that requests are
+    prepared without authentication; `AsyncIbmAnalyticsEngineApiV3` authenticates
+    them before sending.
+    """
+
+    def authenticate(self, req: dict) -> None:
+        pass
+
+    def validate(self) -> None:
+        pass
+
+    def authentication_type(self) -> str:
+        return 'deferred'
+
+
+class _RequestBuilder(IbmAnalyticsEngineApiV3):
+    """
+    IbmAnalyticsEngineApiV3 whose send() hands back the prepared request
+    instead of performing it.
+    """
+
+    def __init__(self, authenticator: Authenticator = None) -> None:
+        super().__init__(authenticator)
+        self.request_authenticator = self.authenticator
+        self.authenticator = _DeferredAuthenticator()
+
+    def send(self, request: dict, *, operation_id: str = None, **kwargs) -> Tuple[dict, dict]:
+        # pylint: disable=unused-argument
+        return request, kwargs
+
+
+class AsyncIbmAnalyticsEngineApiV3:
+    """The IBM Analytics Engine API V3 service, with every operation exposed as a coroutine."""
+
+    DEFAULT_SERVICE_URL = IbmAnalyticsEngineApiV3.DEFAULT_SERVICE_URL
+    DEFAULT_SERVICE_NAME = IbmAnalyticsEngineApiV3.DEFAULT_SERVICE_NAME
+    REGIONAL_ENDPOINTS = IbmAnalyticsEngineApiV3.REGIONAL_ENDPOINTS
+
+    DEFAULT_MAX_CONCURRENCY = 100
+    DEFAULT_TIMEOUT = 60
+    RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+    RETRY_AFTER_STATUS_CODES = (413, 429, 503)
+
+    @classmethod
+    def new_instance(
+        cls,
+        service_name: str = DEFAULT_SERVICE_NAME,
+        *,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    ) -> 'AsyncIbmAnalyticsEngineApiV3':
+        """
+        Return a new asyncio client for the IBM Analytics Engine API service using the
+               specified parameters and external configuration.
+        """
+        authenticator = get_authenticator_from_environment(service_name)
+        service = cls(authenticator, max_concurrency=max_concurrency)
+        service.configure_service(service_name)
+        return service
+
+    @classmethod
+    def get_service_url_for_region(
+        cls,
+        region: str,
+    ) -> str:
+        """
+        Returns the service URL associated with the specified region.
+        :param str region: a string representing the region
+        :return: The service URL associated with the specified region or None
+                 if no mapping for the region exists
+        :rtype: str
+        """
+        return cls.REGIONAL_ENDPOINTS.get(region, None)
+
+    def __init__(
+        self,
+        authenticator: Authenticator = None,
+        *,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    ) -> None:
+        """
+        Construct a new asyncio client for the IBM Analytics Engine API service.
+
+        The client owns an `aiohttp` session that is created on first use inside the
+        running event loop; use the client from a single event loop and close it with
+        `close()` (or `async with`) when done.
+
+        :param Authenticator authenticator: The authenticator specifies the authentication mechanism.
+               Get up to date information from https://github.com/IBM/python-sdk-core/blob/main/README.md
+               about initializing the authenticator of your choice.
+        :param int max_concurrency: (optional) Maximum number of requests in flight
+               at any time. Further calls wait for a free slot.
+        """
+        if aiohttp is None:
+            raise ImportError('aiohttp is required for AsyncIbmAnalyticsEngineApiV3; install "iaesdk[async]"')
+        if max_concurrency < 1:
+            raise ValueError('max_concurrency must be at least 1')
+        self._builder = _RequestBuilder(authenticator)
+        self.max_concurrency = max_concurrency
+        self.max_retries = 0
+        self.retry_interval = 0.0
+        self._session = None
+        self._semaphore = None
+
+    async def __aenter__(self) -> 'AsyncIbmAnalyticsEngineApiV3':
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """Close the underlying HTTP session and its pooled connections."""
+        if self._session is not None:
+            await self._session.close()
+        self._session = None
+        self._semaphore = None
+
+    #########################
+    # Configuration
+    #########################
+
+    @property
+    def service_url(self) -> str:
+        """The base URL requests are sent to."""
+        return self._builder.service_url
+
+    def configure_service(self, service_name: str) -> None:
+        """Apply the external configuration for `service_name`. See `BaseService.configure_service`."""
+        self._builder.configure_service(service_name)
+
+    def set_service_url(self, service_url: str) -> None:
+        """Set the base URL requests are sent to."""
+        self._builder.set_service_url(service_url)
+
+    def set_default_headers(self, headers: Dict[str, str]) -> None:
+        """Set headers that are sent with every request."""
+        self._builder.set_default_headers(headers)
+
+    def set_http_config(self, http_config: dict) -> None:
+        """
+        Set request options applied to every call. `timeout`, `verify` and `proxies`
+        are honoured by the asyncio transport.
+        """
+        self._builder.set_http_config(http_config)
+
+    def set_disable_ssl_verification(self, status: bool = False) -> None:
+        """Enable or disable verification of the server's SSL certificate."""
+        self._builder.disable_ssl_verification = status
+
+    def set_enable_gzip_compression(self, should_enable_compression: bool = False) -> None:
+        """Enable or disable gzip compression of request bodies."""
+        self._builder.set_enable_gzip_compression(should_enable_compression)
+
+    def get_authenticator(self) -> Authenticator:
+        """Return the authenticator used to authenticate requests."""
+        return self._builder.request_authenticator
+
+    def enable_retries(self, max_retries: int = 4, retry_interval: float = 30.0) -> None:
+        """
+        Enable automatic retries of requests that fail with a connection error, a
+        timeout or one of `RETRY_STATUS_CODES`.
+
+        :param int max_retries: the maximum number of retries to attempt for a failed request
+        :param float retry_interval: the maximum wait time (in seconds) between attempts. A
+               `Retry-After` response header is honoured; otherwise the wait time grows
+               exponentially up to this value.
+        """
+        self.max_retries = max_retries
+        self.retry_interval = retry_interval
+
+    def disable_retries(self) -> None:
+        """Disable automatic retries."""
+        self.max_retries = 0
+        self.retry_interval = 0.0
+
+    #########################
+    # Transport
+    #########################
+
+    def _get_session(self) -> 'aiohttp.ClientSession':
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.max_concurrency)
+            self._session = aiohttp.ClientSession(connector=connector, cookie_jar=aiohttp.CookieJar())
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._session
+
+    async def _authenticate(self, request: dict) -> None:
+        # Token-based authenticators may make a blocking request to the token
+        # service, so they run in the default executor.
+        authenticator = self._builder.request_authenticator
+        if isinstance(authenticator, _NON_BLOCKING_AUTHENTICATORS):
+            authenticator.authenticate(request)
+        else:
+            await asyncio.get_running_loop().run_in_executor(None, authenticator.authenticate, request)
+
+    async def _send(self, prepared: Tuple[dict, dict]) -> DetailedResponse:
+        request, kwargs = prepared
+        if request.get('files'):
+            raise ValueError('multipart requests are not supported by AsyncIbmAnalyticsEngineApiV3')
+        await self._authenticate(request)
+        kwargs = dict({'timeout': self.DEFAULT_TIMEOUT}, **kwargs)
+        kwargs.update(self._builder.http_config)
+
+        options = {'timeout': self._client_timeout(kwargs.get('timeout'))}
+        if self._builder.disable_ssl_verification or kwargs.get('verify') is False:
+            options['ssl'] = False
+        proxies = kwargs.get('proxies')
+        if proxies:
+            options['proxy'] = proxies.get(request['url'].split(':', 1)[0])
+
+        session = self._get_session()
+        attempt = 0
+        while True:
+            try:
+                async with self._semaphore:
+                    logger.debug('Sending HTTP request message')
+                    async with session.request(
+                        request['method'],
+                        request['url'],
+                        headers=dict(request['headers']),
+                        params=request['params'],
+                        data=request['data'],
+                        **options,
+                    ) as response:
+                        status = response.status
+                        headers = CaseInsensitiveDict(response.headers)
+                        body = await response.read()
+                logger.debug('Received HTTP response message, status code %d', status)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if attempt >= self.max_retries:
+                    raise
+                attempt += 1
+                await asyncio.sleep(self._backoff(attempt, None))
+                continue
+            if status in self.RETRY_STATUS_CODES and attempt < self.max_retries:
+                attempt += 1
+                retry_after = headers.get('Retry-After') if status in self.RETRY_AFTER_STATUS_CODES else None
+                await asyncio.sleep(self._backoff(attempt, retry_after))
+                continue
+            return self._process_response(request, status, headers, body)
+
+    @staticmethod
+    def _client_timeout(timeout) -> 'aiohttp.ClientTimeout':
+        # `timeout` follows the requests convention: a number, or a (connect, read) tuple.
+        if isinstance(timeout, (tuple, list)):
+            connect, read = timeout
+        else:
+            connect = read = timeout
+        return aiohttp.ClientTimeout(total=None, sock_connect=connect, sock_read=read)
+
+    def _backoff(self, attempt: int, retry_after: Optional[str]) -> float:
+        if retry_after:
+            try:
+                delay = float(retry_after)
+            except ValueError:
+                try:
+                    delay = parsedate_to_datetime(retry_after).timestamp() - time.time()
+                except (TypeError, ValueError):
+                    delay = None
+            if delay is not None:
+                return min(max(delay, 0.0), self.retry_interval)
+        if attempt <= 1:
+            return 0.0
+        return min(2.0 ** (attempt - 1), self.retry_interval)
+
+    @staticmethod
+    def _process_response(request: dict, status: int, headers: CaseInsensitiveDict, body: bytes) -> DetailedResponse:
+        # Wrap the payload in a requests.Response so results and ApiExceptions have
+        # exactly the shape the synchronous client produces.
+        http_response = requests.Response()
+        http_response.status_code = status
+        http_response.headers = headers
+        http_response.url = request['url']
+        http_response.encoding = get_encoding_from_headers(headers) or 'utf-8'
+        http_response._content = body  # pylint: disable=protected-access
+
+        if not 200 <= status <= 299:
+            raise ApiException(status, http_response=http_response)
+        if status == 204 or request['method'] == 'HEAD' or not body:
+            result = None
+        elif is_json_mimetype(headers.get('Content-Type')):
+            try:
+                result = http_response.json(strict=False)
+            except JSONDecodeError as err:
+                raise ApiException(
+                    code=status, http_response=http_response, message='Error processing the HTTP response'
+                ) from err
+        else:
+            result = http_response
+        return DetailedResponse(response=result, headers=headers, status_code=status)
+
+    #########################
+    # Analytics Engines V3
+    #########################
+
+    async def get_instance(self, instance_id: str, **kwargs) -> DetailedResponse:
+        """
+        Find Analytics Engine by id.
+
+        See `IbmAnalyticsEngineApiV3.get_instance`.
+        """
+        return await self._send(self._builder.get_instance(instance_id, **kwargs))
+
+    async def get_instance_state(self, instance_id: str, **kwargs) -> DetailedResponse:
+        """
+        Find Analytics Engine state by id.
+
+        See `IbmAnalyticsEngineApiV3.get_instance_state`.
+        """
+        return await self._send(self._builder.get_instance_state(instance_id, **kwargs))
+
+    async def set_instance_home(
+        self,
+        instance_id: str,
+        *,
+        new_instance_id: str = None,
+        new_provider: str = None,
+        new_type: str = None,
+        new_region: str = None,
+        new_endpoint: str = None,
+        new_hmac_access_key: str = None,
+        new_hmac_secret_key: str = None,
+        **kwargs,
+    ) -> DetailedResponse:
+        """
+        Set instance home.
+
+        See `IbmAnalyticsEngineApiV3.set_instance_home`.
+        """
+        return await self._send(
+            self._builder.set_instance_home(
+                instance_id,
+                new_instance_id=new_instance_id,
+                new_provider=new_provider,
+                new_type=new_type,
+                new_region=new_region,
+                new_endpoint=new_endpoint,
+                new_hmac_access_key=new_hmac_access_key,
+                new_hmac_secret_key=new_hmac_secret_key,
+                **kwargs,
+            )
+        )
+
+    async def update_instance_home_credentials(
+        self, instance_id: str, hmac_access_key: str, hmac_secret_key: str, **kwargs
+    ) -> DetailedResponse:
+        """
+        Update instance home credentials.
+
+        See `IbmAnalyticsEngineApiV3.update_instance_home_credentials`.
+        """
+        return await self._send(
+            self._builder.update_instance_home_credentials(instance_id, hmac_access_key, hmac_secret_key, **kwargs)
+        )
+
+    async def get_instance_default_configs(self, instance_id: str, **kwargs) -> DetailedResponse:
+        """
+        Get instance default Spark configurations.
+
+        See `IbmAnalyticsEngineApiV3.get_instance_default_configs`.
+        """
+        return await self._send(self._builder.get_instance_default_configs(instance_id, **kwargs))
+
+    async def replace_instance_default_configs(self, instance_id: str, body: dict, **kwargs) -> DetailedResponse:
+        """
+        Replace instance default Spark configurations.
+
+        See `IbmAnalyticsEngineApiV3.replace_instance_default_configs`.
+        """
+        return await self._send(self._builder.replace_instance_default_configs(instance_id, body, **kwargs))
+
+    async def update_instance_default_configs(self, instance_id: str, body: dict, **kwargs) -> DetailedResponse:
+        """
+        Update instance default Spark configurations.
+
+        See `IbmAnalyticsEngineApiV3.update_instance_default_configs`.
+        """
+        return await self._send(self._builder.update_instance_default_configs(instance_id, body, **kwargs))
+
+    async def get_instance_default_runtime(self, instance_id: str, **kwargs) -> DetailedResponse:
+        """
+        Get instance default runtime.
+
+        See `IbmAnalyticsEngineApiV3.get_instance_default_runtime`.
+        """
+        return await self._send(self._builder.get_instance_default_runtime(instance_id, **kwargs))
+
+    async def replace_instance_default_runtime(
+        self, instance_id: str, *, spark_version: str = None, **kwargs
+    ) -> DetailedResponse:
+        """
+        Replace instance default runtime.
+
+        See `IbmAnalyticsEngineApiV3.replace_instance_default_runtime`.
+        """
+        return await self._send(
+            self._builder.replace_instance_default_runtime(instance_id, spark_version=spark_version, **kwargs)
+        )
+
+    async def create_application(
+        self, instance_id: str, *, application_details: 'ApplicationRequestApplicationDetails' = None, **kwargs
+    ) -> DetailedResponse:
+        """
+        Deploy a Spark application.
+
+        See `IbmAnalyticsEngineApiV3.create_application`.
+        """
+        return await self._send(
+            self._builder.create_application(instance_id, application_details=application_details, **kwargs)
+        )
+
+    async def list_applications(
+        self,
+        instance_id: str,
+        *,
+        state: List[str] = None,
+        start_time_interval: str = None,
+        submission_time_interval: str = None,
+        end_time_interval: str = None,
+        limit: int = None,
+        start: str = None,
+        **kwargs,
+    ) -> DetailedResponse:
+        """
+        List all Spark applications.
+
+        See `IbmAnalyticsEngineApiV3.list_applications`.
+        """
+        return await self._send(
+            self._builder.list_applications(
+                instance_id,
+                state=state,
+                start_time_interval=start_time_interval,
+                submission_time_interval=submission_time_interval,
+                end_time_interval=end_time_interval,
+                limit=limit,
+                start=start,
+                **kwargs,
+            )
+        )
+
+    async def get_application(self, instance_id: str, application_id: str, **kwargs) -> DetailedResponse:
+        """
+        Retrieve the details of a given Spark application.
+
+        See `IbmAnalyticsEngineApiV3.get_application`.
+        """
+        return await self._send(self._builder.get_application(instance_id, application_id, **kwargs))
+
+    async def delete_application(self, instance_id: str, application_id: str, **kwargs) -> DetailedResponse:
+        """
+        Stop application.
+
+        See `IbmAnalyticsEngineApiV3.delete_application`.
+        """
+        return await self._send(self._builder.delete_application(instance_id, application_id, **kwargs))
+
+    async def get_application_state(self, instance_id: str, application_id: str, **kwargs) -> DetailedResponse:
+        """
+        Get the status of the application.
+
+        See `IbmAnalyticsEngineApiV3.get_application_state`.
+        """
+        return await self._send(self._builder.get_application_state(instance_id, application_id, **kwargs))
+
+    async def get_current_resource_consumption(self, instance_id: str, **kwargs) -> DetailedResponse:
+        """
+        Get current resource consumption.
+
+        See `IbmAnalyticsEngineApiV3.get_current_resource_consumption`.
+        """
+        return await self._send(self._builder.get_current_resource_consumption(instance_id, **kwargs))
+
+    async def get_resource_consumption_limits(self, instance_id: str, **kwargs) -> DetailedResponse:
+        """
+        Get resource consumption limits.
+
+        See `IbmAnalyticsEngineApiV3.get_resource_consumption_limits`.
+        """
+        return await self._send(self._builder.get_resource_consumption_limits(instance_id, **kwargs))
+
+    async def replace_log_forwarding_config(
+        self, instance_id: str, *, enabled: bool = None, sources: List[str] = None, tags: List[str] = None, **kwargs
+    ) -> DetailedResponse:
+        """
+        Replace log forwarding configuration.
+
+        See `IbmAnalyticsEngineApiV3.replace_log_forwarding_config`.
+        """
+        return await self._send(
+            self._builder.replace_log_forwarding_config(
+                instance_id, enabled=enabled, sources=sources, tags=tags, **kwargs
+            )
+        )
+
+    async def get_log_forwarding_config(self, instance_id: str, **kwargs) -> DetailedResponse:
+        """
+        Get log forwarding configuration.
+
+        See `IbmAnalyticsEngineApiV3.get_log_forwarding_config`.
+        """
+        return await self._send(self._builder.get_log_forwarding_config(instance_id, **kwargs))
+
+    async def configure_platform_logging(
+        self, instance_guid: str, *, enable: bool = None, **kwargs
+    ) -> DetailedResponse:
+        """
+        Enable or disable log forwarding.
+
+        See `IbmAnalyticsEngineApiV3.configure_platform_logging`.
+
+        Deprecated: this method is deprecated and may be removed in a future release.
+        """
+        return await self._send(self._builder.configure_platform_logging(instance_guid, enable=enable, **kwargs))
+
+    async def get_logging_configuration(self, instance_guid: str, **kwargs) -> DetailedResponse:
+        """
+        Retrieve the logging configuration for a given instance id.
+
+        See `IbmAnalyticsEngineApiV3.get_logging_configuration`.
+
+        Deprecated: this method is deprecated and may be removed in a future release.
+        """
+        return await self._send(self._builder.get_logging_configuration(instance_guid, **kwargs))
+
+    async def start_spark_history_server(self, instance_id: str, **kwargs) -> DetailedResponse:
+        """
+        Start Spark history server.
+
+        See `IbmAnalyticsEngineApiV3.start_spark_history_server`.
+        """
+        return await self._send(self._builder.start_spark_history_server(instance_id, **kwargs))
+
+    async def get_spark_history_server(self, instance_id: str, **kwargs) -> DetailedResponse:
+        """
+        Get Spark history server details.
+
+        See `IbmAnalyticsEngineApiV3.get_spark_history_server`.
+        """
+        return await self._send(self._builder.get_spark_history_server(instance_id, **kwargs))
+
+    async def stop_spark_history_server(self, instance_id: str, **kwargs) -> DetailedResponse:
+        """
+        Stop Spark history server.
+
+        See `IbmAnalyticsEngineApiV3.stop_spark_history_server`.
+        """
+        return await self._send(self._builder.stop_spark_history_server(instance_id, **kwargs))
+
+
+##############################################################################
+# Pagers
+##############################################################################
+
+
+class AsyncApplicationsPager:
+    """
+    AsyncApplicationsPager can be used to simplify the use of the "list_applications" coroutine.
+    """
+
+    def __init__(
+        self,
+        *,
+        client: AsyncIbmAnalyticsEngineApiV3,
+        instance_id: str,
+        state: List[str] = None,
+        start_time_interval: str = None,
+        submission_time_interval: str = None,
+        end_time_interval: str = None,
+        limit: int = None,
+    ) -> None:
+        """
+        Initialize a AsyncApplicationsPager object.
+
+        Parameters are the same as for `ApplicationsPager`.
+        """
+        self._has_next = True
+        self._client = client
+        self._page_context = {'next': None}
+        self._instance_id = instance_id
+        self._state = state
+        self._start_time_interval = start_time_interval
+        self._submission_time_interval = submission_time_interval
+        self._end_time_interval = end_time_interval
+        self._limit = limit
+
+    def has_next(self) -> bool:
+        """
+        Returns true if there are potentially more results to be retrieved.
+        """
+        return self._has_next
+
+    async def get_next(self) -> List[dict]:
+        """
+        Returns the next page of results.
+        :return: A List[dict], where each element is a dict that represents an instance of Application.
+        :rtype: List[dict]
+        """
+        if not self.has_next():
+            raise StopAsyncIteration('No more results available')
+
+        response = await self._client.list_applications(
+            instance_id=self._instance_id,
+            state=self._state,
+            start_time_interval=self._start_time_interval,
+            submission_time_interval=self._submission_time_interval,
+            end_time_interval=self._end_time_interval,
+            limit=self._limit,
+            start=self._page_context.get('next'),
+        )
+        result = response.get_result()
+
+        next = None
+        next_page_link = result.get('next')
+        if next_page_link is not None:
+            next = next_page_link.get('start')
+        self._page_context['next'] = next
+        if next is None:
+            self._has_next = False
+
+        return result.get('applications')
+
+    async def get_all(self) -> List[dict]:
+        """
+        Returns all results by awaiting get_next() repeatedly
+        until all pages of results have been retrieved.
+        :return: A List[dict], where each element is a dict that represents an instance of Application.
+        :rtype: List[dict]
+        """
+        results = []
+        while self.has_next():
+            next_page = await self.get_next()
+            results.extend(next_page)
+        return results
@@ -0,0 +1,141 @@
+# coding: utf-8
+
+# (C) Copyright IBM Corp. 2024.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Parallel listing of Spark applications over a submission time range.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import List, Tuple
+
+from ibm_cloud_sdk_core.utils import datetime_to_string, string_to_datetime
+
+from .ibm_analytics_engine_api_v3 import ApplicationsPager, IbmAnalyticsEngineApiV3
+
+_LATEST = datetime.max.replace(tzinfo=timezone.utc)
+
+
+def split_time_range(start: datetime, end: datetime, shards: int) -> List[Tuple[datetime, datetime]]:
+    """
+    Split `[start, end)` into at most `shards` contiguous, equally sized intervals.
+
+    Naive datetimes are taken to be UTC.
+
+    :param datetime start: Inclusive lower bound of the range.
+    :param datetime end: Exclusive upper bound of the range.
+    :param int shards: Number of intervals to produce.
+    :return: The intervals, in ascending order.
+    :rtype: List[Tuple[datetime, datetime]]
+    """
+    if shards < 1:
+        raise ValueError('shards must be at least 1')
+    start, end = _as_utc(start), _as_utc(end)
+    if start >= end:
+        raise ValueError('start must be earlier than end')
+    width = (end - start) / shards
+    bounds = [start + width * i for i in range(shards)] + [end]
+    # Very short ranges can produce duplicate bounds; drop the empty intervals.
+    return [(lower, upper) for lower, upper in zip(bounds, bounds[1:]) if lower < upper]
+
+
+def list_applications_sharded(
+    client: IbmAnalyticsEngineApiV3,
+    instance_id: str,
+    *,
+    start: datetime,
+    end: datetime,
+    shards: int = 8,
+    max_workers: int = None,
+    state: List[str] = None,
+    start_time_interval: str = None,
+    end_time_interval: str = None,
+    limit: int = None,
+) -> List[dict]:
+    """
+    List the Spark applications submitted in `[start, end)` by paging several
+    submission-time shards of the range concurrently.
+
+    Each shard is listed with its own `ApplicationsPager` and a
+    `submission_time_interval` covering only that shard. The results are merged in
+    ascending submission time order, keeping the first occurrence of each
+    application `id`.
+
+    :param IbmAnalyticsEngineApiV3 client: The client used to list applications.
+    :param str instance_id: The identifier of the Analytics Engine instance
+           associated with the Spark application(s).
+    :param datetime start: Inclusive lower bound of the submission time range.
+    :param datetime end: Exclusive upper bound of the submission time range.
+    :param int shards: (optional) Number of sub-intervals the range is split into.
+    :param int max_workers: (optional) Maximum number of shards listed at the same
+           time. Defaults to `shards`.
+    :param List[str] state: (optional) List of Spark application states that
+           will be used to filter the response.
+    :param str start_time_interval: (optional) Time interval to use for
+           filtering applications by their start time.
+    :param str end_time_interval: (optional) Time interval to use for filtering
+           applications by their end time.
+    :param int limit: (optional) Number of application entries requested per page.
+    :return: A List[dict], where each element is a dict that represents an instance of Application.
+    :rtype: List[dict]
+    """
+    if not instance_id:
+        raise ValueError('instance_id must be provided')
+    intervals = split_time_range(start, end, shards)
+
+    def list_shard(interval: Tuple[datetime, datetime]) -> List[dict]:
+        pager = ApplicationsPager(
+            client=client,
+            instance_id=instance_id,
+            state=state,
+            start_time_interval=start_time_interval,
+            submission_time_interval='{0},{1}'.format(*map(datetime_to_string, interval)),
+            end_time_interval=end_time_interval,
+            limit=limit,
+        )
+        applications = pager.get_all()
+        applications.sort(key=_submission_time)
+        return applications
+
+    with ThreadPoolExecutor(max_workers=max_workers or len(intervals)) as executor:
+        shard_results = list(executor.map(list_shard, intervals))
+
+    # The shards are disjoint and ordered, so concatenating the sorted shards
+    # yields the whole range in submission time order.
+    results = []
+    seen = set()
+    for applications in shard_results:
+        for application in applications:
+            application_id = application.get('id')
+            if application_id is not None:
+                if application_id in seen:
+                    continue
+                seen.add(application_id)
+            results.append(application)
+    return results
+
+
+def _as_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def _submission_time(application: dict) -> datetime:
+    submission_time = application.get('submission_time')
+    if submission_time is None:
+        return _LATEST
+    return string_to_datetime(submission_time)
@@ -0,0 +1,489 @@
+# coding: utf-8
+
+# (C) Copyright IBM Corp. 2024.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Per-operation request metrics: latency by phase, status codes, bytes and retries.
+"""
+
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from typing import Callable, Dict, Optional, Sequence
+import copy
+import logging
+import threading
+import time
+
+from ibm_cloud_sdk_core import DetailedResponse
+
+from .common import with_response_hook
+
+try:
+    import prometheus_client
+except ImportError:  # pragma: no cover
+    prometheus_client = None
+
+logger = logging.getLogger(__name__)
+
+# The latency phases of a request, in order.
+PHASES = ('serialization', 'network', 'deserialization', 'total')
+
+# Upper bounds of the latency histogram buckets, in seconds; the same as the
+# Prometheus client defaults.
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+
+
+class RequestSample:
+    """
+    The measurements of one request sent by a client.
+
+    :attr str operation_id: The operation, such as `get_instance`, or None for
+          requests sent directly with `send()`.
+    :attr str method: The HTTP method.
+    :attr int status_code: The HTTP status code, or None if no response was
+          received.
+    :attr int bytes_sent: Size of the request body.
+    :attr int bytes_received: Size of the response body.
+    :attr int retries: Number of retries of the request by the transport.
+    :attr float serialization: Seconds spent preparing the request: headers,
+          authentication and body.
+    :attr float network: Seconds from sending the request to receiving the whole
+          response body, including retries.
+    :attr float deserialization: Seconds spent decoding the response.
+    :attr str error: The name of the exception raised, if any.
+    """
+
+    __slots__ = (
+        'operation_id',
+        'method',
+        'status_code',
+        'bytes_sent',
+        'bytes_received',
+        'retries',
+        'serialization',
+        'network',
+        'deserialization',
+        'error',
+    )
+
+    def __init__(self, operation_id: Optional[str], method: str, *, serialization: float = 0.0) -> None:
+        self.operation_id = operation_id
+        self.method = method
+        self.status_code = None
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.retries = 0
+        self.serialization = serialization
+        self.network = 0.0
+        self.deserialization = 0.0
+        self.error = None
+
+    @property
+    def total(self) -> float:
+        """Seconds spent on the request in all phases."""
+        return self.serialization + self.network + self.deserialization
+
+    def __repr__(self) -> str:
+        return '<RequestSample: {0} {1} {2} in {3:.6f}s>'.format(
+            self.operation_id, self.method, self.status_code or self.error, self.total
+        )
+
+
+class MetricsRecorder(ABC):
+    """
+    Receives a RequestSample for each request sent by the clients it is set on,
+    see `set_metrics_recorder()` on the clients.
+
+    `record()` is called on the thread that sent the request, once the response
+    has been processed; it should return quickly. Errors it raises are logged
+    and otherwise ignored.
+    """
+
+    @abstractmethod
+    def record(self, sample: RequestSample) -> None:
+        """
+        Record the measurements of a request.
+
+        :param RequestSample sample: The measurements.
+        """
+
+
+class LatencyHistogram:
+    """
+    Counts of latencies in fixed buckets, with their sum.
+
+    :attr tuple buckets: The upper bounds of the buckets, in seconds.
+    :attr list counts: The number of latencies in each bucket, followed by the
+          number of latencies above the last bound.
+    :attr int count: The number of latencies.
+    :attr float sum: The sum of the latencies, in seconds.
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS) -> None:
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        """
+        Add a latency.
+
+        :param float value: The latency, in seconds.
+        """
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estimate a quantile of the latencies, by linear interpolation within the
+        bucket that holds it.
+
+        :param float q: The quantile, between 0 and 1.
+        :return: The estimated latency, in seconds; the last bound if it falls in
+                 the overflow bucket; None if there are no latencies.
+        :rtype: float
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                if index == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[index - 1] if index else 0.0
+                return lower + (self.buckets[index] - lower) * (rank - seen) / count
+            seen += count
+        return self.buckets[-1]
+
+    def to_dict(self) -> Dict:
+        """Return the histogram as a dict, with cumulative bucket counts as in Prometheus."""
+        cumulative = []
+        total = 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            total += count
+            cumulative.append((bound, total))
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'buckets': cumulative,
+            'p50': self.quantile(0.5),
+            'p99': self.quantile(0.99),
+        }
+
+
+class _OperationMetrics:
+    # The aggregated measurements of one operation.
+
+    def __init__(self, buckets: Sequence[float]) -> None:
+        self.requests = 0
+        self.errors = 0
+        self.status_codes: Dict[int, int] = {}
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.retries = 0
+        self.latency = {phase: LatencyHistogram(buckets) for phase in PHASES}
+
+    def add(self, sample: RequestSample) -> None:
+        self.requests += 1
+        if sample.status_code is None or sample.status_code >= 400:
+            self.errors += 1
+        if sample.status_code is not None:
+            self.status_codes[sample.status_code] = self.status_codes.get(sample.status_code, 0) + 1
+        self.bytes_sent += sample.bytes_sent
+        self.bytes_received += sample.bytes_received
+        self.retries += sample.retries
+        for phase in PHASES:
+            self.latency[phase].observe(getattr(sample, phase))
+
+    def to_dict(self) -> Dict:
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'status_codes': dict(self.status_codes),
+            'bytes_sent': self.bytes_sent,
+            'bytes_received': self.bytes_received,
+            'retries': self.retries,
+            'latency': {phase: histogram.to_dict() for phase, histogram in self.latency.items()},
+        }
+
+
+class InMemoryMetrics(MetricsRecorder):
+    """
+    Aggregates request measurements in memory, per operation.
+
+    Requests sent directly with `send()`, without an operation, are aggregated
+    under the operation `None`.
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS) -> None:
+        """
+        Initialize an InMemoryMetrics object.
+
+        :param Sequence[float] buckets: (optional) The upper bounds of the latency
+               histogram buckets, in seconds, in increasing order.
+        """
+        if not buckets or list(buckets) != sorted(buckets):
+            raise ValueError('buckets must be provided in increasing order')
+        self.buckets = tuple(buckets)
+        self._operations: Dict[Optional[str], _OperationMetrics] = {}
+        self._lock = threading.Lock()
+
+    def record(self, sample: RequestSample) -> None:
+        with self._lock:
+            operation = self._operations.get(sample.operation_id)
+            if operation is None:
+                operation = self._operations[sample.operation_id] = _OperationMetrics(self.buckets)
+            operation.add(sample)
+
+    def snapshot(self) -> Dict[Optional[str], Dict]:
+        """
+        Return the measurements so far, by operation.
+
+        Each operation maps to a dict with the number of `requests` and of
+        `errors` (requests without a response, or with a status code of 400 or
+        more), the number of responses by status code in `status_codes`, the
+        `bytes_sent`, `bytes_received` and `retries` in total, and in `latency`,
+        the histogram of each phase of PHASES (see `LatencyHistogram.to_dict()`).
+
+        :rtype: Dict[str, Dict]
+        """
+        with self._lock:
+            return {operation_id: operation.to_dict() for operation_id, operation in self._operations.items()}
+
+    def reset(self) -> None:
+        """
+        Discard the measurements so far.
+        """
+        with self._lock:
+            self._operations.clear()
+
+
+class PrometheusMetrics(MetricsRecorder):
+    """
+    Exports request measurements as Prometheus metrics, with the
+    `prometheus_client` package:
+
+    * `<namespace>_requests_total`, by `operation` and `status` (the status code,
+      or `error` for requests without a response),
+    * `<namespace>_request_bytes_sent_total` and
+      `<namespace>_request_bytes_received_total`, by `operation`,
+    * `<namespace>_request_retries_total`, by `operation`,
+    * `<namespace>_request_duration_seconds`, a histogram by `operation` and
+      `phase`, one of PHASES.
+    """
+
+    def __init__(
+        self,
+        *,
+        registry: 'prometheus_client.CollectorRegistry' = None,
+        namespace: str = 'iaesdk',
+        buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS,
+    ) -> None:
+        """
+        Initialize a PrometheusMetrics object, registering its metrics.
+
+        :param CollectorRegistry registry: (optional) The registry of the metrics.
+               Defaults to the global registry of `prometheus_client`.
+        :param str namespace: (optional) The prefix of the metric names.
+        :param Sequence[float] buckets: (optional) The upper bounds of the latency
+               histogram buckets, in seconds.
+        """
+        if prometheus_client is None:
+            raise ImportError('prometheus_client is required for PrometheusMetrics')
+        if registry is None:
+            registry = prometheus_client.REGISTRY
+        options = {'namespace': namespace, 'registry': registry}
+        self._requests = prometheus_client.Counter(
+            'requests', 'Requests sent, by operation and status code.', ['operation', 'status'], **options
+        )
+        self._bytes_sent = prometheus_client.Counter(
+            'request_bytes_sent', 'Bytes of request bodies sent, by operation.', ['operation'], **options
+        )
+        self._bytes_received = prometheus_client.Counter(
+            'request_bytes_received', 'Bytes of response bodies received, by operation.', ['operation'], **options
+        )
+        self._retries = prometheus_client.Counter(
+            'request_retries', 'Retries of requests, by operation.', ['operation'], **options
+        )
+        self._duration = prometheus_client.Histogram(
+            'request_duration_seconds',
+            'Latency of requests, by operation and phase.',
+            ['operation', 'phase'],
+            buckets=tuple(buckets),
+            **options,
+        )
+
+    def record(self, sample: RequestSample) -> None:
+        operation = sample.operation_id or ''
+        status = str(sample.status_code) if sample.status_code is not None else 'error'
+        self._requests.labels(operation, status).inc()
+        self._bytes_sent.labels(operation).inc(sample.bytes_sent)
+        self._bytes_received.labels(operation).inc(sample.bytes_received)
+        self._retries.labels(operation).inc(sample.retries)
+        for phase in PHASES:
+            self._duration.labels(operation, phase).observe(getattr(sample, phase))
+
+
+class OpenTelemetryMetrics(MetricsRecorder):
+    """
+    Exports request measurements as OpenTelemetry metrics, through a meter of
+    the application's OpenTelemetry SDK:
+
+    * `<prefix>.requests`, a counter,
+    * `<prefix>.request.bytes_sent` and `<prefix>.request.bytes_received`,
+      counters in bytes,
+    * `<prefix>.request.retries`, a counter,
+    * `<prefix>.request.duration`, a histogram in seconds, with a `phase`
+      attribute, one of PHASES.
+
+    Every measurement has the attributes `operation` and `http.request.method`,
+    and `http.response.status_code` or `error.type`.
+    """
+
+    def __init__(self, meter, *, prefix: str = 'iaesdk') -> None:
+        """
+        Initialize an OpenTelemetryMetrics object, creating its instruments.
+
+        :param Meter meter: The meter, such as
+               `opentelemetry.metrics.get_meter('iaesdk')`.
+        :param str prefix: (optional) The prefix of the instrument names.
+        """
+        if meter is None:
+            raise ValueError('meter must be provided')
+        self._requests = meter.create_counter(prefix + '.requests', unit='{request}', description='Requests sent.')
+        self._bytes_sent = meter.create_counter(
+            prefix + '.request.bytes_sent', unit='By', description='Bytes of request bodies sent.'
+        )
+        self._bytes_received = meter.create_counter(
+            prefix + '.request.bytes_received', unit='By', description='Bytes of response bodies received.'
+        )
+        self._retries = meter.create_counter(
+            prefix + '.request.retries', unit='{retry}', description='Retries of requests.'
+        )
+        self._duration = meter.create_histogram(
+            prefix + '.request.duration', unit='s', description='Latency of requests, by phase.'
+        )
+
+    def record(self, sample: RequestSample) -> None:
+        attributes = {'operation': sample.operation_id or '', 'http.request.method': sample.method}
+        if sample.status_code is not None:
+            attributes['http.response.status_code'] = sample.status_code
+        if sample.error is not None:
+            attributes['error.type'] = sample.error
+        self._requests.add(1, attributes)
+        self._bytes_sent.add(sample.bytes_sent, attributes)
+        self._bytes_received.add(sample.bytes_received, attributes)
+        self._retries.add(sample.retries, attributes)
+        for phase in PHASES:
+            self._duration.record(getattr(sample, phase), dict(attributes, phase=phase))
+
+
+class RequestMeter:
+    """
+    Measures the requests of a client for a MetricsRecorder.
+
+    The client times `prepare_request()` with `prepare()`, starts a sample for
+    the request with `start()` on the same thread, and sends it with `send()`.
+    """
+
+    def __init__(self, recorder: MetricsRecorder) -> None:
+        """
+        Initialize a RequestMeter object.
+
+        :param MetricsRecorder recorder: Receives the measurements.
+        """
+        if recorder is None:
+            raise ValueError('recorder must be provided')
+        self.recorder = recorder
+        self._local = threading.local()
+
+    def prepare(self, prepare_request: Callable[..., dict], *args, **kwargs) -> dict:
+        """
+        Return `prepare_request(*args, **kwargs)`, timing it as the serialization
+        of the next request started on this thread.
+
+        :rtype: dict
+        """
+        start = time.perf_counter()
+        request = prepare_request(*args, **kwargs)
+        self._local.serialization = time.perf_counter() - start
+        return request
+
+    def start(self, request: dict, operation_id: Optional[str]) -> RequestSample:
+        """
+        Return a new sample for `request`.
+
+        :param dict request: The prepared request.
+        :param str operation_id: The operation of the request.
+        :rtype: RequestSample
+        """
+        serialization = getattr(self._local, 'serialization', 0.0)
+        self._local.serialization = 0.0
+        return RequestSample(operation_id, request.get('method'), serialization=serialization)
+
+    def send(
+        self, sample: RequestSample, send: Callable[..., DetailedResponse], request: dict, kwargs: dict
+    ) -> DetailedResponse:
+        """
+        Send `request` with `send(request, **kwargs)`, and record a copy of
+        `sample` completed with its measurements.
+
+        :rtype: DetailedResponse
+        """
+        sample = copy.copy(sample)
+        received = []
+
+        def on_response(response, **hook_kwargs):
+            # Read the body now, so that reading it counts as network time.
+            size = 0 if hook_kwargs.get('stream') else len(response.content)
+            received.append((response, size, time.perf_counter()))
+            return response
+
+        kwargs = with_response_hook(kwargs, on_response)
+        start = time.perf_counter()
+        try:
+            return send(request, **kwargs)
+        except Exception as error:
+            sample.error = type(error).__name__
+            raise
+        finally:
+            end = time.perf_counter()
+            if received:
+                response, sample.bytes_received, received_at = received[-1]
+                sample.status_code = response.status_code
+                sample.bytes_sent = _body_size(response.request.body)
+                retries = getattr(response.raw, 'retries', None)
+                sample.retries = len(retries.history) if retries is not None else 0
+                sample.network = received_at - start
+                sample.deserialization = end - received_at
+            else:
+                sample.bytes_sent = _body_size(request.get('data'))
+                sample.network = end - start
+            try:
+                self.recorder.record(sample)
+            except Exception:  # pylint: disable=broad-except
+                logger.warning('Recording request metrics failed', exc_info=True)
+
+
+def _body_size(body) -> int:
+    if isinstance(body, bytes):
+        return len(body)
+    if isinstance(body, str):
+        return len(body.encode('utf-8'))
+    # Files and streamed bodies are not measured.
+    return 0
@@ -0,0 +1,242 @@
+# coding: utf-8
+
+# (C) Copyright IBM Corp. 2024.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Routing of read-only requests to the regional endpoint with the lowest latency.
+"""
+
+from typing import Callable, Dict, List, Optional, Tuple
+import logging
+import math
+import re
+import statistics
+import threading
+import time
+
+from ibm_cloud_sdk_core import ApiException, DetailedResponse
+import requests
+
+logger = logging.getLogger(__name__)
+
+_INSTANCE_PATH = re.compile(r'/v3/analytics_engines/([^/?#]+)')
+
+
+class LatencyRouter:
+    """
+    Routes GET requests for an instance to the endpoint with the lowest measured
+    round-trip latency among those that serve the instance.
+
+    Latencies are measured with a few unauthenticated HEAD requests to each
+    endpoint, and measured again in the background once they are older than
+    `probe_interval`. Until the first measurement completes, requests use the
+    client's service URL.
+
+    Whether an endpoint serves an instance is checked with a GET of the instance
+    state. The answer, the instance state or a 404, is kept for `check_ttl`
+    seconds. Other failures of the check, including 401 and 403, are not kept:
+    the request falls back to the next endpoint, and the check is repeated for
+    the next request. Requests other than GET, and GET requests not for an
+    instance, are not routed.
+
+    The instance state requests, like the routed requests, carry the headers of
+    the request being routed, including its `Authorization` header. They are
+    only sent to the configured endpoints, which must be trusted with the
+    credentials.
+    """
+
+    def __init__(
+        self,
+        endpoints: Dict[str, str],
+        *,
+        probe_interval: float = 300.0,
+        probe_timeout: float = 2.0,
+        samples: int = 3,
+        check_ttl: float = 3600.0,
+        session: requests.Session = None,
+    ) -> None:
+        """
+        Initialize a LatencyRouter object.
+
+        :param Dict[str, str] endpoints: The candidate endpoints, by name, such as
+               `IbmAnalyticsEngineApiV3.REGIONAL_ENDPOINTS`. Requests routed to
+               them carry the credentials of the client.
+        :param float probe_interval: (optional) Seconds after which latencies are
+               measured again.
+        :param float probe_timeout: (optional) Timeout of each latency probe, in
+               seconds. Endpoints that do not answer in time are not used.
+        :param int samples: (optional) Number of probes per endpoint; the median
+               latency is used. The first probe, which sets up the connection, is
+               not counted when there are several.
+        :param float check_ttl: (optional) Seconds for which the answer of a
+               check of whether an endpoint serves an instance is kept.
+        :param requests.Session session: (optional) The session used for the
+               probes. Sharing the client's session leaves connections to the
+               endpoints open for the requests.
+        """
+        if not endpoints:
+            raise ValueError('endpoints must be provided')
+        if samples < 1:
+            raise ValueError('samples must be at least 1')
+        self.endpoints = {name: url.rstrip('/') for name, url in endpoints.items()}
+        self.probe_interval = probe_interval
+        self.probe_timeout = probe_timeout
+        self.samples = samples
+        self.check_ttl = check_ttl
+        self.session = session or requests.Session()
+        self._latencies: Dict[str, float] = {}
+        self._probed_at = None
+        self._probe_thread = None
+        # (endpoint, instance_id) -> (serves, time of the check)
+        self._serves: Dict[tuple, Tuple[bool, float]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def latencies(self) -> Dict[str, float]:
+        """The measured latency of each endpoint URL, in seconds; infinite for unreachable endpoints."""
+        with self._lock:
+            return dict(self._latencies)
+
+    def serves(self, endpoint: str, instance_id: str) -> Optional[bool]:
+        """
+        Return whether `endpoint` serves `instance_id`, or None if it has not been
+        checked within `check_ttl` seconds.
+
+        :param str endpoint: The endpoint URL.
+        :param str instance_id: The instance id.
+        :rtype: bool
+        """
+        return self._checked(endpoint.rstrip('/'), instance_id)
+
+    def probe(self) -> Dict[str, float]:
+        """
+        Measure the latency of every endpoint now.
+
+        :return: The latency of each endpoint URL, in seconds.
+        :rtype: Dict[str, float]
+        """
+        latencies = {url: self._measure(url) for url in self.endpoints.values()}
+        with self._lock:
+            self._latencies = latencies
+            self._probed_at = time.monotonic()
+        logger.debug('Measured endpoint latencies: %s', latencies)
+        return dict(latencies)
+
+    def ranked(self, service_url: str) -> List[str]:
+        """
+        Return the endpoint URLs faster than `service_url`, fastest first,
+        followed by `service_url`. Starts a new measurement in the background if
+        the latencies are out of date.
+
+        :param str service_url: The URL the client is configured with.
+        :rtype: List[str]
+        """
+        service_url = service_url.rstrip('/')
+        with self._lock:
+            stale = self._probed_at is None or time.monotonic() - self._probed_at > self.probe_interval
+            if stale and (self._probe_thread is None or not self._probe_thread.is_alive()):
+                self._probe_thread = threading.Thread(target=self._probe_in_background, daemon=True)
+                self._probe_thread.start()
+            latencies = dict(self._latencies)
+        baseline = latencies.get(service_url, math.inf)
+        faster = sorted(
+            (latency, url) for url, latency in latencies.items() if latency < baseline and url != service_url
+        )
+        return [url for _, url in faster] + [service_url]
+
+    def send(
+        self,
+        request: dict,
+        service_url: str,
+        send: Callable[[dict], DetailedResponse],
+        check: Callable[[dict], DetailedResponse] = None,
+    ) -> DetailedResponse:
+        """
+        Send `request` with `send()`, to the fastest endpoint serving its instance
+        if it is a GET request for an instance.
+
+        :param dict request: The prepared request.
+        :param str service_url: The URL the client is configured with.
+        :param send: Sends a prepared request.
+        :param check: (optional) Sends the instance state requests checking
+               whether an endpoint serves the instance. Defaults to `send`.
+        :rtype: DetailedResponse
+        """
+        url = request.get('url') or ''
+        if request.get('method') != 'GET' or not service_url or not url.startswith(service_url):
+            return send(request)
+        path = url[len(service_url) :]
+        match = _INSTANCE_PATH.match(path)
+        if match is None:
+            return send(request)
+
+        instance_id = match.group(1)
+        for endpoint in self.ranked(service_url)[:-1]:
+            if self._serves_instance(endpoint, instance_id, request, check or send):
+                return send(dict(request, url=endpoint + path))
+        return send(request)
+
+    def _serves_instance(
+        self, endpoint: str, instance_id: str, request: dict, send: Callable[[dict], DetailedResponse]
+    ) -> bool:
+        serves = self._checked(endpoint, instance_id)
+        if serves is not None:
+            return serves
+        state_request = dict(
+            request, url='{0}/v3/analytics_engines/{1}/state'.format(endpoint, instance_id), params=None
+        )
+        try:
+            send(state_request)
+            serves = True
+        except ApiException as error:
+            if error.status_code != 404:
+                # Not a verdict on the instance, such as credentials rejected by
+                # the endpoint; check again next time.
+                logger.debug('Checking whether endpoint %s serves instance %s failed: %s', endpoint, instance_id, error)
+                return False
+            serves = False
+        except requests.exceptions.RequestException:
+            return False
+        logger.debug('Endpoint %s %s instance %s', endpoint, 'serves' if serves else 'does not serve', instance_id)
+        with self._lock:
+            self._serves[(endpoint, instance_id)] = (serves, time.monotonic())
+        return serves
+
+    def _checked(self, endpoint: str, instance_id: str) -> Optional[bool]:
+        # The answer of the last check, if within check_ttl.
+        with self._lock:
+            checked = self._serves.get((endpoint, instance_id))
+        if checked is None or time.monotonic() - checked[1] > self.check_ttl:
+            return None
+        return checked[0]
+
+    def _probe_in_background(self) -> None:
+        try:
+            self.probe()
+        except Exception:  # pylint: disable=broad-except
+            logger.warning('Measuring endpoint latencies failed', exc_info=True)
+
+    def _measure(self, url: str) -> float:
+        timings = []
+        for _ in range(self.samples):
+            start = time.perf_counter()
+            try:
+                self.session.head(url, timeout=self.probe_timeout, allow_redirects=False).close()
+            except requests.exceptions.RequestException:
+                return math.inf
+            timings.append(time.perf_counter() - start)
+        if len(timings) > 1:
+            timings = timings[1:]
+        return statistics.median(timings)
@@ -0,0 +1,192 @@
+# coding: utf-8
+
+# (C) Copyright IBM Corp. 2024.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Concurrent submission of Spark applications.
+"""
+
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Iterable, Iterator, Union
+import threading
+import time
+
+from .ibm_analytics_engine_api_v3 import (
+    ApplicationRequestApplicationDetails,
+    ApplicationResponse,
+    IbmAnalyticsEngineApiV3,
+)
+
+
+class SubmissionResult:
+    """
+    The outcome of submitting one Spark application.
+
+    :attr int index: Position of the application in the submitted sequence.
+    :attr ApplicationRequestApplicationDetails application_details: The submitted
+          application details.
+    :attr ApplicationResponse response: The service response, or None if the
+          submission failed.
+    :attr Exception error: The error raised by the submission, or None if it
+          succeeded.
+    """
+
+    def __init__(
+        self,
+        index: int,
+        application_details: Union[ApplicationRequestApplicationDetails, dict],
+        *,
+        response: ApplicationResponse = None,
+        error: Exception = None,
+    ) -> None:
+        self.index = index
+        self.application_details = application_details
+        self.response = response
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        """True when the application was submitted successfully."""
+        return self.error is None
+
+    def __repr__(self) -> str:
+        outcome = 'error={0!r}'.format(self.error) if self.error is not None else 'id={0!r}'.format(self.response.id)
+        return 'SubmissionResult(index={0}, {1})'.format(self.index, outcome)
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket allowing `rate` operations per second on average,
+    with bursts of up to `burst` operations.
+    """
+
+    def __init__(self, rate: float, *, burst: int = 1) -> None:
+        if rate <= 0:
+            raise ValueError('rate must be positive')
+        if burst < 1:
+            raise ValueError('burst must be at least 1')
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """
+        Take one token, sleeping until it is available.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # Reserve the token even if it is not available yet, so concurrent
+            # callers queue up behind each other instead of all waking at once.
+            self._tokens -= 1
+            delay = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if delay > 0:
+            time.sleep(delay)
+
+
+def submit_many(
+    client: IbmAnalyticsEngineApiV3,
+    instance_id: str,
+    applications: Iterable[Union[ApplicationRequestApplicationDetails, dict]],
+    *,
+    max_workers: int = 8,
+    rate_limit: float = None,
+    burst: int = 1,
+    ordered: bool = True,
+    **kwargs,
+) -> Iterator[SubmissionResult]:
+    """
+    Submit many Spark applications concurrently.
+
+    Applications are read from `applications` as submission slots free up, so the
+    iterable may be a lazy generator. A failed submission does not stop the
+    others; its error is reported in the corresponding `SubmissionResult`.
+    Closing the returned iterator early stops further submissions; submissions
+    already in progress are completed.
+
+    :param IbmAnalyticsEngineApiV3 client: The client used to submit applications.
+    :param str instance_id: The identifier of the Analytics Engine instance to
+           which the applications are submitted.
+    :param applications: The application details to submit.
+    :param int max_workers: (optional) Maximum number of submissions in flight.
+    :param float rate_limit: (optional) Maximum average number of submissions
+           started per second.
+    :param int burst: (optional) Number of submissions that may start at once
+           when `rate_limit` is set.
+    :param bool ordered: (optional) Yield results in input order. When False,
+           results are yielded as soon as each submission completes.
+    :param dict headers: A `dict` containing the request headers
+    :return: An iterator of `SubmissionResult`, one per application.
+    :rtype: Iterator[SubmissionResult]
+    """
+    if not instance_id:
+        raise ValueError('instance_id must be provided')
+    if max_workers < 1:
+        raise ValueError('max_workers must be at least 1')
+    limiter = RateLimiter(rate_limit, burst=burst) if rate_limit else None
+
+    def submit(index: int, application_details) -> SubmissionResult:
+        if limiter is not None:
+            limiter.acquire()
+        try:
+            result = client.create_application(
+                instance_id, application_details=application_details, **kwargs
+            ).get_result()
+        except Exception as error:  # pylint: disable=broad-except
+            return SubmissionResult(index, application_details, error=error)
+        return SubmissionResult(index, application_details, response=ApplicationResponse.from_dict(result))
+
+    return _run_submissions(submit, applications, max_workers, ordered)
+
+
+def _run_submissions(submit, applications, max_workers: int, ordered: bool) -> Iterator[SubmissionResult]:
+    # Results waiting to be yielded count against the window too, so a slow
+    # submission at the head of an ordered run cannot make the buffer grow
+    # without bound.
+    window = max_workers * 2
+    items = enumerate(applications)
+    pending = {}
+    completed = {}
+    next_index = 0
+    exhausted = False
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='iaesdk-submit') as executor:
+        try:
+            while True:
+                while not exhausted and len(pending) + len(completed) < window:
+                    item = next(items, None)
+                    if item is None:
+                        exhausted = True
+                    else:
+                        pending[executor.submit(submit, *item)] = item[0]
+                if not pending:
+                    return
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    del pending[future]
+                    result = future.result()
+                    if ordered:
+                        completed[result.index] = result
+                    else:
+                        yield result
+                while next_index in completed:
+                    yield completed.pop(next_index)
+                    next_index += 1
+        finally:
+            for future in pending:
+                future.cancel()
@@ -0,0 +1,388 @@
+# coding: utf-8
+
+# (C) Copyright IBM Corp. 2024.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Management of the access tokens of token-based authenticators.
+"""
+
+from typing import Callable, Optional
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+import weakref
+
+from ibm_cloud_sdk_core.authenticators.authenticator import Authenticator
+from ibm_cloud_sdk_core.token_managers.jwt_token_manager import JWTTokenManager
+from ibm_cloud_sdk_core.token_managers.token_manager import TokenManager
+import jwt
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Longest wait between attempts after failed background refreshes.
+_MAX_RETRY_DELAY = 60.0
+
+# The attributes of token managers that identify the credentials of a token.
+_CREDENTIAL_ATTRIBUTES = (
+    'url',
+    'apikey',
+    'client_id',
+    'client_secret',
+    'scope',
+    'iam_profile_name',
+    'iam_profile_id',
+    'iam_profile_crn',
+    'cr_token_filename',
+    'username',
+    'password',
+)
+
+
+def get_token_manager(authenticator: Authenticator) -> Optional[TokenManager]:
+    """
+    Return the token manager of `authenticator`, or None for authenticators
+    that do not fetch tokens, such as BearerTokenAuthenticator.
+    """
+    token_manager = getattr(authenticator, 'token_manager', None)
+    if isinstance(token_manager, TokenManager):
+        return token_manager
+    return None
+
+
+class TokenRefresher:
+    """
+    Refreshes the access token of a token manager on a background thread, ahead
+    of its refresh time, so that requests never wait for the token service. The
+    authenticator would otherwise refresh the token within the first request
+    made after the refresh time.
+
+    There is at most one TokenRefresher per token manager, see
+    `for_token_manager()`, so clients sharing an authenticator share the
+    background refresh. Refreshes use the token manager's own locking, so a
+    refresh in flight is never duplicated by a request.
+
+    If a background refresh fails, it is retried with exponential backoff; in the
+    meantime, requests refresh the token as they would without a TokenRefresher.
+    """
+
+    _instances = weakref.WeakKeyDictionary()
+    _instances_lock = threading.Lock()
+
+    def __init__(self, token_manager: TokenManager, *, lead_time: float = 60.0) -> None:
+        """
+        Initialize a TokenRefresher object. Use `for_token_manager()` rather than
+        creating TokenRefresher objects directly.
+
+        :param TokenManager token_manager: The token manager whose token is
+               refreshed.
+        :param float lead_time: (optional) Seconds before the token manager's
+               refresh time to refresh the token. At most the last 20% of the
+               token's lifetime are spent ahead of the refresh time.
+        """
+        if lead_time < 0:
+            raise ValueError('lead_time must not be negative')
+        self.lead_time = lead_time
+        self.refreshes = 0
+        self._token_manager = weakref.ref(token_manager)
+        self._stopped = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_token_manager(cls, token_manager: TokenManager, *, lead_time: float = None) -> 'TokenRefresher':
+        """
+        Return the TokenRefresher of `token_manager`, creating it if needed.
+
+        :param TokenManager token_manager: The token manager whose token is
+               refreshed.
+        :param float lead_time: (optional) Seconds before the token manager's
+               refresh time to refresh the token. Defaults to 60 seconds for a new
+               TokenRefresher, and leaves the lead time of an existing one unchanged.
+        :rtype: TokenRefresher
+        """
+        with cls._instances_lock:
+            refresher = cls._instances.get(token_manager)
+            if refresher is None:
+                refresher = cls._instances[token_manager] = cls(
+                    token_manager, lead_time=60.0 if lead_time is None else lead_time
+                )
+            elif lead_time is not None:
+                if lead_time < 0:
+                    raise ValueError('lead_time must not be negative')
+                refresher.lead_time = lead_time
+            return refresher
+
+    @property
+    def running(self) -> bool:
+        """True while the background thread is running."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """
+        Start refreshing in the background. The first token is fetched right away
+        if the token manager does not have a valid token yet.
+        """
+        with self._lock:
+            if self.running:
+                return
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._run, name='iaesdk-token-refresher', daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Stop refreshing in the background. A refresh in flight is completed.
+        """
+        self._stopped.set()
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+
+    def _run(self) -> None:
+        failures = 0
+        while not self._stopped.is_set():
+            token_manager = self._token_manager()
+            if token_manager is None:
+                return
+            if failures:
+                delay = min(2.0 ** (failures - 1), _MAX_RETRY_DELAY)
+            else:
+                delay = self._refresh_delay(token_manager)
+            # Don't keep the token manager alive while waiting.
+            del token_manager
+            if self._stopped.wait(delay):
+                return
+
+            token_manager = self._token_manager()
+            if token_manager is None:
+                return
+            try:
+                self._refresh(token_manager)
+                self.refreshes += 1
+                failures = 0
+            except Exception:  # pylint: disable=broad-except
+                failures += 1
+                logger.warning('Background token refresh failed (attempt %d)', failures, exc_info=True)
+            del token_manager
+
+    def _refresh_delay(self, token_manager: TokenManager) -> float:
+        if token_manager.access_token is None or token_manager.expire_time <= 0:
+            return 0.0
+        # The token manager refreshes at 80% of the token's lifetime; stay
+        # within the last 20%, so tokens with short lifetimes are not refreshed
+        # over and over.
+        lead_time = min(self.lead_time, max(token_manager.expire_time - token_manager.refresh_time, 0))
+        return max(token_manager.refresh_time - lead_time - time.time(), 0.0)
+
+    @staticmethod
+    def _refresh(token_manager: TokenManager) -> None:
+        # Make the token due for refresh, then let get_token() refresh it: it
+        # pushes the refresh time back before requesting the token, so requests
+        # made meanwhile keep using the current token instead of refreshing it too.
+        with token_manager.lock:
+            if token_manager.access_token is not None:
+                token_manager.refresh_time = 0
+        try:
+            token_manager.get_token()
+        except Exception:
+            # A failed request for a first (or expired) token is left marked as
+            # in flight for a minute, which would hold back the retry.
+            with token_manager.lock:
+                token_manager.request_time = 0
+            raise
+
+
+def default_token_cache_path() -> str:
+    """
+    Return the default path of the file of a FileTokenCache:
+    `$XDG_CACHE_HOME/iaesdk/tokens.json`, or `~/.cache/iaesdk/tokens.json`.
+    """
+    cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(cache_home, 'iaesdk', 'tokens.json')
+
+
+class FileTokenCache:
+    """
+    A token cache in a file shared by the processes of a host, so that they
+    fetch one access token per set of credentials instead of one each.
+
+    Once installed on a token manager, every token request first looks for a
+    token of the same credentials in the file, and uses it if it is at least
+    `margin` seconds away from its refresh time. Otherwise it fetches a new
+    token and stores it. Requests hold an exclusive lock on the file from the
+    lookup to the store, so when the processes' tokens are due for refresh, one
+    of them fetches the new token and the others find it in the file.
+
+    The file is replaced atomically and only readable by its owner. Credentials
+    are not stored in it, only a hash of them.
+
+    Requires a platform with `fcntl` (Linux and macOS).
+    """
+
+    def __init__(self, path: str = None, *, margin: float = 300.0) -> None:
+        """
+        Initialize a FileTokenCache object.
+
+        :param str path: (optional) Path of the cache file. Defaults to
+               `default_token_cache_path()`.
+        :param float margin: (optional) Seconds before their refresh time that
+               cached tokens are no longer used. Keep it above the lead time of a
+               TokenRefresher, so background refreshes fetch new tokens.
+        """
+        if fcntl is None:  # pragma: no cover
+            raise NotImplementedError('FileTokenCache requires fcntl, which is not available on this platform')
+        if margin < 0:
+            raise ValueError('margin must not be negative')
+        self.path = path or default_token_cache_path()
+        self.margin = margin
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def install(self, token_manager: TokenManager) -> None:
+        """
+        Make `token_manager` get its tokens through this cache. Installing a cache
+        again replaces the previous one.
+
+        :param TokenManager token_manager: The token manager.
+        """
+        if not isinstance(token_manager, JWTTokenManager):
+            raise ValueError('token_manager must be a JWTTokenManager')
+        request_token = getattr(token_manager.request_token, '__wrapped__', token_manager.request_token)
+        key = _credentials_key(token_manager)
+
+        def cached_request_token() -> dict:
+            return self.request_token(key, token_manager.token_name, request_token)
+
+        cached_request_token.__wrapped__ = request_token
+        token_manager.request_token = cached_request_token
+
+    @staticmethod
+    def uninstall(token_manager: TokenManager) -> None:
+        """
+        Make `token_manager` fetch its tokens directly again.
+
+        :param TokenManager token_manager: The token manager.
+        """
+        if hasattr(token_manager.request_token, '__wrapped__'):
+            del token_manager.request_token
+
+    def request_token(self, key: str, token_name: str, request_token: Callable[[], dict]) -> dict:
+        """
+        Return the token response cached under `key`, or the response of
+        `request_token()`, which is then cached.
+
+        :param str key: The key of the credentials of the token.
+        :param str token_name: The name of the token in the response.
+        :param request_token: Fetches a new token response.
+        :rtype: dict
+        """
+        # The file lock is held per process; the thread lock serializes the
+        # threads of this process.
+        with self._lock, self._locked():
+            tokens = self._read()
+            response = tokens.get(key)
+            if response is not None and self._usable(response.get(token_name)):
+                self.hits += 1
+                return response
+
+            self.misses += 1
+            response = request_token()
+            now = time.time()
+            tokens = {k: v for k, v in tokens.items() if _expire_time(v.get(token_name)) > now}
+            tokens[key] = response
+            self._write(tokens)
+            return response
+
+    def _usable(self, token: Optional[str]) -> bool:
+        try:
+            claims = jwt.decode(token, options={'verify_signature': False, 'verify_aud': False})
+            refresh_time = claims['exp'] - (claims['exp'] - claims['iat']) * 0.2
+        except (jwt.InvalidTokenError, KeyError, TypeError):
+            return False
+        return time.time() < refresh_time - self.margin
+
+    def _locked(self) -> '_FileLock':
+        return _FileLock(self.path + '.lock')
+
+    def _read(self) -> dict:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as cache_file:
+                tokens = json.load(cache_file)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError):
+            logger.warning('Ignoring unreadable token cache %s', self.path, exc_info=True)
+            return {}
+        return tokens if isinstance(tokens, dict) else {}
+
+    def _write(self, tokens: dict) -> None:
+        directory = os.path.dirname(os.path.abspath(self.path))
+        descriptor, temporary_path = tempfile.mkstemp(dir=directory, prefix='.tokens-', suffix='.tmp')
+        try:
+            with os.fdopen(descriptor, 'w', encoding='utf-8') as temporary_file:
+                json.dump(tokens, temporary_file)
+                temporary_file.flush()
+                os.fsync(temporary_file.fileno())
+            os.replace(temporary_path, self.path)
+        except BaseException:
+            os.unlink(temporary_path)
+            raise
+
+
+class _FileLock:
+    # An exclusive advisory lock on a file, created with its directory if needed.
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._file = None
+
+    def __enter__(self) -> '_FileLock':
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), mode=0o700, exist_ok=True)
+        self._file = open(
+            os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600), 'r+b'
+        )  # pylint: disable=consider-using-with
+        fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        try:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        finally:
+            self._file.close()
+            self._file = None
+
+
+def _credentials_key(token_manager: TokenManager) -> str:
+    credentials = [type(token_manager).__name__]
+    credentials.extend(str(getattr(token_manager, name, None)) for name in _CREDENTIAL_ATTRIBUTES)
+    return hashlib.sha256('\0'.join(credentials).encode('utf-8')).hexdigest()
+
+
+def _expire_time(token: Optional[str]) -> float:
+    try:
+        return jwt.decode(token, options={'verify_signature': False, 'verify_aud': False})['exp']
+    except (jwt.InvalidTokenError, KeyError, TypeError):
+        return 0
@@ -0,0 +1,134 @@
+# coding: utf-8
+
+# (C) Copyright IBM Corp. 2024.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+OpenTelemetry tracing of the operations of the clients.
+"""
+
+from typing import Callable, Dict, Optional, Tuple
+from urllib.parse import unquote, urlsplit
+import re
+
+from ibm_cloud_sdk_core import ApiException, DetailedResponse
+
+from .common import with_response_hook
+from .version import __version__
+
+try:
+    from opentelemetry import propagate, trace
+except ImportError:  # pragma: no cover
+    propagate = None
+    trace = None
+
+_RESOURCE_PATH = re.compile(r'/v[23]/analytics_engines/([^/?#]+)(?:/spark_applications/([^/?#]+))?')
+
+
+def request_attributes(request: dict, operation_id: Optional[str]) -> Dict[str, object]:
+    """
+    Return the span attributes describing a prepared request: the operation, the
+    instance and application it is for, the HTTP method and the URL.
+
+    :param dict request: The prepared request.
+    :param str operation_id: The operation sending the request.
+    :rtype: Dict[str, object]
+    """
+    url = request.get('url') or ''
+    parts = urlsplit(url)
+    attributes = {'http.request.method': request.get('method'), 'url.full': url}
+    if parts.hostname:
+        attributes['server.address'] = parts.hostname
+    if operation_id:
+        attributes['iaesdk.operation'] = operation_id
+    match = _RESOURCE_PATH.search(parts.path)
+    if match is not None:
+        attributes['iaesdk.instance_id'] = unquote(match.group(1))
+        if match.group(2):
+            attributes['iaesdk.application_id'] = unquote(match.group(2))
+    return attributes
+
+
+class RequestTracer:
+    """
+    Traces the requests of a client: one CLIENT span per call, and the trace
+    context propagated to the service in the request headers.
+
+    The span of a call is named after its operation and has the attributes of
+    `request_attributes()`, the HTTP status code of the response and, when the
+    transport retried the request, the number of retries as
+    `http.request.resend_count`. Calls that raise an exception have an error
+    status, with the exception recorded.
+    """
+
+    def __init__(self, tracer_provider=None, *, propagate_context: bool = True) -> None:
+        """
+        Initialize a RequestTracer object.
+
+        :param TracerProvider tracer_provider: (optional) The tracer provider.
+               Defaults to the global tracer provider of OpenTelemetry.
+        :param bool propagate_context: (optional) Add the trace context headers,
+               such as `traceparent`, to the requests, with the global propagator
+               of OpenTelemetry.
+        """
+        if trace is None:
+            raise ImportError('opentelemetry-api is required for tracing; install "iaesdk[tracing]"')
+        self.tracer = trace.get_tracer(__name__, __version__, tracer_provider=tracer_provider)
+        self.propagate_context = propagate_context
+
+    def trace(
+        self, request: dict, operation_id: Optional[str], send: Callable[[], DetailedResponse]
+    ) -> DetailedResponse:
+        """
+        Return `send()`, in a new span for the call sending `request`.
+
+        :param dict request: The prepared request.
+        :param str operation_id: The operation sending the request.
+        :param send: Sends the request.
+        :rtype: DetailedResponse
+        """
+        name = operation_id or request.get('method') or 'HTTP'
+        with self.tracer.start_as_current_span(
+            name, kind=trace.SpanKind.CLIENT, attributes=request_attributes(request, operation_id)
+        ) as span:
+            try:
+                response = send()
+            except ApiException as error:
+                span.set_attribute('http.response.status_code', error.status_code)
+                span.set_attribute('error.type', str(error.status_code))
+                raise
+            span.set_attribute('http.response.status_code', response.get_status_code())
+            return response
+
+    def prepare(self, request: dict, kwargs: dict) -> Tuple[dict, dict]:
+        """
+        Return `request` with the trace context headers of the current span, and
+        the keyword arguments of `send()` with a hook recording retries on it.
+
+        :param dict request: The prepared request.
+        :param dict kwargs: The keyword arguments of `send()`.
+        :rtype: Tuple[dict, dict]
+        """
+        if self.propagate_context:
+            headers = dict(request.get('headers') or {})
+            propagate.inject(headers)
+            request = dict(request, headers=headers)
+        return request, with_response_hook(kwargs, _record_retries)
+
+
+def _record_retries(response, **kwargs):  # pylint: disable=unused-argument
+    retries = getattr(response.raw, 'retries', None)
+    if retries is not None and retries.history:
+        trace.get_current_span().set_attribute('http.request.resend_count', len(retries.history))
+    return response
@@ -0,0 +1,196 @@
+# coding: utf-8
+
+# (C) Copyright IBM Corp. 2024.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Tunable HTTP connection pools that several clients can share.
+"""
+
+from typing import Dict, Optional
+import logging
+import socket
+import threading
+import time
+
+from ibm_cloud_sdk_core.http_adapter import SSLHTTPAdapter
+from urllib3 import PoolManager
+from urllib3.connection import HTTPConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+
+class _IdleEvictingPool:
+    # Mixin for urllib3 connection pools that closes pooled connections left
+    # idle for more than `idle_timeout` seconds when they are taken from the
+    # pool. urllib3 reconnects closed connections on their next request.
+    idle_timeout = None
+
+    def _put_conn(self, conn) -> None:
+        if conn is not None:
+            conn.iaesdk_idle_since = time.monotonic()
+        super()._put_conn(conn)
+
+    def _get_conn(self, timeout: float = None):
+        conn = super()._get_conn(timeout)
+        idle_since = getattr(conn, 'iaesdk_idle_since', None)
+        if idle_since is not None and time.monotonic() - idle_since > self.idle_timeout:
+            logger.debug('Closing connection idle for more than %s seconds: %s', self.idle_timeout, self.host)
+            conn.close()
+        return conn
+
+
+class PooledTransport:
+    """
+    HTTP connection pools with explicit sizing, TCP keep-alive and idle
+    connection eviction, for use by one or more clients.
+
+    Clients using the same PooledTransport (see `set_transport()` on the
+    clients) share its connections, and so the TLS sessions they have set up,
+    while keeping their own retry and SSL verification settings.
+
+    The defaults of the SDK are 10 pools of at most 10 connections each. With
+    more concurrent requests to a host than `pool_maxsize`, the extra
+    connections are closed after use ("connection pool is full" warnings), and
+    later requests pay for new connections.
+    """
+
+    def __init__(
+        self,
+        *,
+        pool_connections: int = 10,
+        pool_maxsize: int = 10,
+        pool_block: bool = False,
+        keep_alive: bool = True,
+        idle_timeout: float = None,
+    ) -> None:
+        """
+        Initialize a PooledTransport object.
+
+        :param int pool_connections: (optional) Number of hosts to keep a
+               connection pool for.
+        :param int pool_maxsize: (optional) Maximum number of connections kept per
+               host.
+        :param bool pool_block: (optional) When all `pool_maxsize` connections to a
+               host are in use, wait for one to be returned instead of opening an
+               extra connection.
+        :param bool keep_alive: (optional) Enable TCP keep-alive on the
+               connections, so that idle connections are not dropped silently by
+               firewalls and load balancers.
+        :param float idle_timeout: (optional) Close pooled connections that have
+               been idle for longer than this many seconds, instead of reusing them.
+               Use a value below the idle timeout of the server or load balancer.
+        """
+        if pool_connections < 1:
+            raise ValueError('pool_connections must be at least 1')
+        if pool_maxsize < 1:
+            raise ValueError('pool_maxsize must be at least 1')
+        if idle_timeout is not None and idle_timeout <= 0:
+            raise ValueError('idle_timeout must be positive')
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self.keep_alive = keep_alive
+        self.idle_timeout = idle_timeout
+        self._pool_managers: Dict[bool, PoolManager] = {}
+        self._lock = threading.Lock()
+
+    def adapter(self, *, max_retries: Optional[Retry] = None, disable_ssl_verification: bool = False) -> SSLHTTPAdapter:
+        """
+        Return a new transport adapter using the connection pools of this transport.
+
+        :param Retry max_retries: (optional) The retry configuration of the adapter.
+        :param bool disable_ssl_verification: (optional) Whether the adapter skips
+               verification of the server's certificate. Connections are shared only
+               between adapters with the same setting.
+        :rtype: SSLHTTPAdapter
+        """
+        kwargs = {}
+        if max_retries is not None:
+            # requests turns max_retries=None into urllib3's default of 3 retries.
+            kwargs['max_retries'] = max_retries
+        return _PooledHTTPAdapter(
+            self,
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            pool_block=self.pool_block,
+            _disable_ssl_verification=disable_ssl_verification,
+            **kwargs,
+        )
+
+    def close(self) -> None:
+        """
+        Close all pooled connections. The transport remains usable, and opens new
+        connections as needed.
+        """
+        with self._lock:
+            for pool_manager in self._pool_managers.values():
+                pool_manager.clear()
+
+    def _pool_manager(self, adapter: '_PooledHTTPAdapter', init_poolmanager, *args, **kwargs) -> PoolManager:
+        # Create the pool manager for the SSL verification setting of `adapter`
+        # the first time it is needed, with `init_poolmanager()`.
+        disable_ssl_verification = bool(adapter._disable_ssl_verification)  # pylint: disable=protected-access
+        with self._lock:
+            pool_manager = self._pool_managers.get(disable_ssl_verification)
+            if pool_manager is None:
+                if self.keep_alive:
+                    kwargs['socket_options'] = HTTPConnection.default_socket_options + _keep_alive_socket_options()
+                init_poolmanager(*args, **kwargs)
+                pool_manager = self._pool_managers[disable_ssl_verification] = adapter.poolmanager
+                if self.idle_timeout is not None:
+                    pool_manager.pool_classes_by_scheme = {
+                        'http': type(
+                            'IdleEvictingHTTPConnectionPool',
+                            (_IdleEvictingPool, HTTPConnectionPool),
+                            {'idle_timeout': self.idle_timeout},
+                        ),
+                        'https': type(
+                            'IdleEvictingHTTPSConnectionPool',
+                            (_IdleEvictingPool, HTTPSConnectionPool),
+                            {'idle_timeout': self.idle_timeout},
+                        ),
+                    }
+            return pool_manager
+
+
+class _PooledHTTPAdapter(SSLHTTPAdapter):
+    # An SSLHTTPAdapter whose pool manager belongs to a PooledTransport.
+
+    def __init__(self, transport: PooledTransport, *args, **kwargs) -> None:
+        self._transport = transport
+        super().__init__(*args, **kwargs)
+
+    def init_poolmanager(self, *args, **kwargs) -> None:
+        self.poolmanager = self._transport._pool_manager(  # pylint: disable=protected-access
+            self, super().init_poolmanager, *args, **kwargs
+        )
+
+    def close(self) -> None:
+        # The connections belong to the transport, and may be in use by other
+        # clients; only proxy connections are owned by the adapter.
+        for proxy in self.proxy_manager.values():
+            proxy.clear()
+
+
+def _keep_alive_socket_options() -> list:
+    options = [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+    # Probe idle connections after 60 seconds, every 15 seconds, where the
+    # platform lets us tune it.
+    for name, value in (('TCP_KEEPIDLE', 60), ('TCP_KEEPINTVL', 15), ('TCP_KEEPCNT', 4)):
+        if hasattr(socket, name):
+            options.append((socket.IPPROTO_TCP, getattr(socket, name), value))
+    return options
@@ -0,0 +1,333 @@
+# coding: utf-8
+
+# (C) Copyright IBM Corp. 2024.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Batched polling of Spark application states.
+"""
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple
+import heapq
+import itertools
+import logging
+import threading
+import time
+
+from ibm_cloud_sdk_core import ApiException
+
+from .ibm_analytics_engine_api_v3 import IbmAnalyticsEngineApiV3, TERMINAL_APPLICATION_STATES
+
+logger = logging.getLogger(__name__)
+
+
+class ApplicationStateEvent:
+    """
+    A change in the state of a watched Spark application.
+
+    :attr str instance_id: The identifier of the Analytics Engine instance.
+    :attr str application_id: The identifier of the application.
+    :attr str previous_state: The state seen by the previous poll, or None for the
+          first poll of the application.
+    :attr str state: The current state of the application.
+    :attr dict result: The `ApplicationGetStateResponse` dict returned by the poll.
+    """
+
+    def __init__(
+        self, instance_id: str, application_id: str, previous_state: Optional[str], state: str, result: dict
+    ) -> None:
+        self.instance_id = instance_id
+        self.application_id = application_id
+        self.previous_state = previous_state
+        self.state = state
+        self.result = result
+
+    @property
+    def terminal(self) -> bool:
+        """True when the application has reached a terminal state."""
+        return self.state in TERMINAL_APPLICATION_STATES
+
+    def __repr__(self) -> str:
+        return 'ApplicationStateEvent({0!r}, {1!r}, {2!r} -> {3!r})'.format(
+            self.instance_id, self.application_id, self.previous_state, self.state
+        )
+
+
+class _Watch:
+    # Polling state of a single application.
+    __slots__ = ('instance_id', 'application_id', 'state', 'interval')
+
+    def __init__(self, instance_id: str, application_id: str) -> None:
+        self.instance_id = instance_id
+        self.application_id = application_id
+        self.state = None
+        self.interval = None
+
+
+class ApplicationStateWatcher:
+    """
+    Polls the state of many Spark applications over a shared pool of worker threads.
+
+    Each application is polled at an interval that depends on its state: quickly
+    while `accepted`, less often while `running`, and increasingly less often
+    (up to `max_poll_interval`) for as long as the state does not change. An
+    application stops being polled once it reaches a terminal state.
+
+    State changes are reported to the `on_event` callback, if given, and through
+    the `events()` iterator. Up to `max_queued_events` events wait for `events()`
+    to consume them; beyond that, the oldest are dropped.
+
+    >>> with ApplicationStateWatcher(service, [(instance_id, application_id)]) as watcher:
+    ...     for event in watcher.events():
+    ...         print(event.application_id, event.state)
+    """
+
+    DEFAULT_POLL_INTERVALS = {
+        'accepted': 2.0,
+        'running': 10.0,
+    }
+    DEFAULT_POLL_INTERVAL = 5.0
+    DEFAULT_MAX_POLL_INTERVAL = 60.0
+    DEFAULT_BACKOFF_FACTOR = 1.5
+    DEFAULT_MAX_QUEUED_EVENTS = 10000
+
+    def __init__(
+        self,
+        client: IbmAnalyticsEngineApiV3,
+        applications: Iterable[Tuple[str, str]] = (),
+        *,
+        max_workers: int = 8,
+        poll_intervals: Dict[str, float] = None,
+        default_poll_interval: float = DEFAULT_POLL_INTERVAL,
+        max_poll_interval: float = DEFAULT_MAX_POLL_INTERVAL,
+        backoff_factor: float = DEFAULT_BACKOFF_FACTOR,
+        max_queued_events: int = DEFAULT_MAX_QUEUED_EVENTS,
+        on_event: Callable[[ApplicationStateEvent], None] = None,
+        on_error: Callable[[str, str, Exception], None] = None,
+    ) -> None:
+        """
+        Initialize a ApplicationStateWatcher object.
+
+        :param IbmAnalyticsEngineApiV3 client: The client used to poll application states.
+        :param Iterable[Tuple[str, str]] applications: (optional) `(instance_id,
+               application_id)` pairs to watch. More can be added with `add()`.
+        :param int max_workers: (optional) Number of threads polling concurrently.
+        :param Dict[str, float] poll_intervals: (optional) Initial poll interval in
+               seconds for each application state. Overrides `DEFAULT_POLL_INTERVALS`.
+        :param float default_poll_interval: (optional) Initial poll interval for
+               states without an entry in `poll_intervals`.
+        :param float max_poll_interval: (optional) Upper bound for the poll interval
+               of an application whose state does not change.
+        :param float backoff_factor: (optional) Factor the poll interval grows by
+               after each poll that sees no state change.
+        :param int max_queued_events: (optional) Number of events kept for
+               `events()` until it consumes them. When more are waiting, the
+               oldest are dropped. Set it to 0 when only `on_event` is used.
+        :param on_event: (optional) Called with each `ApplicationStateEvent`, on a
+               worker thread.
+        :param on_error: (optional) Called with `(instance_id, application_id,
+               error)` when a poll fails, on a worker thread. Failed polls are
+               retried, except for applications that no longer exist (HTTP 404),
+               which stop being watched. A state response without a state counts
+               as a failed poll. Exceptions raised by `on_event` and `on_error`
+               are logged.
+        """
+        if max_workers < 1:
+            raise ValueError('max_workers must be at least 1')
+        if max_queued_events < 0:
+            raise ValueError('max_queued_events must not be negative')
+        self._client = client
+        self._max_workers = max_workers
+        self._poll_intervals = dict(self.DEFAULT_POLL_INTERVALS, **(poll_intervals or {}))
+        self._default_poll_interval = default_poll_interval
+        self._max_poll_interval = max_poll_interval
+        self._backoff_factor = backoff_factor
+        self._on_event = on_event
+        self._on_error = on_error
+
+        self._condition = threading.Condition()
+        self._watches = {}
+        self._schedule = []
+        self._sequence = itertools.count()
+        self._events = deque(maxlen=max_queued_events)
+        self._executor = None
+        self._thread = None
+        self._stopped = False
+        for instance_id, application_id in applications:
+            self.add(instance_id, application_id)
+
+    def __enter__(self) -> 'ApplicationStateWatcher':
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    @property
+    def states(self) -> Dict[Tuple[str, str], Optional[str]]:
+        """The last seen state of each watched application, keyed by `(instance_id, application_id)`."""
+        with self._condition:
+            return {key: watch.state for key, watch in self._watches.items()}
+
+    def add(self, instance_id: str, application_id: str) -> None:
+        """
+        Start watching an application. Adding an application that is already
+        watched has no effect.
+        """
+        if not instance_id:
+            raise ValueError('instance_id must be provided')
+        if not application_id:
+            raise ValueError('application_id must be provided')
+        key = (instance_id, application_id)
+        with self._condition:
+            if key in self._watches:
+                return
+            watch = self._watches[key] = _Watch(instance_id, application_id)
+            self._schedule_poll(watch, 0.0)
+
+    def remove(self, instance_id: str, application_id: str) -> None:
+        """
+        Stop watching an application.
+        """
+        with self._condition:
+            self._watches.pop((instance_id, application_id), None)
+            self._condition.notify_all()
+
+    def start(self) -> None:
+        """
+        Start polling on background threads.
+        """
+        with self._condition:
+            if self._thread is not None:
+                return
+            self._stopped = False
+            self._executor = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix='iaesdk-watcher')
+            self._thread = threading.Thread(target=self._run, name='iaesdk-watcher-scheduler', daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Stop polling. Polls already in flight are allowed to finish.
+        """
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+            thread, self._thread = self._thread, None
+            executor, self._executor = self._executor, None
+        if thread is not None:
+            thread.join()
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def events(self, timeout: float = None) -> Iterator[ApplicationStateEvent]:
+        """
+        Iterate over state change events as they happen.
+
+        The iterator ends once every watched application has reached a terminal
+        state and all events have been consumed, when the watcher is stopped, or
+        when no event arrives within `timeout` seconds. Events dropped from a full
+        queue (see `max_queued_events`) are not reported.
+        """
+        while True:
+            with self._condition:
+                deadline = None if timeout is None else time.monotonic() + timeout
+                while not self._events and self._watches and not self._stopped:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        return
+                    self._condition.wait(remaining)
+                if not self._events:
+                    return
+                event = self._events.popleft()
+            yield event
+
+    def _schedule_poll(self, watch: _Watch, delay: float) -> None:
+        # Entries refer to the watch itself, so that those of a removed watch are
+        # dropped even if the application is added again.
+        heapq.heappush(self._schedule, (time.monotonic() + delay, next(self._sequence), watch))
+        self._condition.notify_all()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._stopped:
+                    if self._schedule:
+                        wait = self._schedule[0][0] - time.monotonic()
+                        if wait <= 0:
+                            break
+                        self._condition.wait(wait)
+                    else:
+                        self._condition.wait()
+                if self._stopped:
+                    return
+                _, _, watch = heapq.heappop(self._schedule)
+                if self._watches.get((watch.instance_id, watch.application_id)) is not watch:
+                    continue
+                executor = self._executor
+            executor.submit(self._poll, watch)
+
+    def _poll(self, watch: _Watch) -> None:
+        key = (watch.instance_id, watch.application_id)
+        try:
+            result = self._client.get_application_state(watch.instance_id, watch.application_id).get_result()
+            state = result.get('state')
+            if state is None:
+                raise ValueError('the state response of application {0} has no state'.format(watch.application_id))
+        except Exception as error:  # pylint: disable=broad-except
+            self._handle_error(watch, error)
+            return
+
+        event = None
+        with self._condition:
+            if self._watches.get(key) is not watch:
+                return
+            if state != watch.state:
+                event = ApplicationStateEvent(watch.instance_id, watch.application_id, watch.state, state, result)
+                watch.state = state
+                watch.interval = self._poll_intervals.get(state, self._default_poll_interval)
+            else:
+                watch.interval = min(watch.interval * self._backoff_factor, self._max_poll_interval)
+            if state in TERMINAL_APPLICATION_STATES:
+                del self._watches[key]
+            else:
+                self._schedule_poll(watch, watch.interval)
+            if event is not None:
+                self._events.append(event)
+            self._condition.notify_all()
+        if event is not None and self._on_event is not None:
+            # Polls run on the executor, which would silently drop the exception.
+            try:
+                self._on_event(event)
+            except Exception:  # pylint: disable=broad-except
+                logger.exception('on_event failed for application %s', watch.application_id)
+
+    def _handle_error(self, watch: _Watch, error: Exception) -> None:
+        key = (watch.instance_id, watch.application_id)
+        logger.debug('Polling the state of application %s failed: %s', watch.application_id, error)
+        with self._condition:
+            if self._watches.get(key) is watch:
+                if isinstance(error, ApiException) and error.status_code == 404:
+                    del self._watches[key]
+                else:
+                    interval = watch.interval or self._default_poll_interval
+                    watch.interval = min(interval * self._backoff_factor, self._max_poll_interval)
+                    self._schedule_poll(watch, watch.interval)
+                self._condition.notify_all()
+        if self._on_error is not None:
+            try:
+                self._on_error(watch.instance_id, watch.application_id, error)
+            except Exception:  # pylint: disable=broad-except
+                logger.exception('on_error failed for application %s', watch.application_id)
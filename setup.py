@@ -48,6 +48,12 @@ setup(
     license="Apache 2.0",
     install_requires=install_requires,
     tests_require=tests_require,
+    extras_require={
+        "async": ["aiohttp>=3.8.0,<4.0.0"],
+        "columnar": ["numpy>=1.21.0", "pandas>=1.3.0", "pyarrow>=10.0.0"],
+        "prometheus": ["prometheus_client>=0.14.0"],
+        "tracing": ["opentelemetry-api>=1.20.0"],
+    },
     author="IBM",
     author_email="surya.penumatcha@ibm.com",
     long_description=readme,
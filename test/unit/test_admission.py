@@ -0,0 +1,278 @@
+# -*- coding: utf-8 -*-
+# (C) Copyright IBM Corp. 2024.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Unit Tests for iaesdk.admission
+"""
+
+import json
+import re
+import threading
+import time
+
+from ibm_cloud_sdk_core.authenticators.no_auth_authenticator import NoAuthAuthenticator
+import pytest
+import responses
+
+from iaesdk.admission import AdmissionScheduler, ResourceFootprint, estimate_footprint, parse_memory
+from iaesdk.fake_server import FakeAnalyticsEngineServer
+from iaesdk.ibm_analytics_engine_api_v3 import ApplicationRequestApplicationDetails, IbmAnalyticsEngineApiV3
+from iaesdk.metrics import InMemoryMetrics
+
+_service = IbmAnalyticsEngineApiV3(authenticator=NoAuthAuthenticator())
+_base_url = 'https://api.us-south.ae.cloud.ibm.com'
+_service.set_service_url(_base_url)
+
+_instance_url = _base_url + '/v3/analytics_engines/e64c907a-e82f-46fd-addc-ccfafbd28b09'
+
+
+class _FakeInstance:
+    """
+    Mock Analytics Engine instance with 4 cores and 8 GiB of memory. Accepted
+    applications run, holding their estimated footprint, until `finish()` is
+    called.
+    """
+
+    def __init__(self, reject=()):
+        self.lock = threading.Lock()
+        self.running = {}
+        self.submitted = []
+        self.reject = set(reject)
+        responses.add(
+            responses.GET,
+            _instance_url + '/resource_consumption_limits',
+            json={'max_cores': '4', 'max_memory': '8G'},
+        )
+        responses.add(responses.GET, _instance_url + '/default_configs', json={'spark.executor.instances': '1'})
+        responses.add_callback(
+            responses.GET, _instance_url + '/current_resource_consumption', callback=self.consumption
+        )
+        responses.add_callback(responses.POST, _instance_url + '/spark_applications', callback=self.create)
+        responses.add_callback(
+            responses.GET, re.compile(_instance_url + '/spark_applications/id-[^/]+/state'), callback=self.state
+        )
+
+    def consumption(self, request):
+        with self.lock:
+            cores = sum(f.cores for f in self.running.values())
+            memory = sum(f.memory for f in self.running.values())
+        return (200, {'Content-Type': 'application/json'}, json.dumps({'cores': str(cores), 'memory': '%dm' % memory}))
+
+    def create(self, request):
+        details = json.loads(request.body)['application_details']
+        name = details['name']
+        if name in self.reject:
+            self.reject.discard(name)
+            return (429, {'Content-Type': 'application/json'}, json.dumps({'message': 'quota exceeded'}))
+        footprint = estimate_footprint(details, {'spark.executor.instances': '1'})
+        with self.lock:
+            used = sum((f for f in self.running.values()), ResourceFootprint())
+            if not (used + footprint).fits(ResourceFootprint(4, 8192)):
+                return (500, {'Content-Type': 'application/json'}, json.dumps({'message': 'over quota'}))
+            self.running[name] = footprint
+            self.submitted.append(name)
+        return (202, {'Content-Type': 'application/json'}, json.dumps({'id': 'id-' + name, 'state': 'accepted'}))
+
+    def state(self, request):
+        name = request.url.split('/')[-2][len('id-') :]
+        with self.lock:
+            state = 'running' if name in self.running else 'finished'
+        return (200, {'Content-Type': 'application/json'}, json.dumps({'id': 'id-' + name, 'state': state}))
+
+    def finish(self, name):
+        with self.lock:
+            del self.running[name]
+
+
+def _application(name, executor_cores='1', executor_memory='2g'):
+    return ApplicationRequestApplicationDetails(
+        application='/opt/app.py',
+        name=name,
+        conf={'spark.executor.cores': executor_cores, 'spark.executor.memory': executor_memory},
+    )
+
+
+class TestAdmissionScheduler:
+    """
+    Test Class for AdmissionScheduler
+    """
+
+    @responses.activate
+    def test_waits_for_headroom(self):
+        """
+        Applications are held back until the instance has room for them.
+        """
+        instance = _FakeInstance()
+        scheduler = AdmissionScheduler(_service, 'e64c907a-e82f-46fd-addc-ccfafbd28b09', refresh_interval=0.01)
+        # Each application needs 2 cores and 3 GiB: two fit at a time.
+        futures = [scheduler.submit(_application(str(i))) for i in range(3)]
+        assert futures[0].result(timeout=5).id == 'id-0'
+        assert futures[1].result(timeout=5).id == 'id-1'
+        assert not futures[2].done()
+        assert scheduler.pending == 1
+
+        instance.finish('0')
+        assert futures[2].result(timeout=5).id == 'id-2'
+        scheduler.close()
+        assert sorted(instance.submitted[:2]) == ['0', '1'] and instance.submitted[2] == '2'
+
+    @responses.activate
+    def test_backfill(self):
+        """
+        A smaller application that fits is released ahead of a larger one.
+        """
+        instance = _FakeInstance()
+        with AdmissionScheduler(_service, 'e64c907a-e82f-46fd-addc-ccfafbd28b09', refresh_interval=0.01) as scheduler:
+            first = scheduler.submit(_application('first'))
+            first.result(timeout=5)
+            large = scheduler.submit(_application('large', executor_cores='2'))
+            small = scheduler.submit(_application('small'))
+            assert small.result(timeout=5).id == 'id-small'
+            assert not large.done()
+            instance.finish('first')
+            instance.finish('small')
+            assert large.result(timeout=5).id == 'id-large'
+
+    @responses.activate
+    def test_requeue_on_429(self):
+        """
+        Submissions rejected with HTTP 429 are queued again.
+        """
+        instance = _FakeInstance(reject={'0'})
+        with AdmissionScheduler(_service, 'e64c907a-e82f-46fd-addc-ccfafbd28b09', refresh_interval=0.01) as scheduler:
+            future = scheduler.submit(_application('0'))
+        assert future.result(timeout=5).id == 'id-0'
+        assert instance.submitted == ['0']
+
+    @responses.activate
+    def test_429_while_queued(self):
+        """
+        A submission rejected with HTTP 429 while others wait for room is queued
+        again, and every submission completes.
+        """
+        instance = _FakeInstance(reject={'1'})
+        scheduler = AdmissionScheduler(_service, 'e64c907a-e82f-46fd-addc-ccfafbd28b09', refresh_interval=0.05)
+        # Each application needs 2 cores and 3 GiB: two fit at a time.
+        futures = [scheduler.submit(_application(str(i))) for i in range(4)]
+        assert futures[0].result(timeout=5).id == 'id-0'
+        assert futures[1].result(timeout=5).id == 'id-1'
+        assert scheduler.pending == 2
+
+        instance.finish('0')
+        instance.finish('1')
+        assert futures[2].result(timeout=5).id == 'id-2'
+        assert futures[3].result(timeout=5).id == 'id-3'
+        scheduler.close()
+        assert sorted(instance.submitted) == ['0', '1', '2', '3']
+
+    def test_accepted_applications_reserved(self):
+        """
+        Applications keep their reservation while they are accepted, as the
+        service leaves them out of the current consumption until they start.
+        """
+        now = [1700000000.0]
+        with FakeAnalyticsEngineServer(
+            accept_time=5, run_time=60, max_cores=4, max_memory='8G', clock=lambda: now[0]
+        ) as server:
+            instance_id = server.add_instance()
+            service = IbmAnalyticsEngineApiV3(authenticator=NoAuthAuthenticator())
+            service.set_service_url(server.url)
+            service.replace_instance_default_configs(instance_id, body={'spark.executor.instances': '1'})
+            recorder = InMemoryMetrics()
+            service.set_metrics_recorder(recorder)
+            scheduler = AdmissionScheduler(service, instance_id, refresh_interval=0.01)
+            # Each application needs 2 cores and 3 GiB: two fit at a time.
+            futures = [scheduler.submit(_application(str(i))) for i in range(4)]
+            futures[0].result(timeout=5)
+            futures[1].result(timeout=5)
+            time.sleep(0.2)
+            assert scheduler.pending == 2
+
+            now[0] += 5
+            time.sleep(0.2)
+            assert scheduler.pending == 2
+
+            now[0] += 60
+            futures[2].result(timeout=5)
+            futures[3].result(timeout=5)
+            scheduler.close()
+        assert recorder.snapshot()['create_application']['status_codes'] == {202: 4}
+
+    @responses.activate
+    def test_oversized(self):
+        """
+        Applications that need more than the instance limits fail.
+        """
+        _FakeInstance()
+        with AdmissionScheduler(_service, 'e64c907a-e82f-46fd-addc-ccfafbd28b09', refresh_interval=0.01) as scheduler:
+            oversized = scheduler.submit(_application('big', executor_cores='8'))
+            with pytest.raises(ValueError, match='more than the instance limits'):
+                oversized.result(timeout=5)
+
+    @responses.activate
+    def test_close_without_wait(self):
+        """
+        close(wait=False) cancels queued submissions.
+        """
+        instance = _FakeInstance()
+        instance.running['other'] = ResourceFootprint(4, 8192)
+        scheduler = AdmissionScheduler(_service, 'e64c907a-e82f-46fd-addc-ccfafbd28b09', refresh_interval=0.01)
+        future = scheduler.submit(_application('0'))
+        scheduler.close(wait=False)
+        assert future.cancelled()
+        assert instance.submitted == []
+        with pytest.raises(RuntimeError, match='cannot submit after close'):
+            scheduler.submit(_application('1'))
+
+    def test_value_error(self):
+        """
+        AdmissionScheduler() requires an instance id
+        """
+        with pytest.raises(ValueError, match='instance_id must be provided'):
+            AdmissionScheduler(_service, None)
+
+
+class TestEstimateFootprint:
+    """
+    Test Class for estimate_footprint
+    """
+
+    def test_defaults(self):
+        """
+        Settings missing from the application conf fall back to the defaults.
+        """
+        assert estimate_footprint({'application': '/opt/app.py'}) == ResourceFootprint(3, 3072)
+        assert estimate_footprint(
+            {'conf': {'spark.executor.memory': '4g'}}, {'spark.driver.memory': '2048'}
+        ) == ResourceFootprint(3, 10240)
+
+    def test_dynamic_allocation(self):
+        """
+        With dynamic allocation, the maximum number of executors is assumed.
+        """
+        conf = {'spark.dynamicAllocation.enabled': 'true', 'spark.dynamicAllocation.maxExecutors': '4'}
+        assert estimate_footprint({'conf': conf}) == ResourceFootprint(5, 5120)
+
+    def test_parse_memory(self):
+        """
+        parse_memory() understands Spark and service size strings.
+        """
+        assert parse_memory('4g') == 4096
+        assert parse_memory('600G') == 614400
+        assert parse_memory('512MB') == 512
+        assert parse_memory('1536k') == 2
+        assert parse_memory(1024) == 1024
+        with pytest.raises(ValueError, match='invalid memory size'):
+            parse_memory('lots')
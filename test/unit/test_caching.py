@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+# (C) Copyright IBM Corp. 2024.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Unit Tests for the IbmAnalyticsEngineApiV3 response cache
+"""
+
+import time
+
+from ibm_cloud_sdk_core import DetailedResponse
+from ibm_cloud_sdk_core.authenticators.no_auth_authenticator import NoAuthAuthenticator
+import pytest
+import responses
+
+from iaesdk.caching import ResponseCache
+from iaesdk.ibm_analytics_engine_api_v3 import IbmAnalyticsEngineApiV3
+
+_base_url = 'https://api.us-south.ae.cloud.ibm.com'
+_instance_url = _base_url + '/v3/analytics_engines/e64c907a-e82f-46fd-addc-ccfafbd28b09'
+
+
+def _new_service(**kwargs):
+    service = IbmAnalyticsEngineApiV3(authenticator=NoAuthAuthenticator())
+    service.set_service_url(_base_url)
+    service.enable_response_cache(**kwargs)
+    return service
+
+
+class TestResponseCache:
+    """
+    Test Class for the response cache of IbmAnalyticsEngineApiV3
+    """
+
+    @responses.activate
+    def test_cached_operation(self):
+        """
+        Repeated calls are served from the cache, with independent results.
+        """
+        responses.add(responses.GET, _instance_url + '/default_configs', json={'spark.driver.cores': '1'})
+        service = _new_service()
+
+        first = service.get_instance_default_configs('e64c907a-e82f-46fd-addc-ccfafbd28b09')
+        first.get_result()['spark.driver.cores'] = '8'
+        second = service.get_instance_default_configs(instance_id='e64c907a-e82f-46fd-addc-ccfafbd28b09')
+        assert second.get_result() == {'spark.driver.cores': '1'}
+        assert second.get_status_code() == 200
+        assert len(responses.calls) == 1
+
+        # Request headers bypass the cache.
+        service.get_instance_default_configs('e64c907a-e82f-46fd-addc-ccfafbd28b09', headers={'X-Test': '1'})
+        assert len(responses.calls) == 2
+
+    @responses.activate
+    def test_invalidation(self):
+        """
+        Modifying an instance drops its affected cached responses.
+        """
+        responses.add(responses.GET, _instance_url + '/default_runtime', json={'spark_version': '3.3'})
+        responses.add(responses.GET, _instance_url + '/log_forwarding_config', json={'enabled': True})
+        responses.add(responses.PUT, _instance_url + '/default_runtime', json={'spark_version': '3.4'})
+        service = _new_service()
+
+        service.get_instance_default_runtime('e64c907a-e82f-46fd-addc-ccfafbd28b09')
+        service.get_log_forwarding_config('e64c907a-e82f-46fd-addc-ccfafbd28b09')
+        service.replace_instance_default_runtime('e64c907a-e82f-46fd-addc-ccfafbd28b09', spark_version='3.4')
+        service.get_instance_default_runtime('e64c907a-e82f-46fd-addc-ccfafbd28b09')
+        service.get_log_forwarding_config('e64c907a-e82f-46fd-addc-ccfafbd28b09')
+        assert [call.request.method for call in responses.calls] == ['GET', 'GET', 'PUT', 'GET']
+
+        service.invalidate_response_cache()
+        service.get_log_forwarding_config('e64c907a-e82f-46fd-addc-ccfafbd28b09')
+        assert len(responses.calls) == 5
+
+    @responses.activate
+    def test_ttl(self):
+        """
+        Responses expire after their TTL; a TTL of 0 disables caching.
+        """
+        responses.add(responses.GET, _instance_url, json={'id': 'e64c907a-e82f-46fd-addc-ccfafbd28b09'})
+        responses.add(responses.GET, _instance_url + '/resource_consumption_limits', json={'max_cores': '150'})
+        service = _new_service(ttls={'get_instance': 0.05, 'get_resource_consumption_limits': 0})
+
+        service.get_instance('e64c907a-e82f-46fd-addc-ccfafbd28b09')
+        service.get_instance('e64c907a-e82f-46fd-addc-ccfafbd28b09')
+        assert len(responses.calls) == 1
+        time.sleep(0.06)
+        service.get_instance('e64c907a-e82f-46fd-addc-ccfafbd28b09')
+        assert len(responses.calls) == 2
+
+        service.get_resource_consumption_limits('e64c907a-e82f-46fd-addc-ccfafbd28b09')
+        service.get_resource_consumption_limits('e64c907a-e82f-46fd-addc-ccfafbd28b09')
+        assert len(responses.calls) == 4
+
+    @responses.activate
+    def test_disable(self):
+        """
+        disable_response_cache() turns caching off.
+        """
+        responses.add(responses.GET, _instance_url, json={'id': 'e64c907a-e82f-46fd-addc-ccfafbd28b09'})
+        service = _new_service()
+        service.get_instance('e64c907a-e82f-46fd-addc-ccfafbd28b09')
+        service.disable_response_cache()
+        service.get_instance('e64c907a-e82f-46fd-addc-ccfafbd28b09')
+        assert len(responses.calls) == 2
+
+    def test_lru_eviction(self):
+        """
+        The least recently used responses are evicted beyond max_entries.
+        """
+        cache = ResponseCache({'get_instance': 60}, max_entries=2)
+        for instance_id in ('a', 'b'):
+            cache.put('get_instance', instance_id, DetailedResponse(response={'id': instance_id}), (0, 0))
+        assert cache.get('get_instance', 'a') is not None
+        cache.put('get_instance', 'c', DetailedResponse(response={'id': 'c'}), (0, 0))
+        assert len(cache) == 2
+        assert cache.get('get_instance', 'b') is None
+        assert cache.get('get_instance', 'a').get_result() == {'id': 'a'}
+        assert (cache.hits, cache.misses) == (2, 1)
+
+    def test_stale_put(self):
+        """
+        Responses obtained before an invalidation are not cached.
+        """
+        cache = ResponseCache({'get_instance': 60})
+        generation = cache.generation('a')
+        cache.invalidate('a')
+        cache.put('get_instance', 'a', DetailedResponse(response={'id': 'a'}), generation)
+        assert len(cache) == 0
+
+    def test_value_error(self):
+        """
+        ResponseCache() requires room for at least one entry
+        """
+        with pytest.raises(ValueError, match='max_entries must be at least 1'):
+            ResponseCache({}, max_entries=0)
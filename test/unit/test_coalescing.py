@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+# (C) Copyright IBM Corp. 2024.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Unit Tests for request coalescing
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import json
+import threading
+import time
+
+from ibm_cloud_sdk_core import ApiException
+from ibm_cloud_sdk_core.authenticators.no_auth_authenticator import NoAuthAuthenticator
+import responses
+
+from iaesdk.coalescing import request_key
+from iaesdk.ibm_analytics_engine_api_v2 import IbmAnalyticsEngineApiV2
+from iaesdk.ibm_analytics_engine_api_v3 import IbmAnalyticsEngineApiV3
+
+_base_url = 'https://api.us-south.ae.cloud.ibm.com'
+_state_url = _base_url + '/v3/analytics_engines/e64c907a-e82f-46fd-addc-ccfafbd28b09/state'
+
+
+def _slow_callback(status=200, body=None, delay=0.1):
+    """
+    Return a responses callback that counts calls and answers after `delay`.
+    """
+    lock = threading.Lock()
+
+    def callback(request):
+        with lock:
+            callback.calls += 1
+        time.sleep(delay)
+        return (status, {'Content-Type': 'application/json'}, json.dumps(body or {'id': 'id', 'state': 'active'}))
+
+    callback.calls = 0
+    return callback
+
+
+def _concurrently(function, count=8):
+    barrier = threading.Barrier(count)
+
+    def call(_):
+        barrier.wait()
+        try:
+            return function()
+        except ApiException as error:
+            return error
+
+    with ThreadPoolExecutor(max_workers=count) as executor:
+        return list(executor.map(call, range(count)))
+
+
+def _new_service():
+    service = IbmAnalyticsEngineApiV3(authenticator=NoAuthAuthenticator())
+    service.set_service_url(_base_url)
+    service.enable_request_coalescing()
+    return service
+
+
+class TestRequestCoalescing:
+    """
+    Test Class for request coalescing
+    """
+
+    @responses.activate
+    def test_coalesced(self):
+        """
+        Concurrent identical GET requests share one call and independent results.
+        """
+        callback = _slow_callback()
+        responses.add_callback(responses.GET, _state_url, callback=callback)
+        service = _new_service()
+
+        results = _concurrently(lambda: service.get_instance_state('e64c907a-e82f-46fd-addc-ccfafbd28b09'))
+        assert callback.calls == 1
+        assert all(r.get_result() == {'id': 'id', 'state': 'active'} for r in results)
+        assert len({id(r.get_result()) for r in results}) == len(results)
+        assert service._single_flight.coalesced == len(results) - 1
+
+        # Completed requests are not shared.
+        service.get_instance_state('e64c907a-e82f-46fd-addc-ccfafbd28b09')
+        assert callback.calls == 2
+
+    @responses.activate
+    def test_errors(self):
+        """
+        A failed request raises its exception in every waiting thread.
+        """
+        callback = _slow_callback(status=500, body={'message': 'down'})
+        responses.add_callback(responses.GET, _state_url, callback=callback)
+        service = _new_service()
+
+        results = _concurrently(lambda: service.get_instance_state('e64c907a-e82f-46fd-addc-ccfafbd28b09'))
+        assert callback.calls == 1
+        assert all(isinstance(r, ApiException) and r.status_code == 500 for r in results)
+
+    @responses.activate
+    def test_disabled(self):
+        """
+        Without coalescing, each thread sends its own request.
+        """
+        callback = _slow_callback(delay=0.01)
+        responses.add_callback(responses.GET, _state_url, callback=callback)
+        service = _new_service()
+        service.disable_request_coalescing()
+
+        _concurrently(lambda: service.get_instance_state('e64c907a-e82f-46fd-addc-ccfafbd28b09'), count=4)
+        assert callback.calls == 4
+
+    @responses.activate
+    def test_v2(self):
+        """
+        The V2 service coalesces requests too.
+        """
+        callback = _slow_callback()
+        url = 'https://ibm-analytics-engine-api.cloud.ibm.com/v2/analytics_engines/guid/state'
+        responses.add_callback(responses.GET, url, callback=callback)
+        service = IbmAnalyticsEngineApiV2(authenticator=NoAuthAuthenticator())
+        service.enable_request_coalescing()
+
+        results = _concurrently(lambda: service.get_analytics_engine_state_by_id('guid'))
+        assert callback.calls == 1
+        assert all(r.get_status_code() == 200 for r in results)
+
+    def test_request_key(self):
+        """
+        Only GET requests with hashable options are coalesced.
+        """
+        request = {'method': 'GET', 'url': _state_url, 'headers': {'Accept': 'application/json'}, 'params': None}
+        assert request_key(request, {}) == request_key(dict(request), {'headers': {'X': '1'}})
+        assert request_key(request, {}) != request_key(request, {'timeout': 5})
+        assert request_key(request, {'stream': True}) is None
+        assert request_key(request, {'proxies': {'https': 'proxy'}}) is None
+        assert request_key(dict(request, method='POST'), {}) is None
@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+# (C) Copyright IBM Corp. 2024.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Unit Tests for the columnar export of applications
+"""
+
+from datetime import datetime, timedelta, timezone
+import json
+import sys
+import urllib
+
+from ibm_cloud_sdk_core.authenticators.no_auth_authenticator import NoAuthAuthenticator
+import pytest
+import responses
+
+from iaesdk.columnar import NULL_STATE, NULL_TIMESTAMP, datetime_to_epoch_ns, to_columns
+from iaesdk.ibm_analytics_engine_api_v3 import (
+    ApplicationCollection,
+    ApplicationsPager,
+    CompactApplication,
+    IbmAnalyticsEngineApiV3,
+)
+
+_base_url = 'https://api.us-south.ae.cloud.ibm.com'
+_url = _base_url + '/v3/analytics_engines/e64c907a-e82f-46fd-addc-ccfafbd28b09/spark_applications'
+
+_applications = [
+    {
+        'id': 'app-1',
+        'state': 'finished',
+        'submission_time': '2024-01-01T00:00:00.000Z',
+        'start_time': '2024-01-01T00:00:01.500Z',
+        'end_time': '2024-01-01T01:00:00+01:00',
+    },
+    {'id': 'app-2', 'state': 'running', 'submission_time': '2024-01-01T00:00:02Z'},
+    {'id': 'app-3', 'state': 'queued'},
+    {'id': 'app-4'},
+]
+
+_second = 1000000000
+_start_ns = 1704067200 * _second
+
+
+class TestColumnar:
+    """
+    Test Class for the columnar export
+    """
+
+    def test_datetime_to_epoch_ns(self):
+        """
+        datetime_to_epoch_ns()
+        """
+        assert datetime_to_epoch_ns(None) == NULL_TIMESTAMP
+        assert datetime_to_epoch_ns('2024-01-01T00:00:00.000Z') == _start_ns
+        assert datetime_to_epoch_ns('2024-01-01T00:00:00.123456789Z') == _start_ns + 123456000
+        assert datetime_to_epoch_ns(datetime(2024, 1, 1)) == _start_ns
+        assert datetime_to_epoch_ns(datetime(1969, 12, 31, 23, 59, 59, tzinfo=timezone.utc)) == -_second
+
+    def test_to_columns(self):
+        """
+        Applications in dicts and in models give the same columns.
+        """
+        collection = ApplicationCollection.from_dict({'applications': _applications, 'limit': 4})
+        compact_applications = [CompactApplication.from_dict(application) for application in _applications]
+        for columns in (to_columns(_applications), collection.to_columns(), to_columns(compact_applications)):
+            assert len(columns) == 4
+            assert columns.strings['id'] == ['app-1', 'app-2', 'app-3', 'app-4']
+            assert columns.strings['spark_ui'] == [None] * 4
+            assert list(columns.timestamps['submission_time']) == [
+                _start_ns,
+                _start_ns + 2 * _second,
+                NULL_TIMESTAMP,
+                NULL_TIMESTAMP,
+            ]
+            assert columns.timestamps['start_time'][0] == _start_ns + 1500000000
+            assert columns.timestamps['end_time'][0] == _start_ns
+            states = [columns.state_categories[code] if code != NULL_STATE else None for code in columns.state_codes]
+            assert states == ['finished', 'running', 'queued', None]
+
+        # The times of compact applications are not parsed by the conversion
+        assert compact_applications[0]._submission_time == '2024-01-01T00:00:00.000Z'
+        # Known states have stable codes
+        assert collection.to_columns().state_categories.index('running') == 1
+
+    @responses.activate
+    def test_pager_to_columns(self):
+        """
+        ApplicationsPager.to_columns() converts every page.
+        """
+
+        def callback(request):
+            query = urllib.parse.parse_qs(urllib.parse.urlparse(request.url).query)
+            offset = int(query.get('start', ['0'])[0])
+            page = {'applications': _applications[offset : offset + 2], 'limit': 2}
+            if offset + 2 < len(_applications):
+                page['next'] = {'start': str(offset + 2)}
+            return (200, {'Content-Type': 'application/json'}, json.dumps(page))
+
+        responses.add_callback(responses.GET, _url, callback=callback)
+        service = IbmAnalyticsEngineApiV3(authenticator=NoAuthAuthenticator())
+        service.set_service_url(_base_url)
+
+        pager = ApplicationsPager(client=service, instance_id='e64c907a-e82f-46fd-addc-ccfafbd28b09', limit=2)
+        columns = pager.to_columns()
+        assert len(responses.calls) == 2
+        assert columns.strings['id'] == ['app-1', 'app-2', 'app-3', 'app-4']
+        assert not pager.has_next()
+
+    def test_to_numpy(self):
+        """
+        The columns convert to NumPy arrays.
+        """
+        numpy = pytest.importorskip('numpy')
+        columns = to_columns(_applications).to_numpy()
+        assert columns['submission_time'].dtype == numpy.dtype('datetime64[ns]')
+        assert columns['submission_time'][1] == numpy.datetime64('2024-01-01T00:00:02', 'ns')
+        assert numpy.isnat(columns['submission_time'][2])
+        assert list(columns['state']) == [0, 1, 2, NULL_STATE]
+
+    def test_to_arrow(self):
+        """
+        The columns convert to an Arrow table.
+        """
+        pyarrow = pytest.importorskip('pyarrow')
+        table = ApplicationCollection.from_dict({'applications': _applications, 'limit': 4}).to_arrow()
+        assert table.num_rows == 4
+        assert table.schema.field('submission_time').type == pyarrow.timestamp('ns', tz='UTC')
+        assert table.column('submission_time').null_count == 2
+        assert table.column('submission_time')[0].as_py() == datetime(2024, 1, 1, tzinfo=timezone.utc)
+        assert table.column('state').to_pylist() == ['finished', 'running', 'queued', None]
+        assert table.column('id').to_pylist() == ['app-1', 'app-2', 'app-3', 'app-4']
+
+    def test_to_pandas(self):
+        """
+        The columns convert to a pandas DataFrame.
+        """
+        pytest.importorskip('pandas')
+        frame = to_columns(_applications).to_pandas()
+        assert list(frame['state'].cat.categories) == ['finished', 'running', 'queued']
+        assert frame['state'].isna().tolist() == [False, False, False, True]
+        assert frame['start_time'][0] - frame['submission_time'][0] == timedelta(seconds=1.5)
+
+    def test_extend_after_conversion(self):
+        """
+        The columns can be extended after a conversion, which keeps its values.
+        """
+        pytest.importorskip('numpy')
+        pytest.importorskip('pyarrow')
+        columns = to_columns(_applications[:2])
+        arrays = columns.to_numpy()
+        table = columns.to_arrow()
+        columns.extend(_applications[2:])
+        assert len(columns) == 4
+        assert len(arrays['submission_time']) == 2
+        assert table.num_rows == 2
+        assert columns.to_arrow().num_rows == 4
+
+    def test_missing_dependency(self, monkeypatch):
+        """
+        Conversions name the extra providing a missing dependency.
+        """
+        monkeypatch.setitem(sys.modules, 'pyarrow', None)
+        with pytest.raises(ImportError, match=r'pyarrow is required for ApplicationColumns.to_arrow\(\); install'):
+            to_columns(_applications).to_arrow()
@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+# (C) Copyright IBM Corp. 2024.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Unit Tests for iaesdk.common
+"""
+
+import re
+import subprocess
+import sys
+
+from ibm_cloud_sdk_core import ApiException
+from ibm_cloud_sdk_core.authenticators.no_auth_authenticator import NoAuthAuthenticator
+import pytest
+
+import iaesdk
+from iaesdk import common
+from iaesdk.common import OperationRoute, get_user_agent
+from iaesdk.ibm_analytics_engine_api_v2 import IbmAnalyticsEngineApiV2
+from iaesdk.ibm_analytics_engine_api_v3 import IbmAnalyticsEngineApiV3
+
+_base_url = 'https://api.us-south.ae.cloud.ibm.com'
+
+
+class TestOperationRoute:
+    """
+    Test Class for OperationRoute
+    """
+
+    def test_pattern(self):
+        """
+        Routes match the URLs of their operation only.
+        """
+        route = OperationRoute(
+            'get_application', 'GET', '/v3/analytics_engines/{instance_id}/spark_applications/{application_id}'
+        )
+        assert route.path_param_keys == ('instance_id', 'application_id')
+        pattern = re.compile(route.pattern())
+        assert pattern.search(_base_url + '/v3/analytics_engines/a%2Fb/spark_applications/c%20d')
+        assert not pattern.search(_base_url + '/v3/analytics_engines/a/spark_applications/b/state')
+        assert not pattern.search(_base_url + '/v3/analytics_engines/a/spark_applications')
+
+    def test_no_path_params(self):
+        """
+        Routes without path parameters.
+        """
+        route = OperationRoute('get_all_analytics_engines', 'GET', '/v2/analytics_engines')
+        assert route.path_param_keys == ()
+        assert re.search(route.pattern(), _base_url + '/v2/analytics_engines')
+
+
+class TestOperationRouteMixin:
+    """
+    Test Class for OperationRouteMixin
+    """
+
+    @pytest.mark.parametrize('service_class', [IbmAnalyticsEngineApiV2, IbmAnalyticsEngineApiV3])
+    def test_get_operation_id(self, service_class):
+        """
+        Prepared requests are matched to the operation they belong to.
+        """
+        service = service_class(authenticator=NoAuthAuthenticator())
+        service.set_service_url(_base_url)
+        # pylint: disable=protected-access
+        for route in service._OPERATION_ROUTES:
+            path_params = {key: 'id-' + key for key in route.path_param_keys}
+            request = service.prepare_request(route.method, route.path.format(**path_params))
+            assert service.get_operation_id(request) == route.operation_id
+
+        for method, url in [('GET', '/v3/unknown'), ('PATCH', '/v3/analytics_engines/a'), ('GET', '/other/v2')]:
+            assert service.get_operation_id(service.prepare_request(method, url)) is None
+
+
+class TestLazyImport:
+    """
+    Test Class for the deferred work at import
+    """
+
+    def test_package(self):
+        """
+        Importing the package loads the service modules on first access only.
+        """
+        script = (
+            'import sys, iaesdk\n'
+            'assert "iaesdk.ibm_analytics_engine_api_v3" not in sys.modules\n'
+            'assert "ibm_cloud_sdk_core" not in sys.modules\n'
+            'from iaesdk import IbmAnalyticsEngineApiV3\n'
+            'assert "iaesdk.ibm_analytics_engine_api_v3_async" not in sys.modules\n'
+            'import iaesdk.common\n'
+            'assert iaesdk.common._user_agent is None\n'
+            'assert iaesdk.IbmAnalyticsEngineApiV3 is IbmAnalyticsEngineApiV3\n'
+        )
+        subprocess.run([sys.executable, '-c', script], check=True)
+
+    def test_features(self):
+        """
+        The modules of the optional features of the clients are loaded when a
+        feature is enabled.
+        """
+        script = (
+            'import sys\n'
+            'from iaesdk import IbmAnalyticsEngineApiV2, IbmAnalyticsEngineApiV3\n'
+            'features = ["coalescing", "columnar", "metrics", "routing", "tokens", "tracing", "transport"]\n'
+            'assert not [name for name in features if "iaesdk." + name in sys.modules]\n'
+            'from ibm_cloud_sdk_core.authenticators.no_auth_authenticator import NoAuthAuthenticator\n'
+            'service = IbmAnalyticsEngineApiV3(authenticator=NoAuthAuthenticator())\n'
+            'service.enable_request_coalescing()\n'
+            'service.configure_connection_pool()\n'
+            'assert "iaesdk.coalescing" in sys.modules and "iaesdk.transport" in sys.modules\n'
+            'assert "iaesdk.metrics" not in sys.modules\n'
+        )
+        subprocess.run([sys.executable, '-c', script], check=True)
+
+    def test_attributes(self):
+        """
+        The exported names resolve, and unknown names raise AttributeError.
+        """
+        assert iaesdk.ApiException is ApiException
+        assert 'AsyncIbmAnalyticsEngineApiV3' in dir(iaesdk)
+        with pytest.raises(AttributeError):
+            iaesdk.IbmAnalyticsEngineApiV4  # pylint: disable=pointless-statement
+
+    def test_user_agent(self):
+        """
+        The user agent is computed on first use, and kept as USER_AGENT.
+        """
+        assert get_user_agent().startswith('ibm-iae-python-sdk-' + iaesdk.__version__ + ' ')
+        assert common.USER_AGENT == get_user_agent()
@@ -0,0 +1,236 @@
+# -*- coding: utf-8 -*-
+# (C) Copyright IBM Corp. 2024.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Unit Tests for iaesdk.fake_server
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+from ibm_cloud_sdk_core import ApiException
+from ibm_cloud_sdk_core.authenticators.no_auth_authenticator import NoAuthAuthenticator
+import pytest
+
+from iaesdk.fake_server import FakeAnalyticsEngineServer
+from iaesdk.ibm_analytics_engine_api_v2 import IbmAnalyticsEngineApiV2
+from iaesdk.ibm_analytics_engine_api_v3 import ApplicationsPager, IbmAnalyticsEngineApiV3
+
+_details = {'application': '/opt/ibm/spark/examples/src/main/python/wordcount.py', 'arguments': ['/opt/words']}
+
+
+class _Clock:
+    """
+    A clock moved forward by the tests.
+    """
+
+    def __init__(self):
+        self.now = 1700000000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return _Clock()
+
+
+@pytest.fixture
+def server(clock):
+    with FakeAnalyticsEngineServer(accept_time=5, run_time=60, max_cores=4, max_memory='8G', clock=clock) as fake:
+        yield fake
+
+
+@pytest.fixture
+def service(server):
+    client = IbmAnalyticsEngineApiV3(authenticator=NoAuthAuthenticator())
+    client.set_service_url(server.url)
+    return client
+
+
+class TestFakeAnalyticsEngineServer:
+    """
+    Test Class for FakeAnalyticsEngineServer
+    """
+
+    def test_application_lifecycle(self, server, service, clock):
+        """
+        Applications are accepted, run, then finish; or are stopped when deleted.
+        """
+        instance_id = server.add_instance()
+        application_id = service.create_application(instance_id, application_details=_details).get_result()['id']
+        assert service.get_application_state(instance_id, application_id).get_result() == {
+            'id': application_id,
+            'state': 'accepted',
+        }
+        # Accepted applications are not in the consumption yet
+        assert service.get_current_resource_consumption(instance_id).get_result() == {'cores': '0', 'memory': '0G'}
+
+        clock.now += 5
+        application = service.get_application(instance_id, application_id).get_result()
+        assert application['state'] == 'running'
+        assert application['application_details'] == _details
+        assert application['start_time'] == '2023-11-14T22:13:25.000Z'
+        assert service.get_current_resource_consumption(instance_id).get_result() == {'cores': '3', 'memory': '3G'}
+
+        clock.now += 60
+        state = service.get_application_state(instance_id, application_id).get_result()
+        assert state['state'] == 'finished'
+        assert state['end_time'] == '2023-11-14T22:14:25.000Z'
+        assert service.get_current_resource_consumption(instance_id).get_result() == {'cores': '0', 'memory': '0G'}
+
+        application_id = service.create_application(instance_id, application_details=_details).get_result()['id']
+        service.delete_application(instance_id, application_id)
+        state = service.get_application_state(instance_id, application_id).get_result()
+        assert state['state'] == 'stopped'
+        assert state['end_time'] == '2023-11-14T22:14:25.000Z'
+        assert 'start_time' not in state
+
+    def test_quota(self, server, service):
+        """
+        Submissions over the resource consumption limits are rejected with 429.
+        """
+        instance_id = server.add_instance()
+        assert service.get_resource_consumption_limits(instance_id).get_result() == {
+            'max_cores': '4',
+            'max_memory': '8G',
+        }
+        service.create_application(instance_id, application_details=_details)
+        with pytest.raises(ApiException) as error:
+            service.create_application(instance_id, application_details=_details)
+        assert error.value.status_code == 429
+
+        small = dict(_details, conf={'spark.executor.instances': '0'})
+        assert service.create_application(instance_id, application_details=small).get_status_code() == 202
+
+    def test_pagination(self, server, service, clock):
+        """
+        Listings are paginated with `next.start`, and filtered by state.
+        """
+        instance_id = server.add_instance(max_cores=1000, max_memory='1000G')
+        finished = server.add_applications(instance_id, 25)
+        running = [
+            service.create_application(instance_id, application_details=_details).get_result()['id'] for _ in range(3)
+        ]
+        clock.now += 5
+
+        pager = ApplicationsPager(client=service, instance_id=instance_id, limit=10)
+        assert [application['id'] for application in pager.get_all()] == finished + running
+
+        page = service.list_applications(instance_id, state=['running'], limit=2).get_result()
+        assert [application['id'] for application in page['applications']] == running[:2]
+        page = service.list_applications(instance_id, state=['running'], limit=2, start=page['next']['start'])
+        assert [application['id'] for application in page.get_result()['applications']] == running[2:]
+        assert 'next' not in page.get_result()
+
+    def test_history_server(self, server, service):
+        """
+        The Spark history server is started and stopped, holding resources while started.
+        """
+        instance_id = server.add_instance()
+        assert service.get_spark_history_server(instance_id).get_result() == {'state': 'stopped'}
+        started = service.start_spark_history_server(instance_id).get_result()
+        assert started['state'] == 'started'
+        assert service.get_current_resource_consumption(instance_id).get_result() == {'cores': '1', 'memory': '4G'}
+        service.stop_spark_history_server(instance_id)
+        assert service.get_spark_history_server(instance_id).get_result()['state'] == 'stopped'
+
+    def test_instance(self, server, service):
+        """
+        Instance routes answer from the instance, and unknown instances are not found.
+        """
+        instance_id = server.add_instance()
+        service.replace_instance_default_configs(instance_id, body={'spark.executor.instances': '2'})
+        service.update_instance_default_configs(instance_id, body={'spark.driver.memory': '2g'})
+        instance = service.get_instance(instance_id).get_result()
+        assert instance['state'] == 'active'
+        assert instance['default_config'] == {'spark.executor.instances': '2', 'spark.driver.memory': '2g'}
+        assert service.get_instance_state(instance_id).get_result() == {'id': instance_id, 'state': 'active'}
+
+        with pytest.raises(ApiException) as error:
+            service.get_instance('unknown')
+        assert error.value.status_code == 404
+        assert error.value.message == 'Instance unknown not found'
+
+    def test_auto_create(self, clock):
+        """
+        With `auto_create`, unknown instances are created on first use.
+        """
+        server = FakeAnalyticsEngineServer(auto_create=True, clock=clock)
+        assert server.handle('GET', '/v3/analytics_engines/new/state') == (200, {'id': 'new', 'state': 'active'})
+        assert server.handle('GET', '/v2/analytics_engines/guid/state') == (200, {'state': 'Active'})
+        assert server.handle('GET', '/v3/unknown')[0] == 404
+        server.stop()
+
+    def test_v2(self, server):
+        """
+        Cluster routes are served for the v2 client.
+        """
+        instance_guid = server.add_cluster()
+        service = IbmAnalyticsEngineApiV2(authenticator=NoAuthAuthenticator())
+        service.set_service_url(server.url)
+        assert service.get_analytics_engine_state_by_id(instance_guid).get_result() == {'state': 'Active'}
+        service.resize_cluster(instance_guid, body={'compute_nodes_count': 3})
+        nodes = service.get_analytics_engine_by_id(instance_guid).get_result()['nodes']
+        assert [node['type'] for node in nodes] == ['management', 'data', 'data', 'data']
+
+        request_id = service.create_customization_request(
+            instance_guid, target='all', custom_actions=[{'name': 'action'}]
+        ).get_result()['request_id']
+        assert service.get_all_customization_requests(instance_guid).get_result() == [{'id': str(request_id)}]
+        run = service.get_customization_request_by_id(instance_guid, str(request_id)).get_result()
+        assert run['run_status'] == 'Completed'
+
+        whitelist = service.update_private_endpoint_whitelist(instance_guid, ['10.0.0.0/24'], 'add').get_result()
+        assert whitelist == {'private_endpoint_whitelist': ['10.0.0.0/24']}
+
+    def test_invalid_body(self, server):
+        """
+        Request bodies that are not JSON objects, or hold values of the wrong
+        type, are answered with 400.
+        """
+        instance_id = server.add_instance()
+        instance_guid = server.add_cluster()
+        for method, path, body in (
+            ('POST', '/v3/analytics_engines/{0}/spark_applications', b'{'),
+            ('PUT', '/v3/analytics_engines/{0}/default_configs', b'[["spark.driver.memory", "2g"]]'),
+            ('PATCH', '/v3/analytics_engines/{0}/default_configs', b'"spark.driver.memory"'),
+            ('PUT', '/v3/analytics_engines/{0}/instance_home', b'[]'),
+            ('POST', '/v2/analytics_engines/{1}/resize', b'{"compute_nodes_count": "many"}'),
+            ('POST', '/v2/analytics_engines/{1}/resize', b'{"task_nodes_count": -1}'),
+            ('PUT', '/v2/analytics_engines/{1}/log_config', b'{"log_specs": "all", "log_server": {"type": "x"}}'),
+            ('PATCH', '/v2/analytics_engines/{1}/private_endpoint_whitelist', b'{"ip_ranges": "10.0.0.0/24"}'),
+        ):
+            status, result = server.handle(method, path.format(instance_id, instance_guid), body)
+            assert status == 400, (method, path, body)
+            assert result['errors'][0]['code'] == 'bad_request'
+
+    def test_concurrent_submissions(self, server, service):
+        """
+        Concurrent submissions are admitted up to the limits.
+        """
+        instance_id = server.add_instance(max_cores=30, max_memory='1000G')
+        service.configure_connection_pool(pool_maxsize=8)
+
+        def submit(_):
+            try:
+                return service.create_application(instance_id, application_details=_details).get_status_code()
+            except ApiException as error:
+                return error.status_code
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            statuses = list(executor.map(submit, range(40)))
+        assert statuses.count(202) == 10
+        assert statuses.count(429) == 30
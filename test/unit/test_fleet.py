@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+# (C) Copyright IBM Corp. 2024.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Unit Tests for FleetClient
+"""
+
+import json
+import re
+import threading
+import time
+
+from ibm_cloud_sdk_core import ApiException
+from ibm_cloud_sdk_core.authenticators.no_auth_authenticator import NoAuthAuthenticator
+import pytest
+import responses
+
+from iaesdk.fleet import FleetClient
+from iaesdk.ibm_analytics_engine_api_v3 import IbmAnalyticsEngineApiV3
+
+_base_url = 'https://api.us-south.ae.cloud.ibm.com'
+_instance_ids = ['instance-{0}'.format(i) for i in range(12)]
+
+
+def _new_client():
+    client = IbmAnalyticsEngineApiV3(authenticator=NoAuthAuthenticator())
+    client.set_service_url(_base_url)
+    return client
+
+
+class TestFleetClient:
+    """
+    Test Class for FleetClient
+    """
+
+    @responses.activate
+    def test_get_instance_state(self):
+        """
+        Operations run for every instance, within the concurrency cap.
+        """
+        lock = threading.Lock()
+        in_flight = [0, 0]
+
+        def callback(request):
+            instance_id = request.url.split('/')[-2]
+            with lock:
+                in_flight[0] += 1
+                in_flight[1] = max(in_flight)
+            time.sleep(0.02)
+            with lock:
+                in_flight[0] -= 1
+            if instance_id == 'instance-3':
+                return (404, {'Content-Type': 'application/json'}, json.dumps({'errors': [{'message': 'gone'}]}))
+            return (200, {'Content-Type': 'application/json'}, json.dumps({'id': instance_id, 'state': 'active'}))
+
+        responses.add_callback(
+            responses.GET, re.compile(_base_url + r'/v3/analytics_engines/[^/]+/state'), callback=callback
+        )
+        with FleetClient(_new_client(), _instance_ids + ['instance-0'], max_concurrency=4) as fleet:
+            result = fleet.get_instance_state()
+
+        assert len(responses.calls) == 12
+        assert in_flight[1] == 4
+        assert not result.ok
+        assert isinstance(result.errors['instance-3'], ApiException)
+        assert result.errors['instance-3'].status_code == 404
+        assert result.results()['instance-5'] == {'id': 'instance-5', 'state': 'active'}
+        assert sorted(result.responses) == sorted(set(_instance_ids) - {'instance-3'})
+        assert repr(result) == '<FleetResult: 11 succeeded, 1 failed>'
+
+    @responses.activate
+    def test_list_applications(self):
+        """
+        Operation arguments are passed for every instance.
+        """
+        responses.add(
+            responses.GET,
+            re.compile(_base_url + r'/v3/analytics_engines/[^/]+/spark_applications'),
+            json={'applications': [], 'limit': 5},
+        )
+        fleet = FleetClient(_new_client(), _instance_ids[:2])
+        result = fleet.list_applications(state=['running'], limit=5)
+        fleet.close()
+        assert result.ok
+        assert all('state=running' in call.request.url for call in responses.calls)
+
+    def test_value_error(self):
+        """
+        FleetClient only runs read operations
+        """
+        fleet = FleetClient(_new_client(), _instance_ids)
+        with pytest.raises(ValueError, match='operation must be one of'):
+            fleet.run('delete_application', application_id='id')
+        fleet.close()
+        with pytest.raises(ValueError, match='max_concurrency must be at least 1'):
+            FleetClient(_new_client(), _instance_ids, max_concurrency=0)
@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+# (C) Copyright IBM Corp. 2024.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Unit Tests for ApplicationHistory
+"""
+
+from datetime import datetime, timezone
+import json
+import sqlite3
+import urllib
+
+from ibm_cloud_sdk_core.authenticators.no_auth_authenticator import NoAuthAuthenticator
+from ibm_cloud_sdk_core.utils import string_to_datetime
+import pytest
+import responses
+
+from iaesdk.history import ApplicationHistory
+from iaesdk.ibm_analytics_engine_api_v3 import IbmAnalyticsEngineApiV3
+
+_base_url = 'https://api.us-south.ae.cloud.ibm.com'
+_instance_id = 'e64c907a-e82f-46fd-addc-ccfafbd28b09'
+_url = _base_url + '/v3/analytics_engines/' + _instance_id + '/spark_applications'
+
+
+def _application(number, state, name='etl'):
+    return {
+        'id': 'app-{0}'.format(number),
+        'state': state,
+        'spark_application_name': name,
+        'submission_time': '2024-01-0{0}T00:00:00.000Z'.format(number),
+    }
+
+
+class _FakeApplications:
+    """
+    Serves `applications`, filtered by the submission_time_interval query
+    parameter, two per page, and records the lower bounds requested.
+    """
+
+    def __init__(self, applications):
+        self.applications = applications
+        self.lower_bounds = []
+        responses.add_callback(responses.GET, _url, callback=self.callback)
+
+    def callback(self, request):
+        query = urllib.parse.parse_qs(urllib.parse.urlparse(request.url).query)
+        lower = query['submission_time_interval'][0].split(',')[0]
+        offset = int(query.get('start', ['0'])[0])
+        if offset == 0:
+            self.lower_bounds.append(lower)
+        matching = [
+            a
+            for a in self.applications
+            if lower == 'BEGINNING' or string_to_datetime(a['submission_time']) >= string_to_datetime(lower)
+        ]
+        page = {'applications': matching[offset : offset + 2], 'limit': 2}
+        if offset + 2 < len(matching):
+            page['next'] = {'start': str(offset + 2)}
+        return (200, {'Content-Type': 'application/json'}, json.dumps(page))
+
+
+def _new_client():
+    client = IbmAnalyticsEngineApiV3(authenticator=NoAuthAuthenticator())
+    client.set_service_url(_base_url)
+    return client
+
+
+class TestApplicationHistory:
+    """
+    Test Class for ApplicationHistory
+    """
+
+    @responses.activate
+    def test_incremental_sync(self, tmp_path):
+        """
+        Later syncs list only new and still active applications.
+        """
+        server = _FakeApplications(
+            [_application(1, 'finished'), _application(2, 'running'), _application(3, 'finished', name='report')]
+        )
+        database = str(tmp_path / 'history.db')
+        with ApplicationHistory(database, client=_new_client(), instance_id=_instance_id, overlap=0) as history:
+            assert history.watermark is None
+            assert history.sync() == 3
+            assert history.watermark == datetime(2024, 1, 3, tzinfo=timezone.utc)
+
+            server.applications[1] = _application(2, 'failed')
+            server.applications.append(_application(4, 'running'))
+            # app-2 was running, so the sync starts at its submission time
+            assert history.sync() == 3
+            assert server.lower_bounds == ['BEGINNING', '2024-01-02T00:00:00Z']
+            assert history.count() == 4
+
+            # Everything up to app-4, which is still running, is final
+            history.sync()
+            assert server.lower_bounds[-1] == '2024-01-04T00:00:00Z'
+
+        # The history is available offline
+        with ApplicationHistory(database, instance_id=_instance_id) as history:
+            assert [a['id'] for a in history.query()] == ['app-4', 'app-3', 'app-2', 'app-1']
+            assert [a['id'] for a in history.query(state=['failed', 'running'])] == ['app-4', 'app-2']
+            assert [a['id'] for a in history.query(name='report')] == ['app-3']
+            assert [
+                a['id']
+                for a in history.query(
+                    submitted_after=datetime(2024, 1, 2, tzinfo=timezone.utc),
+                    submitted_before=datetime(2024, 1, 4, tzinfo=timezone.utc),
+                )
+            ] == ['app-3', 'app-2']
+            assert len(history.query(limit=1)) == 1
+            assert history.synced_at is not None
+            with pytest.raises(ValueError, match='client must be provided'):
+                history.sync()
+
+    @responses.activate
+    def test_overlap(self):
+        """
+        Syncs list again the applications submitted within the overlap.
+        """
+        server = _FakeApplications([_application(1, 'finished'), _application(2, 'finished')])
+        history = ApplicationHistory(':memory:', client=_new_client(), instance_id=_instance_id, overlap=86400)
+        history.sync()
+        assert history.sync() == 2
+        assert server.lower_bounds[-1] == '2024-01-01T00:00:00Z'
+
+        # Other instances have their own history
+        other = ApplicationHistory(':memory:', client=_new_client(), instance_id='other')
+        assert other.count() == 0
+
+    @responses.activate
+    def test_removed(self):
+        """
+        Applications removed before reaching a terminal state stop holding back the sync.
+        """
+        server = _FakeApplications([_application(1, 'running'), _application(2, 'finished')])
+        history = ApplicationHistory(':memory:', client=_new_client(), instance_id=_instance_id, overlap=0)
+        history.sync()
+        del server.applications[0]
+        history.sync()
+        assert server.lower_bounds[-1] == '2024-01-01T00:00:00Z'
+        history.sync()
+        assert server.lower_bounds[-1] == '2024-01-02T00:00:00Z'
+        # Removed applications are kept
+        assert [a['id'] for a in history.query()] == ['app-2', 'app-1']
+
+    @responses.activate
+    def test_no_id(self):
+        """
+        Applications without an id are skipped.
+        """
+        _FakeApplications([_application(1, 'finished'), dict(_application(2, 'running'), id=None)])
+        history = ApplicationHistory(':memory:', client=_new_client(), instance_id=_instance_id)
+        assert history.sync() == 2
+        assert [a['id'] for a in history.query()] == ['app-1']
+
+    def test_schema_version(self, tmp_path):
+        """
+        Histories of an earlier schema are upgraded, those of a later one are refused.
+        """
+        database = str(tmp_path / 'history.db')
+        connection = sqlite3.connect(database)
+        connection.executescript(
+            'CREATE TABLE applications (instance_id TEXT NOT NULL, id TEXT NOT NULL, state TEXT, '
+            'spark_application_id TEXT, spark_application_name TEXT, submission_time INTEGER, start_time INTEGER, '
+            'end_time INTEGER, application TEXT NOT NULL, PRIMARY KEY (instance_id, id));'
+            'CREATE TABLE sync_state (instance_id TEXT PRIMARY KEY, watermark INTEGER, synced_at REAL NOT NULL);'
+            'PRAGMA user_version = 1;'
+        )
+        connection.execute(
+            'INSERT INTO applications (instance_id, id, state, submission_time, application) VALUES (?, ?, ?, ?, ?)',
+            (_instance_id, 'app-1', 'running', 0, json.dumps(_application(1, 'running'))),
+        )
+        connection.commit()
+        with ApplicationHistory(database, instance_id=_instance_id) as history:
+            assert [a['id'] for a in history.query()] == ['app-1']
+            assert history.connection().execute('SELECT removed FROM applications').fetchone()[0] == 0
+            assert history.connection().execute('PRAGMA user_version').fetchone()[0] == 2
+
+        connection.execute('PRAGMA user_version = 99')
+        connection.close()
+        with pytest.raises(ValueError, match='schema version 99'):
+            ApplicationHistory(database, instance_id=_instance_id)
+
+    def test_value_error(self):
+        """
+        ApplicationHistory() requires an instance id
+        """
+        with pytest.raises(ValueError, match='instance_id must be provided'):
+            ApplicationHistory(':memory:', instance_id=None)
+        with pytest.raises(ValueError, match='overlap must not be negative'):
+            ApplicationHistory(':memory:', instance_id=_instance_id, overlap=-1)
@@ -18,11 +18,14 @@ Unit Tests for IbmAnalyticsEngineApiV3
 """
 
 from datetime import datetime, timezone
+from ibm_cloud_sdk_core import ApiException
 from ibm_cloud_sdk_core.authenticators.no_auth_authenticator import NoAuthAuthenticator
 from ibm_cloud_sdk_core.utils import datetime_to_string, string_to_datetime
+import copy
 import inspect
 import json
 import os
+import pickle
 import pytest
 import re
 import requests
@@ -1050,6 +1053,143 @@ class TestListApplications:
         assert all_results is not None
         assert len(all_results) == 2
 
+    @responses.activate
+    def test_list_applications_with_pager_prefetch(self):
+        """
+        test_list_applications_with_pager_prefetch()
+        """
+        # Set up a three-page mock response
+        url = preprocess_url('/v3/analytics_engines/e64c907a-e82f-46fd-addc-ccfafbd28b09/spark_applications')
+        mock_response1 = '{"next":{"start":"1"},"limit":1,"applications":[{"id":"a"}]}'
+        mock_response2 = '{"next":{"start":"2"},"limit":1,"applications":[{"id":"b"}]}'
+        mock_response3 = '{"limit":1,"applications":[{"id":"c"}]}'
+        for mock_response in (mock_response1, mock_response2, mock_response3):
+            responses.add(responses.GET, url, body=mock_response, content_type='application/json', status=200)
+
+        # Exercise the pager class with prefetching enabled
+        pager = ApplicationsPager(
+            client=_service,
+            instance_id='e64c907a-e82f-46fd-addc-ccfafbd28b09',
+            limit=1,
+            prefetch_depth=2,
+            max_prefetched_items=1,
+        )
+        all_results = pager.get_all()
+        assert [app['id'] for app in all_results] == ['a', 'b', 'c']
+        assert not pager.has_next()
+        assert len(responses.calls) == 3
+        assert 'start=' not in responses.calls[0].request.url
+        assert 'start=2' in responses.calls[2].request.url
+
+    @responses.activate
+    def test_list_applications_with_pager_prefetch_error(self):
+        """
+        test_list_applications_with_pager_prefetch_error()
+        """
+        # Set up a mock response whose second page fails
+        url = preprocess_url('/v3/analytics_engines/e64c907a-e82f-46fd-addc-ccfafbd28b09/spark_applications')
+        mock_response1 = '{"next":{"start":"1"},"limit":1,"applications":[{"id":"a"}]}'
+        responses.add(responses.GET, url, body=mock_response1, content_type='application/json', status=200)
+        responses.add(responses.GET, url, body='{"message": "boom"}', content_type='application/json', status=500)
+
+        # Pages received before the failure are returned, then the error is raised
+        pager = ApplicationsPager(
+            client=_service,
+            instance_id='e64c907a-e82f-46fd-addc-ccfafbd28b09',
+            prefetch_depth=3,
+        )
+        assert [app['id'] for app in pager.get_next()] == ['a']
+        assert pager.has_next()
+        with pytest.raises(ApiException, match='boom'):
+            pager.get_next()
+
+    @responses.activate
+    def test_list_applications_with_pager_prefetch_empty_page(self):
+        """
+        test_list_applications_with_pager_prefetch_empty_page()
+        """
+        # Set up a mock response whose second page has no applications property
+        url = preprocess_url('/v3/analytics_engines/e64c907a-e82f-46fd-addc-ccfafbd28b09/spark_applications')
+        mock_response1 = '{"next":{"start":"1"},"limit":1,"applications":[{"id":"a"}]}'
+        mock_response2 = '{"next":{"start":"2"},"limit":1}'
+        mock_response3 = '{"limit":1,"applications":[{"id":"c"}]}'
+        for mock_response in (mock_response1, mock_response2, mock_response3):
+            responses.add(responses.GET, url, body=mock_response, content_type='application/json', status=200)
+
+        pager = ApplicationsPager(
+            client=_service,
+            instance_id='e64c907a-e82f-46fd-addc-ccfafbd28b09',
+            prefetch_depth=2,
+        )
+        assert [app['id'] for app in pager.get_all()] == ['a', 'c']
+
+    def test_list_applications_with_pager_prefetch_value_error(self):
+        """
+        test_list_applications_with_pager_prefetch_value_error()
+        """
+        with pytest.raises(ValueError, match='prefetch_depth must not be negative'):
+            ApplicationsPager(client=_service, instance_id='testString', prefetch_depth=-1)
+
+    @responses.activate
+    def test_iter_applications(self):
+        """
+        test_iter_applications()
+        """
+        # Set up a two-page mock response
+        url = preprocess_url('/v3/analytics_engines/e64c907a-e82f-46fd-addc-ccfafbd28b09/spark_applications')
+        mock_response1 = '{"next":{"start":"1"},"limit":1,"applications":[{"id":"a","state":"finished","submission_time":"2021-01-30T08:30:00.000Z"}]}'
+        mock_response2 = '{"limit":1,"applications":[{"id":"b","state":"running"}]}'
+        responses.add(responses.GET, url, body=mock_response1, content_type='application/json', status=200)
+        responses.add(responses.GET, url, body=mock_response2, content_type='application/json', status=200)
+
+        applications = list(_service.iter_applications('e64c907a-e82f-46fd-addc-ccfafbd28b09', limit=1))
+        assert [type(app) for app in applications] == [Application, Application]
+        assert [app.id for app in applications] == ['a', 'b']
+        assert applications[0].submission_time == string_to_datetime('2021-01-30T08:30:00.000Z')
+        assert len(responses.calls) == 2
+
+    @responses.activate
+    def test_iter_applications_as_dict_early_exit(self):
+        """
+        test_iter_applications_as_dict_early_exit()
+        """
+        # Set up a two-page mock response
+        url = preprocess_url('/v3/analytics_engines/e64c907a-e82f-46fd-addc-ccfafbd28b09/spark_applications')
+        mock_response1 = '{"next":{"start":"1"},"limit":2,"applications":[{"id":"a"},{"id":"b"}]}'
+        mock_response2 = '{"limit":2,"applications":[{"id":"c"}]}'
+        responses.add(responses.GET, url, body=mock_response1, content_type='application/json', status=200)
+        responses.add(responses.GET, url, body=mock_response2, content_type='application/json', status=200)
+
+        # Stopping after the first application must not request the second page
+        for application in _service.iter_applications('e64c907a-e82f-46fd-addc-ccfafbd28b09', as_dict=True):
+            assert application == {'id': 'a'}
+            break
+        assert len(responses.calls) == 1
+
+    @responses.activate
+    def test_iter_applications_compact(self):
+        """
+        test_iter_applications_compact()
+        """
+        # Set up a one-page mock response
+        url = preprocess_url('/v3/analytics_engines/e64c907a-e82f-46fd-addc-ccfafbd28b09/spark_applications')
+        mock_response = '{"limit":2,"applications":[{"id":"a","submission_time":"2021-01-30T08:30:00.000Z"},{"id":"b"}]}'
+        responses.add(responses.GET, url, body=mock_response, content_type='application/json', status=200)
+
+        applications = list(_service.iter_applications('e64c907a-e82f-46fd-addc-ccfafbd28b09', compact=True))
+        assert [type(app) for app in applications] == [CompactApplication, CompactApplication]
+        assert applications[0].get_datetime_string('submission_time') == '2021-01-30T08:30:00.000Z'
+        assert applications[0].submission_time == string_to_datetime('2021-01-30T08:30:00.000Z')
+
+    def test_iter_applications_value_error(self):
+        """
+        test_iter_applications_value_error()
+        """
+        with pytest.raises(ValueError, match='instance_id must be provided'):
+            _service.iter_applications(None)
+        with pytest.raises(ValueError, match='as_dict and compact'):
+            _service.iter_applications('testString', as_dict=True, compact=True)
+
 
 class TestGetApplication:
     """
@@ -1268,6 +1408,81 @@ class TestGetApplicationState:
         self.test_get_application_state_value_error()
 
 
+class TestWaitForApplication:
+    """
+    Test Class for wait_for_application
+    """
+
+    @responses.activate
+    def test_wait_for_application(self):
+        """
+        wait_for_application()
+        """
+        url = preprocess_url(
+            '/v3/analytics_engines/e64c907a-e82f-46fd-addc-ccfafbd28b09/spark_applications/ff48cc19-0e7e-4627-aac6-0b4ad080397b/state'
+        )
+        for state in ('accepted', 'running', 'running', 'finished'):
+            responses.add(responses.GET, url, json={'id': 'app', 'state': state}, status=200)
+
+        response = _service.wait_for_application(
+            'e64c907a-e82f-46fd-addc-ccfafbd28b09',
+            'ff48cc19-0e7e-4627-aac6-0b4ad080397b',
+            initial_interval=0.001,
+            headers={'X-Test': 'yes'},
+        )
+        assert isinstance(response, ApplicationGetStateResponse)
+        assert response.state == 'finished'
+        assert len(responses.calls) == 4
+        assert responses.calls[3].request.headers['X-Test'] == 'yes'
+
+    @responses.activate
+    def test_wait_for_application_target_and_terminal_states(self):
+        """
+        Waiting stops at a target state, or at a terminal state that is not a target.
+        """
+        url = preprocess_url('/v3/analytics_engines/e64c907a/spark_applications/ff48cc19/state')
+        for state in ('accepted', 'running', 'accepted', 'failed'):
+            responses.add(responses.GET, url, json={'id': 'app', 'state': state}, status=200)
+
+        kwargs = {'target_states': [ListApplicationsEnums.State.RUNNING], 'initial_interval': 0.001}
+        response = _service.wait_for_application('e64c907a', 'ff48cc19', **kwargs)
+        assert response.state == 'running'
+        response = _service.wait_for_application('e64c907a', 'ff48cc19', **kwargs)
+        assert response.state == 'failed'
+
+    @responses.activate
+    def test_wait_for_application_timeout(self):
+        """
+        wait_for_application() raises TimeoutError at the deadline.
+        """
+        url = preprocess_url('/v3/analytics_engines/e64c907a/spark_applications/ff48cc19/state')
+        responses.add(responses.GET, url, json={'id': 'app', 'state': 'running'}, status=200)
+
+        with pytest.raises(TimeoutError, match="still in state 'running'"):
+            _service.wait_for_application('e64c907a', 'ff48cc19', timeout=0.05, initial_interval=0.01)
+        assert len(responses.calls) > 1
+
+    @responses.activate
+    def test_wait_for_application_auto_termination_deadline(self):
+        """
+        The auto_termination_time of the application bounds the wait.
+        """
+        url = preprocess_url('/v3/analytics_engines/e64c907a/spark_applications/ff48cc19/state')
+        mock_response = {'id': 'app', 'state': 'running', 'auto_termination_time': '2021-01-30T08:30:00.000Z'}
+        responses.add(responses.GET, url, json=mock_response, status=200)
+
+        with pytest.raises(TimeoutError):
+            _service.wait_for_application('e64c907a', 'ff48cc19', auto_termination_grace=0)
+        assert len(responses.calls) == 1
+
+    def test_wait_for_application_value_error(self):
+        """
+        wait_for_application() requires both identifiers.
+        """
+        with pytest.raises(ValueError, match='application_id must be provided'):
+            _service.wait_for_application('e64c907a', None)
+
+
 class TestGetCurrentResourceConsumption:
     """
     Test Class for get_current_resource_consumption
@@ -1942,6 +2157,101 @@ class TestModel_Application:
         assert application_model_json2 == application_model_json
 
 
+class TestModel_CompactApplication:
+    """
+    Test Class for CompactApplication
+    """
+
+    def test_compact_application_serialization(self):
+        """
+        Test serialization/deserialization for CompactApplication
+        """
+
+        compact_application_model_json = {
+            'id': 'testString',
+            'runtime': {'spark_version': 'testString'},
+            'state': 'finished',
+            'submission_time': '2021-01-30T08:30:00Z',
+            'end_time': '2021-01-30T08:30:00.000Z',
+        }
+        compact_application_model = CompactApplication.from_dict(compact_application_model_json)
+        assert compact_application_model.to_dict() == compact_application_model_json
+
+        # Converts to and from Application
+        application_model = compact_application_model.to_application()
+        assert application_model == Application.from_dict(compact_application_model_json)
+        assert CompactApplication.from_application(application_model) == compact_application_model
+
+    def test_compact_application_slots(self):
+        """
+        Test that CompactApplication objects store their attributes in slots
+        """
+
+        application_model = CompactApplication(id='testString', state='running')
+        with pytest.raises(AttributeError):
+            application_model.unknown_attribute = 'testString'
+        assert not hasattr(application_model, '__dict__')
+
+        # Slotted objects survive pickling and copying
+        assert pickle.loads(pickle.dumps(application_model)) == application_model
+        assert copy.deepcopy(application_model) == application_model
+
+    def test_compact_application_lazy_datetimes(self):
+        """
+        Test that CompactApplication datetimes are parsed on first access
+        """
+
+        application_model = CompactApplication.from_dict(
+            {'id': 'testString', 'submission_time': '2019-01-01T12:00:00.000Z', 'end_time': None}
+        )
+        assert application_model._submission_time == '2019-01-01T12:00:00.000Z'
+        submission_time = application_model.submission_time
+        assert isinstance(submission_time, datetime)
+        assert submission_time == datetime(2019, 1, 1, 12, tzinfo=timezone.utc)
+        assert application_model.submission_time is submission_time
+        assert application_model._submission_time is submission_time
+        assert application_model.end_time is None
+
+        # The string is serialized as received until it is parsed
+        application_model = CompactApplication.from_dict({'submission_time': '2019-01-01T12:00:00.000Z'})
+        assert application_model.get_datetime_string('submission_time') == '2019-01-01T12:00:00.000Z'
+        assert application_model.to_dict() == {'submission_time': '2019-01-01T12:00:00.000Z'}
+        assert pickle.loads(pickle.dumps(application_model)).to_dict() == application_model.to_dict()
+        assert application_model.submission_time == submission_time
+        assert application_model.get_datetime_string('submission_time') == '2019-01-01T12:00:00Z'
+
+        # Assigned datetimes replace the received string
+        application_model.submission_time = datetime(2020, 1, 1, tzinfo=timezone.utc)
+        assert application_model.get_datetime_string('submission_time') == '2020-01-01T00:00:00Z'
+        assert application_model.to_dict() == {'submission_time': '2020-01-01T00:00:00Z'}
+
+    def test_compact_application_lazy_datetimes_invalid(self):
+        """
+        Test that invalid CompactApplication datetimes raise from from_dict
+        """
+
+        for value in ['not a time', '2019-02-30T12:00:00Z', '2019-13-01T12:00:00Z']:
+            with pytest.raises(ValueError):
+                CompactApplication.from_dict({'submission_time': value})
+        # Other forms are parsed when set
+        application_model = CompactApplication.from_dict({'submission_time': '2019-01-01 12:00:00'})
+        assert application_model._submission_time == datetime(2019, 1, 1, 12, tzinfo=timezone.utc)
+
+    def test_compact_application_lazy_datetimes_eq(self):
+        """
+        Test that CompactApplication datetimes are compared without parsing equal strings
+        """
+
+        application_model = CompactApplication.from_dict({'id': 'a', 'submission_time': '2019-01-01T12:00:00.000Z'})
+        assert application_model == CompactApplication.from_dict({'id': 'a', 'submission_time': '2019-01-01T12:00:00.000Z'})
+        assert application_model._submission_time == '2019-01-01T12:00:00.000Z'
+        # Different strings of the same time
+        assert application_model == CompactApplication.from_dict({'id': 'a', 'submission_time': '2019-01-01T12:00:00Z'})
+        assert application_model == CompactApplication(id='a', submission_time=datetime(2019, 1, 1, 12, tzinfo=timezone.utc))
+        assert application_model != CompactApplication.from_dict({'id': 'a', 'submission_time': '2019-01-01T12:00:01Z'})
+        assert application_model != CompactApplication.from_dict({'id': 'b', 'submission_time': '2019-01-01T12:00:00Z'})
+
+
 class TestModel_ApplicationCollection:
     """
     Test Class for ApplicationCollection
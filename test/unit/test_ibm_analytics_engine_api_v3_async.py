@@ -0,0 +1,270 @@
+# -*- coding: utf-8 -*-
+# (C) Copyright IBM Corp. 2024.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Unit Tests for AsyncIbmAnalyticsEngineApiV3
+"""
+
+import asyncio
+import json
+import time
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from ibm_cloud_sdk_core import ApiException
+from ibm_cloud_sdk_core.authenticators import IAMAuthenticator, NoAuthAuthenticator
+import pytest
+
+from iaesdk.ibm_analytics_engine_api_v3 import ApplicationRequestApplicationDetails
+from iaesdk.ibm_analytics_engine_api_v3_async import AsyncApplicationsPager, AsyncIbmAnalyticsEngineApiV3
+
+_instance_id = 'e64c907a-e82f-46fd-addc-ccfafbd28b09'
+_base_path = '/v3/analytics_engines/' + _instance_id
+
+
+def run_with_server(routes, scenario, authenticator=None, **client_args):
+    """
+    Start a local aiohttp server with the given routes, then run
+    `scenario(service, requests)` against it and return its result.
+    """
+
+    async def main():
+        received = []
+
+        @web.middleware
+        async def record(request, handler):
+            received.append((request.method, request.path_qs, dict(request.headers), await request.text()))
+            return await handler(request)
+
+        app = web.Application(middlewares=[record])
+        app.add_routes(routes)
+        server = TestServer(app)
+        await server.start_server()
+        try:
+            async with AsyncIbmAnalyticsEngineApiV3(authenticator or NoAuthAuthenticator(), **client_args) as service:
+                service.set_service_url(str(server.make_url('')))
+                return await scenario(service, received)
+        finally:
+            await server.close()
+
+    return asyncio.run(main())
+
+
+class TestAsyncService:
+    """
+    Test Class for the AsyncIbmAnalyticsEngineApiV3 operations
+    """
+
+    def test_get_instance(self):
+        """
+        get_instance()
+        """
+
+        async def handler(request):
+            return web.json_response({'id': request.match_info['instance_id'], 'state': 'active'})
+
+        async def scenario(service, received):
+            response = await service.get_instance(_instance_id, headers={'X-Test': 'yes'})
+            assert response.get_status_code() == 200
+            assert response.get_result() == {'id': _instance_id, 'state': 'active'}
+            method, path, headers, _ = received[0]
+            assert (method, path) == ('GET', _base_path)
+            assert headers['Accept'] == 'application/json'
+            assert headers['X-Test'] == 'yes'
+            assert headers['User-Agent'].startswith('ibm-iae-python-sdk-')
+
+        run_with_server([web.get('/v3/analytics_engines/{instance_id}', handler)], scenario)
+
+    def test_token_fetched_off_the_event_loop(self):
+        """
+        A blocking token request does not block the event loop.
+        """
+        authenticator = IAMAuthenticator('apikey')
+
+        def get_token():
+            time.sleep(0.3)
+            return 'token'
+
+        authenticator.token_manager.get_token = get_token
+
+        async def handler(request):
+            return web.json_response({'id': request.match_info['instance_id'], 'state': 'active'})
+
+        async def scenario(service, received):
+            ticks = 0
+
+            async def tick():
+                nonlocal ticks
+                while True:
+                    await asyncio.sleep(0.01)
+                    ticks += 1
+
+            ticker = asyncio.ensure_future(tick())
+            await service.get_instance(_instance_id)
+            ticker.cancel()
+            assert ticks >= 10
+            assert received[0][2]['Authorization'] == 'Bearer token'
+            assert service.get_authenticator() is authenticator
+
+        run_with_server([web.get('/v3/analytics_engines/{instance_id}', handler)], scenario, authenticator)
+
+    def test_create_application_body(self):
+        """
+        create_application()
+        """
+
+        async def handler(request):
+            return web.json_response({'id': 'app-1', 'state': 'accepted'}, status=202)
+
+        async def scenario(service, received):
+            details = ApplicationRequestApplicationDetails(application='/opt/app.py', arguments=['a'])
+            response = await service.create_application(_instance_id, application_details=details)
+            assert response.get_status_code() == 202
+            assert response.get_result()['id'] == 'app-1'
+            _, _, headers, body = received[0]
+            assert headers['Content-Type'] == 'application/json'
+            assert json.loads(body) == {'application_details': {'application': '/opt/app.py', 'arguments': ['a']}}
+
+        run_with_server([web.post(_base_path + '/spark_applications', handler)], scenario)
+
+    def test_list_applications_query(self):
+        """
+        list_applications()
+        """
+
+        async def handler(request):
+            return web.json_response({'applications': [], 'limit': 10})
+
+        async def scenario(service, received):
+            await service.list_applications(_instance_id, state=['finished', 'failed'], limit=10)
+            _, path, _, _ = received[0]
+            assert 'state=finished%2Cfailed' in path or 'state=finished,failed' in path
+            assert 'limit=10' in path
+
+        run_with_server([web.get(_base_path + '/spark_applications', handler)], scenario)
+
+    def test_no_content_response(self):
+        """
+        stop_spark_history_server()
+        """
+
+        async def handler(request):
+            return web.Response(status=204)
+
+        async def scenario(service, received):
+            response = await service.stop_spark_history_server(_instance_id)
+            assert response.get_status_code() == 204
+            assert response.get_result() is None
+
+        run_with_server([web.delete(_base_path + '/spark_history_server', handler)], scenario)
+
+    def test_error_response(self):
+        """
+        Error responses raise ApiException with the service message.
+        """
+
+        async def handler(request):
+            return web.json_response({'errors': [{'message': 'instance not found'}]}, status=404)
+
+        async def scenario(service, received):
+            with pytest.raises(ApiException) as err:
+                await service.get_instance_state(_instance_id)
+            assert err.value.status_code == 404
+            assert err.value.message == 'instance not found'
+
+        run_with_server([web.get(_base_path + '/state', handler)], scenario)
+
+    def test_value_error(self):
+        """
+        Missing required parameters are rejected before any request is sent.
+        """
+
+        async def scenario(service, received):
+            with pytest.raises(ValueError, match='application_id must be provided'):
+                await service.get_application_state(_instance_id, None)
+            assert received == []
+
+        run_with_server([], scenario)
+
+    def test_retries(self):
+        """
+        enable_retries() retries retryable status codes.
+        """
+        attempts = []
+
+        async def handler(request):
+            attempts.append(1)
+            if len(attempts) < 3:
+                return web.json_response({'message': 'busy'}, status=503, headers={'Retry-After': '0'})
+            return web.json_response({'id': 'app-1', 'state': 'running'})
+
+        async def scenario(service, received):
+            service.enable_retries(max_retries=3, retry_interval=0.01)
+            response = await service.get_application_state(_instance_id, 'app-1')
+            assert response.get_result()['state'] == 'running'
+            assert len(attempts) == 3
+
+        run_with_server([web.get(_base_path + '/spark_applications/{application_id}/state', handler)], scenario)
+
+    def test_bounded_concurrency(self):
+        """
+        No more than max_concurrency requests are in flight at once.
+        """
+        in_flight = {'now': 0, 'max': 0}
+
+        async def handler(request):
+            in_flight['now'] += 1
+            in_flight['max'] = max(in_flight['max'], in_flight['now'])
+            await asyncio.sleep(0.01)
+            in_flight['now'] -= 1
+            return web.json_response({'id': request.match_info['application_id'], 'state': 'running'})
+
+        async def scenario(service, received):
+            ids = ['app-%d' % i for i in range(20)]
+            responses = await asyncio.gather(*[service.get_application_state(_instance_id, i) for i in ids])
+            assert [r.get_result()['id'] for r in responses] == ids
+            assert in_flight['max'] <= 3
+
+        run_with_server(
+            [web.get(_base_path + '/spark_applications/{application_id}/state', handler)],
+            scenario,
+            max_concurrency=3,
+        )
+
+
+class TestAsyncApplicationsPager:
+    """
+    Test Class for AsyncApplicationsPager
+    """
+
+    def test_get_all(self):
+        """
+        get_all()
+        """
+
+        async def handler(request):
+            if request.query.get('start') == '1':
+                return web.json_response({'applications': [{'id': 'b'}], 'limit': 1})
+            return web.json_response({'applications': [{'id': 'a'}], 'limit': 1, 'next': {'start': '1'}})
+
+        async def scenario(service, received):
+            pager = AsyncApplicationsPager(client=service, instance_id=_instance_id, limit=1)
+            all_results = await pager.get_all()
+            assert [app['id'] for app in all_results] == ['a', 'b']
+            assert not pager.has_next()
+            with pytest.raises(StopAsyncIteration):
+                await pager.get_next()
+
+        run_with_server([web.get(_base_path + '/spark_applications', handler)], scenario)
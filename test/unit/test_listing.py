@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+# (C) Copyright IBM Corp. 2024.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Unit Tests for iaesdk.listing
+"""
+
+from datetime import datetime, timedelta, timezone
+import json
+import urllib
+
+from ibm_cloud_sdk_core.authenticators.no_auth_authenticator import NoAuthAuthenticator
+from ibm_cloud_sdk_core.utils import string_to_datetime
+import pytest
+import responses
+
+from iaesdk.ibm_analytics_engine_api_v3 import IbmAnalyticsEngineApiV3
+from iaesdk.listing import list_applications_sharded, split_time_range
+
+_service = IbmAnalyticsEngineApiV3(authenticator=NoAuthAuthenticator())
+_base_url = 'https://api.us-south.ae.cloud.ibm.com'
+_service.set_service_url(_base_url)
+
+_url = _base_url + '/v3/analytics_engines/e64c907a-e82f-46fd-addc-ccfafbd28b09/spark_applications'
+_start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def _applications_callback(applications):
+    """
+    Return a responses callback that serves `applications` filtered by the
+    submission_time_interval query parameter, two per page.
+    """
+
+    def callback(request):
+        query = urllib.parse.parse_qs(urllib.parse.urlparse(request.url).query)
+        lower, upper = [string_to_datetime(v) for v in query['submission_time_interval'][0].split(',')]
+        matching = [a for a in applications if lower <= string_to_datetime(a['submission_time']) < upper]
+        offset = int(query.get('start', ['0'])[0])
+        page = {'applications': matching[offset : offset + 2], 'limit': 2}
+        if offset + 2 < len(matching):
+            page['next'] = {'start': str(offset + 2)}
+        return (200, {'Content-Type': 'application/json'}, json.dumps(page))
+
+    return callback
+
+
+class TestSplitTimeRange:
+    """
+    Test Class for split_time_range
+    """
+
+    def test_split_time_range(self):
+        """
+        split_time_range()
+        """
+        intervals = split_time_range(_start, _start + timedelta(hours=4), 4)
+        assert len(intervals) == 4
+        assert intervals[0][0] == _start
+        assert intervals[-1][1] == _start + timedelta(hours=4)
+        for (_, upper), (lower, _) in zip(intervals, intervals[1:]):
+            assert upper == lower
+
+    def test_split_time_range_naive(self):
+        """
+        Naive datetimes are treated as UTC.
+        """
+        intervals = split_time_range(datetime(2024, 1, 1), datetime(2024, 1, 2), 1)
+        assert intervals == [(_start, _start + timedelta(days=1))]
+
+    def test_split_time_range_value_error(self):
+        """
+        split_time_range() rejects empty ranges and shard counts
+        """
+        with pytest.raises(ValueError, match='start must be earlier than end'):
+            split_time_range(_start, _start, 2)
+        with pytest.raises(ValueError, match='shards must be at least 1'):
+            split_time_range(_start, _start + timedelta(days=1), 0)
+
+
+class TestListApplicationsSharded:
+    """
+    Test Class for list_applications_sharded
+    """
+
+    @responses.activate
+    def test_list_applications_sharded(self):
+        """
+        list_applications_sharded()
+        """
+        # Applications submitted every 30 minutes over 4 hours, listed out of order by the server.
+        applications = [
+            {'id': 'app-%02d' % i, 'submission_time': (_start + timedelta(minutes=30 * i)).isoformat()}
+            for i in reversed(range(8))
+        ]
+        responses.add_callback(responses.GET, _url, callback=_applications_callback(applications))
+
+        results = list_applications_sharded(
+            _service,
+            'e64c907a-e82f-46fd-addc-ccfafbd28b09',
+            start=_start,
+            end=_start + timedelta(hours=4),
+            shards=4,
+            max_workers=2,
+            state=['finished'],
+        )
+        assert [a['id'] for a in results] == ['app-%02d' % i for i in range(8)]
+        intervals = set()
+        for call in responses.calls:
+            query = urllib.parse.parse_qs(urllib.parse.urlparse(call.request.url).query)
+            assert query['state'] == ['finished']
+            intervals.add(query['submission_time_interval'][0])
+        assert len(intervals) == 4
+
+    @responses.activate
+    def test_list_applications_sharded_deduplicates(self):
+        """
+        Applications returned by more than one shard are kept once.
+        """
+        page = {'applications': [{'id': 'dup', 'submission_time': '2024-01-01T00:00:00Z'}], 'limit': 10}
+        responses.add(responses.GET, _url, json=page)
+
+        results = list_applications_sharded(
+            _service,
+            'e64c907a-e82f-46fd-addc-ccfafbd28b09',
+            start=_start,
+            end=_start + timedelta(hours=1),
+            shards=3,
+        )
+        assert results == page['applications']
+        assert len(responses.calls) == 3
+
+    def test_list_applications_sharded_value_error(self):
+        """
+        list_applications_sharded() requires an instance id
+        """
+        with pytest.raises(ValueError, match='instance_id must be provided'):
+            list_applications_sharded(_service, None, start=_start, end=_start + timedelta(days=1))
@@ -0,0 +1,320 @@
+# -*- coding: utf-8 -*-
+# (C) Copyright IBM Corp. 2024.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Unit Tests for request metrics
+"""
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import threading
+
+from ibm_cloud_sdk_core import ApiException
+from ibm_cloud_sdk_core.authenticators.no_auth_authenticator import NoAuthAuthenticator
+import pytest
+import requests
+import responses
+
+from iaesdk.ibm_analytics_engine_api_v2 import IbmAnalyticsEngineApiV2
+from iaesdk.ibm_analytics_engine_api_v3 import IbmAnalyticsEngineApiV3
+from iaesdk.metrics import (
+    PHASES,
+    InMemoryMetrics,
+    LatencyHistogram,
+    MetricsRecorder,
+    OpenTelemetryMetrics,
+    PrometheusMetrics,
+    RequestSample,
+)
+
+_base_url = 'https://api.us-south.ae.cloud.ibm.com'
+_instance_id = 'e64c907a-e82f-46fd-addc-ccfafbd28b09'
+_instance_url = _base_url + '/v3/analytics_engines/' + _instance_id
+
+
+class _Samples(MetricsRecorder):
+    """
+    Keeps the samples recorded.
+    """
+
+    def __init__(self):
+        self.samples = []
+
+    def record(self, sample):
+        self.samples.append(sample)
+
+
+class _Instrument:
+    """
+    An OpenTelemetry counter or histogram that keeps its measurements.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.measurements = []
+
+    def add(self, amount, attributes=None):
+        self.measurements.append((amount, attributes))
+
+    record = add
+
+
+class _Meter:
+    """
+    An OpenTelemetry meter that keeps its instruments by name.
+    """
+
+    def __init__(self):
+        self.instruments = {}
+
+    def _create(self, name, unit='', description=''):  # pylint: disable=unused-argument
+        instrument = self.instruments[name] = _Instrument(name)
+        return instrument
+
+    create_counter = create_histogram = _create
+
+
+class _FlakyHandler(BaseHTTPRequestHandler):
+    """
+    Answers every other GET with 503.
+    """
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        self.server.requests += 1
+        status = 503 if self.server.requests % 2 else 200
+        body = json.dumps({'state': 'Active'}).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        pass
+
+
+def _new_service():
+    service = IbmAnalyticsEngineApiV3(authenticator=NoAuthAuthenticator())
+    service.set_service_url(_base_url)
+    return service
+
+
+class TestRequestMetrics:
+    """
+    Test Class for request metrics
+    """
+
+    @responses.activate
+    def test_in_memory(self):
+        """
+        Requests are aggregated by operation.
+        """
+        responses.add(responses.GET, _instance_url, body=json.dumps({'id': _instance_id}), status=200)
+        responses.add(
+            responses.GET,
+            _instance_url + '/state',
+            body=json.dumps({'errors': [{'message': 'not found'}]}),
+            content_type='application/json',
+            status=404,
+        )
+        responses.add(responses.POST, _instance_url + '/spark_applications', body='{"id": "app"}', status=202)
+
+        service = _new_service()
+        metrics = InMemoryMetrics()
+        service.set_metrics_recorder(metrics)
+        for _ in range(2):
+            service.get_instance(_instance_id)
+        with pytest.raises(ApiException):
+            service.get_instance_state(_instance_id)
+        service.create_application(_instance_id, application_details={'application': 'app.py'})
+        with pytest.raises(requests.exceptions.ConnectionError):
+            service.get_spark_history_server(_instance_id)
+
+        snapshot = metrics.snapshot()
+        assert set(snapshot) == {
+            'get_instance',
+            'get_instance_state',
+            'create_application',
+            'get_spark_history_server',
+        }
+        get_instance = snapshot['get_instance']
+        assert get_instance['requests'] == 2
+        assert get_instance['errors'] == 0
+        assert get_instance['status_codes'] == {200: 2}
+        assert get_instance['bytes_sent'] == 0
+        assert get_instance['bytes_received'] == 2 * len(json.dumps({'id': _instance_id}))
+        assert get_instance['retries'] == 0
+        for phase in PHASES:
+            assert get_instance['latency'][phase]['count'] == 2
+        assert get_instance['latency']['total']['buckets'][-1] == (float('inf'), 2)
+
+        assert snapshot['get_instance_state']['errors'] == 1
+        assert snapshot['get_instance_state']['status_codes'] == {404: 1}
+        assert snapshot['create_application']['bytes_sent'] == len(
+            json.dumps({'application_details': {'application': 'app.py'}})
+        )
+        assert snapshot['create_application']['status_codes'] == {202: 1}
+        assert snapshot['get_spark_history_server']['errors'] == 1
+        assert snapshot['get_spark_history_server']['status_codes'] == {}
+
+        service.set_metrics_recorder(None)
+        service.get_instance(_instance_id)
+        assert metrics.snapshot()['get_instance']['requests'] == 2
+        metrics.reset()
+        assert not metrics.snapshot()
+
+    @responses.activate
+    def test_samples(self):
+        """
+        Samples carry the operation and the timing of each phase.
+        """
+        responses.add(
+            responses.GET, _base_url + '/v2/analytics_engines/guid/state', body='{"state": "Active"}', status=200
+        )
+        service = IbmAnalyticsEngineApiV2(authenticator=NoAuthAuthenticator())
+        service.set_service_url(_base_url)
+        recorder = _Samples()
+        service.set_metrics_recorder(recorder)
+        responses.add(responses.GET, _base_url + '/v2/other', body='{}', status=200)
+        service.get_analytics_engine_state_by_id('guid')
+        # Requests sent directly are matched to an operation by their URL
+        service.send(service.prepare_request('GET', '/v2/analytics_engines/guid/state'))
+        service.send(service.prepare_request('GET', '/v2/other'))
+        service.send(service.prepare_request('GET', '/v2/other'), operation_id='other')
+
+        first, second, third, fourth = recorder.samples
+        assert first.operation_id == 'get_analytics_engine_state_by_id'
+        assert second.operation_id == 'get_analytics_engine_state_by_id'
+        assert third.operation_id is None
+        assert fourth.operation_id == 'other'
+        assert first.method == 'GET'
+        assert first.status_code == 200
+        assert first.error is None
+        assert first.serialization > 0
+        assert first.network > 0
+        assert first.deserialization > 0
+        assert first.total == first.serialization + first.network + first.deserialization
+
+    def test_retries(self):
+        """
+        Retries by the transport are counted.
+        """
+        server = ThreadingHTTPServer(('127.0.0.1', 0), _FlakyHandler)
+        server.daemon_threads = True
+        server.requests = 0
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            service = _new_service()
+            service.set_service_url('http://127.0.0.1:{0}'.format(server.server_address[1]))
+            service.enable_retries(max_retries=2, retry_interval=0.01)
+            recorder = _Samples()
+            service.set_metrics_recorder(recorder)
+            service.get_instance_state(_instance_id)
+        finally:
+            server.shutdown()
+            server.server_close()
+        assert server.requests == 2
+        assert recorder.samples[0].status_code == 200
+        assert recorder.samples[0].retries == 1
+
+    @responses.activate
+    def test_recorder_error(self):
+        """
+        Errors of the recorder do not fail requests.
+        """
+        responses.add(responses.GET, _instance_url, body='{}', status=200)
+
+        class _Failing(MetricsRecorder):
+            def record(self, sample):
+                raise RuntimeError('recorder failed')
+
+        service = _new_service()
+        service.set_metrics_recorder(_Failing())
+        assert service.get_instance(_instance_id).get_status_code() == 200
+
+    def test_recorder_abstract(self):
+        """
+        Recorders must implement record().
+        """
+
+        class _Incomplete(MetricsRecorder):
+            pass
+
+        with pytest.raises(TypeError):
+            _Incomplete()  # pylint: disable=abstract-class-instantiated
+
+    def test_histogram(self):
+        """
+        LatencyHistogram estimates quantiles within buckets.
+        """
+        histogram = LatencyHistogram((0.1, 0.2, 0.4))
+        assert histogram.quantile(0.5) is None
+        for value in (0.05, 0.15, 0.15, 0.3, 1.0):
+            histogram.observe(value)
+        assert histogram.counts == [1, 2, 1, 1]
+        assert histogram.quantile(0.2) == pytest.approx(0.1)
+        assert histogram.quantile(0.5) == pytest.approx(0.175)
+        assert histogram.quantile(0.99) == 0.4
+        assert histogram.to_dict()['buckets'] == [(0.1, 1), (0.2, 3), (0.4, 4), (float('inf'), 5)]
+
+    def test_opentelemetry(self):
+        """
+        OpenTelemetryMetrics records each sample on the meter's instruments.
+        """
+        meter = _Meter()
+        recorder = OpenTelemetryMetrics(meter)
+        sample = RequestSample('get_instance', 'GET', serialization=0.001)
+        sample.status_code = 200
+        sample.bytes_received = 42
+        sample.network = 0.01
+        recorder.record(sample)
+
+        attributes = {'operation': 'get_instance', 'http.request.method': 'GET', 'http.response.status_code': 200}
+        assert meter.instruments['iaesdk.requests'].measurements == [(1, attributes)]
+        assert meter.instruments['iaesdk.request.bytes_received'].measurements == [(42, attributes)]
+        durations = meter.instruments['iaesdk.request.duration'].measurements
+        assert [attrs['phase'] for _, attrs in durations] == list(PHASES)
+        assert durations[-1][0] == pytest.approx(0.011)
+
+    def test_prometheus(self):
+        """
+        PrometheusMetrics exports samples to a registry.
+        """
+        prometheus_client = pytest.importorskip('prometheus_client')
+        registry = prometheus_client.CollectorRegistry()
+        recorder = PrometheusMetrics(registry=registry)
+        sample = RequestSample('get_instance', 'GET')
+        sample.status_code = 200
+        sample.retries = 1
+        recorder.record(sample)
+        assert registry.get_sample_value('iaesdk_requests_total', {'operation': 'get_instance', 'status': '200'}) == 1
+        assert registry.get_sample_value('iaesdk_request_retries_total', {'operation': 'get_instance'}) == 1
+        assert (
+            registry.get_sample_value(
+                'iaesdk_request_duration_seconds_count', {'operation': 'get_instance', 'phase': 'total'}
+            )
+            == 1
+        )
+
+    def test_value_error(self):
+        """
+        Recorders validate their arguments
+        """
+        with pytest.raises(ValueError, match='buckets must be provided in increasing order'):
+            InMemoryMetrics(buckets=(1.0, 0.5))
+        with pytest.raises(ValueError, match='meter must be provided'):
+            OpenTelemetryMetrics(None)
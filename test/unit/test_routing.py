@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+# (C) Copyright IBM Corp. 2024.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Unit Tests for LatencyRouter
+"""
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import math
+import threading
+import time
+
+from ibm_cloud_sdk_core import ApiException
+from ibm_cloud_sdk_core.authenticators.no_auth_authenticator import NoAuthAuthenticator
+import pytest
+
+from iaesdk.ibm_analytics_engine_api_v3 import IbmAnalyticsEngineApiV3
+from iaesdk.metrics import InMemoryMetrics
+from iaesdk.routing import LatencyRouter
+
+_served = 'e64c907a-e82f-46fd-addc-ccfafbd28b09'
+_unserved = 'dc0e9889-eab2-4b09-9d4d-7b0da2ebc3c8'
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """
+    Answers after the server's `delay`: with the state of the instances in the
+    server's `instances`, and 404 otherwise. Records the paths requested.
+    """
+
+    protocol_version = 'HTTP/1.1'
+
+    def _respond(self, status, body=b''):
+        time.sleep(self.server.delay)
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
+    def do_HEAD(self):  # pylint: disable=invalid-name
+        self._respond(404)
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        self.server.paths.append(self.path)
+        instance_id = self.path.split('/')[3]
+        if instance_id in self.server.instances:
+            self._respond(200, json.dumps({'id': instance_id, 'state': 'active'}).encode('utf-8'))
+        else:
+            self._respond(404, json.dumps({'errors': [{'message': 'not found'}]}).encode('utf-8'))
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        self.server.paths.append(self.path)
+        self._respond(202, b'{}')
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        pass
+
+
+def _start_server(delay, instances):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+    server.daemon_threads = True
+    server.delay = delay
+    server.instances = instances
+    server.paths = []
+    server.url = 'http://127.0.0.1:{0}'.format(server.server_address[1])
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+@pytest.fixture
+def servers():
+    """
+    A slow and a fast endpoint. Both serve _served; only the slow one serves _unserved.
+    """
+    slow = _start_server(0.05, {_served, _unserved})
+    fast = _start_server(0, {_served})
+    yield slow, fast
+    for server in (slow, fast):
+        server.shutdown()
+        server.server_close()
+
+
+class TestLatencyRouter:
+    """
+    Test Class for LatencyRouter
+    """
+
+    def test_routing(self, servers):
+        """
+        GET requests go to the fastest endpoint serving the instance.
+        """
+        slow, fast = servers
+        service = IbmAnalyticsEngineApiV3(authenticator=NoAuthAuthenticator())
+        service.set_service_url(slow.url)
+        router = service.enable_latency_routing({'slow': slow.url, 'fast': fast.url})
+        latencies = router.probe()
+        assert latencies[fast.url] < latencies[slow.url]
+        assert router.ranked(slow.url) == [fast.url, slow.url]
+
+        for _ in range(2):
+            assert service.get_instance(_served).get_result()['id'] == _served
+        # One check of the instance state, then the requests themselves
+        assert (
+            fast.paths
+            == ['/v3/analytics_engines/{0}/state'.format(_served)] + ['/v3/analytics_engines/{0}'.format(_served)] * 2
+        )
+        assert router.serves(fast.url, _served) is True
+
+        # Instances the fast endpoint does not serve stay on the service URL
+        for _ in range(2):
+            assert service.get_instance(_unserved).get_result()['id'] == _unserved
+        assert router.serves(fast.url, _unserved) is False
+        assert slow.paths == ['/v3/analytics_engines/{0}'.format(_unserved)] * 2
+
+        # Requests that change resources are not routed
+        service.start_spark_history_server(_served)
+        assert slow.paths[-1] == '/v3/analytics_engines/{0}/spark_history_server'.format(_served)
+
+        service.disable_latency_routing()
+        service.get_instance(_served)
+        assert slow.paths[-1] == '/v3/analytics_engines/{0}'.format(_served)
+
+    def test_checks_not_measured(self, servers):
+        """
+        The checks of which endpoints serve an instance are not recorded as the
+        caller's request.
+        """
+        slow, fast = servers
+        service = IbmAnalyticsEngineApiV3(authenticator=NoAuthAuthenticator())
+        service.set_service_url(slow.url)
+        router = service.enable_latency_routing({'slow': slow.url, 'fast': fast.url})
+        router.probe()
+        recorder = InMemoryMetrics()
+        service.set_metrics_recorder(recorder)
+
+        assert service.get_instance(_served).get_status_code() == 200
+        assert fast.paths == [
+            '/v3/analytics_engines/{0}/state'.format(_served),
+            '/v3/analytics_engines/{0}'.format(_served),
+        ]
+        snapshot = recorder.snapshot()
+        assert list(snapshot) == ['get_instance']
+        assert snapshot['get_instance']['requests'] == 1
+
+    def test_not_measured(self, servers):
+        """
+        Requests use the service URL until latencies are measured, in the background.
+        """
+        slow, fast = servers
+        router = LatencyRouter({'fast': fast.url, 'down': 'http://127.0.0.1:9'}, probe_timeout=0.5)
+        assert router.ranked(slow.url) == [slow.url]
+        deadline = time.time() + 5
+        while not router.latencies:
+            assert time.time() < deadline
+            time.sleep(0.01)
+        assert router.latencies['http://127.0.0.1:9'] == math.inf
+        # Endpoints faster than the service URL's unknown latency are preferred
+        assert router.ranked(slow.url) == [fast.url, slow.url]
+
+    def test_check_answers(self):
+        """
+        Only the answers of checks that reach the instance, served or 404, are
+        kept, for check_ttl seconds.
+        """
+        statuses = iter([401, 403, 404])
+        checks = []
+
+        def send(request):
+            checks.append(request['url'])
+            status = next(statuses, None)
+            if status is not None:
+                raise ApiException(status)
+
+        # pylint: disable=protected-access
+        router = LatencyRouter({'fast': 'https://fast.example'})
+        request = {'method': 'GET', 'url': 'https://slow.example/v3/analytics_engines/' + _served}
+        # Rejected credentials are not a verdict on the instance
+        for _ in range(2):
+            assert not router._serves_instance('https://fast.example', _served, request, send)
+            assert router.serves('https://fast.example', _served) is None
+        assert not router._serves_instance('https://fast.example', _served, request, send)
+        assert router.serves('https://fast.example', _served) is False
+        assert not router._serves_instance('https://fast.example', _served, request, send)
+        assert checks == ['https://fast.example/v3/analytics_engines/{0}/state'.format(_served)] * 3
+
+        # Answers expire
+        router = LatencyRouter({'fast': 'https://fast.example'}, check_ttl=0.01)
+        assert router._serves_instance('https://fast.example', _served, request, send)
+        assert router.serves('https://fast.example', _served) is True
+        time.sleep(0.02)
+        assert router.serves('https://fast.example', _served) is None
+        assert router._serves_instance('https://fast.example', _served, request, send)
+        assert len(checks) == 5
+
+    def test_value_error(self):
+        """
+        LatencyRouter() requires endpoints
+        """
+        with pytest.raises(ValueError, match='endpoints must be provided'):
+            LatencyRouter({})
+        # The endpoints trusted with the credentials are always given explicitly
+        service = IbmAnalyticsEngineApiV3(authenticator=NoAuthAuthenticator())
+        with pytest.raises(TypeError):
+            service.enable_latency_routing()  # pylint: disable=no-value-for-parameter
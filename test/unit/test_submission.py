@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+# (C) Copyright IBM Corp. 2024.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Unit Tests for iaesdk.submission
+"""
+
+import json
+import threading
+import time
+
+from ibm_cloud_sdk_core import ApiException
+from ibm_cloud_sdk_core.authenticators.no_auth_authenticator import NoAuthAuthenticator
+import pytest
+import responses
+
+from iaesdk.ibm_analytics_engine_api_v3 import ApplicationRequestApplicationDetails, IbmAnalyticsEngineApiV3
+from iaesdk.submission import RateLimiter, submit_many
+
+_service = IbmAnalyticsEngineApiV3(authenticator=NoAuthAuthenticator())
+_base_url = 'https://api.us-south.ae.cloud.ibm.com'
+_service.set_service_url(_base_url)
+
+_url = _base_url + '/v3/analytics_engines/e64c907a-e82f-46fd-addc-ccfafbd28b09/spark_applications'
+
+
+def _create_callback(delays=None, failures=()):
+    """
+    Return a responses callback that answers each submission with an id derived
+    from the application name, after an optional per-name delay.
+    """
+    lock = threading.Lock()
+    calls = []
+
+    def callback(request):
+        name = json.loads(request.body)['application_details']['name']
+        with lock:
+            calls.append(name)
+        time.sleep((delays or {}).get(name, 0))
+        if name in failures:
+            return (500, {'Content-Type': 'application/json'}, json.dumps({'message': 'quota exceeded'}))
+        return (202, {'Content-Type': 'application/json'}, json.dumps({'id': 'id-' + name, 'state': 'accepted'}))
+
+    callback.calls = calls
+    return callback
+
+
+def _applications(count):
+    return [ApplicationRequestApplicationDetails(application='/opt/app.py', name=str(i)) for i in range(count)]
+
+
+class TestSubmitMany:
+    """
+    Test Class for submit_many
+    """
+
+    @responses.activate
+    def test_submit_many_ordered(self):
+        """
+        Results are returned in input order, errors included.
+        """
+        callback = _create_callback(delays={'0': 0.05}, failures={'3'})
+        responses.add_callback(responses.POST, _url, callback=callback)
+
+        results = list(submit_many(_service, 'e64c907a-e82f-46fd-addc-ccfafbd28b09', _applications(6), max_workers=3))
+        assert [r.index for r in results] == [0, 1, 2, 3, 4, 5]
+        assert [r.ok for r in results] == [True, True, True, False, True, True]
+        assert results[0].response.id == 'id-0'
+        assert results[0].application_details.name == '0'
+        assert isinstance(results[3].error, ApiException)
+        assert results[3].response is None
+        assert len(callback.calls) == 6
+
+    @responses.activate
+    def test_submit_many_unordered(self):
+        """
+        With ordered=False, results are yielded as submissions complete.
+        """
+        responses.add_callback(responses.POST, _url, callback=_create_callback(delays={'0': 0.1}))
+
+        results = list(
+            submit_many(
+                _service, 'e64c907a-e82f-46fd-addc-ccfafbd28b09', _applications(4), max_workers=4, ordered=False
+            )
+        )
+        assert sorted(r.index for r in results) == [0, 1, 2, 3]
+        assert results[-1].index == 0
+
+    @responses.activate
+    def test_submit_many_early_exit(self):
+        """
+        Closing the iterator stops further submissions.
+        """
+        callback = _create_callback()
+        responses.add_callback(responses.POST, _url, callback=callback)
+
+        results = submit_many(_service, 'e64c907a-e82f-46fd-addc-ccfafbd28b09', _applications(100), max_workers=1)
+        assert next(results).index == 0
+        results.close()
+        assert len(callback.calls) < 100
+
+    @responses.activate
+    def test_submit_many_rate_limit(self):
+        """
+        rate_limit spaces out the start of submissions.
+        """
+        responses.add_callback(responses.POST, _url, callback=_create_callback())
+
+        start = time.monotonic()
+        results = list(
+            submit_many(
+                _service, 'e64c907a-e82f-46fd-addc-ccfafbd28b09', _applications(5), max_workers=5, rate_limit=50
+            )
+        )
+        assert len(results) == 5
+        assert time.monotonic() - start >= 0.07
+
+    def test_submit_many_value_error(self):
+        """
+        submit_many() requires an instance id
+        """
+        with pytest.raises(ValueError, match='instance_id must be provided'):
+            submit_many(_service, None, _applications(1))
+
+
+class TestRateLimiter:
+    """
+    Test Class for RateLimiter
+    """
+
+    def test_burst(self):
+        """
+        Up to `burst` tokens are available immediately.
+        """
+        limiter = RateLimiter(1, burst=3)
+        start = time.monotonic()
+        for _ in range(3):
+            limiter.acquire()
+        assert time.monotonic() - start < 0.5
+
+    def test_value_error(self):
+        """
+        RateLimiter() rejects non-positive rates
+        """
+        with pytest.raises(ValueError, match='rate must be positive'):
+            RateLimiter(0)
@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+# (C) Copyright IBM Corp. 2024.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Unit Tests for access token management
+"""
+
+from pathlib import Path
+import json
+import multiprocessing
+import os
+import time
+
+from ibm_cloud_sdk_core.authenticators import BearerTokenAuthenticator, IAMAuthenticator
+import jwt
+import pytest
+import responses
+
+from iaesdk.ibm_analytics_engine_api_v2 import IbmAnalyticsEngineApiV2
+from iaesdk.ibm_analytics_engine_api_v3 import IbmAnalyticsEngineApiV3
+from iaesdk.tokens import FileTokenCache, TokenRefresher, get_token_manager
+
+_base_url = 'https://api.us-south.ae.cloud.ibm.com'
+_state_url = _base_url + '/v3/analytics_engines/e64c907a-e82f-46fd-addc-ccfafbd28b09/state'
+_token_url = 'https://iam.cloud.ibm.com/identity/token'
+
+
+def _token_response(issued_ago=0, lifetime=3600):
+    """
+    Return the IAM response for a new token issued `issued_ago` seconds ago.
+    """
+    now = int(time.time())
+    access_token = jwt.encode(
+        {'iat': now - issued_ago, 'exp': now - issued_ago + lifetime, 'n': _token_response.count}, 'secret' * 8
+    )
+    _token_response.count += 1
+    body = {'access_token': access_token, 'refresh_token': 'refresh', 'token_type': 'Bearer', 'expires_in': lifetime}
+    return (200, {'Content-Type': 'application/json'}, json.dumps(body))
+
+
+_token_response.count = 0
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline, 'timed out'
+        time.sleep(0.01)
+
+
+class TestTokenRefresher:
+    """
+    Test Class for TokenRefresher
+    """
+
+    @responses.activate
+    def test_prerefresh(self):
+        """
+        Tokens are fetched and refreshed ahead of requests.
+        """
+        # The first token is already past its refresh time.
+        tokens = iter([_token_response(issued_ago=3500), _token_response()])
+        responses.add_callback(responses.POST, _token_url, callback=lambda request: next(tokens))
+        responses.add(responses.GET, _state_url, json={'id': 'id', 'state': 'active'})
+
+        authenticator = IAMAuthenticator('apikey')
+        service = IbmAnalyticsEngineApiV3(authenticator=authenticator)
+        service.set_service_url(_base_url)
+        other = IbmAnalyticsEngineApiV2(authenticator=authenticator)
+        service.enable_token_prerefresh()
+        other.enable_token_prerefresh()
+
+        refresher = TokenRefresher.for_token_manager(authenticator.token_manager)
+        try:
+            _wait_for(lambda: len(responses.calls) == 2)
+            _wait_for(lambda: refresher.refreshes == 1)
+            assert refresher.running
+            access_token = authenticator.token_manager.access_token
+            service.get_instance_state('e64c907a-e82f-46fd-addc-ccfafbd28b09')
+            # The request used the refreshed token without fetching one itself.
+            assert len(responses.calls) == 3
+            assert responses.calls[-1].request.headers['Authorization'] == 'Bearer ' + access_token
+        finally:
+            service.disable_token_prerefresh()
+        assert not refresher.running
+
+    @responses.activate
+    def test_retry(self):
+        """
+        Failed background refreshes are retried.
+        """
+        responses.add(responses.POST, _token_url, status=500, json={'errorMessage': 'down'})
+        responses.add_callback(responses.POST, _token_url, callback=lambda request: _token_response())
+
+        authenticator = IAMAuthenticator('apikey')
+        refresher = TokenRefresher.for_token_manager(authenticator.token_manager)
+        refresher.start()
+        try:
+            _wait_for(lambda: refresher.refreshes == 1)
+            assert authenticator.token_manager.access_token is not None
+        finally:
+            refresher.stop()
+
+    def test_no_token_manager(self):
+        """
+        Authenticators without a token manager are not affected.
+        """
+        authenticator = BearerTokenAuthenticator('token')
+        assert get_token_manager(authenticator) is None
+        service = IbmAnalyticsEngineApiV3(authenticator=authenticator)
+        service.enable_token_prerefresh()
+        service.disable_token_prerefresh()
+
+
+def _fetch_token_in_process(path, fetches_path):
+    """
+    Request a token through the cache at `path` as a separate process would,
+    recording each fetch in `fetches_path`.
+    """
+
+    def request_token():
+        with open(fetches_path, 'a', encoding='utf-8') as fetches:
+            fetches.write('fetch\n')
+        time.sleep(0.1)
+        return json.loads(_token_response()[2])
+
+    return FileTokenCache(path).request_token('key', 'access_token', request_token)['access_token']
+
+
+class TestFileTokenCache:
+    """
+    Test Class for FileTokenCache
+    """
+
+    @responses.activate
+    def test_shared_token(self, tmp_path):
+        """
+        Clients with the same credentials fetch one token between them.
+        """
+        responses.add_callback(responses.POST, _token_url, callback=lambda request: _token_response())
+        responses.add(responses.GET, _state_url, json={'id': 'id', 'state': 'active'})
+        path = str(tmp_path / 'cache' / 'tokens.json')
+
+        services = []
+        for _ in range(3):
+            service = IbmAnalyticsEngineApiV3(authenticator=IAMAuthenticator('apikey'))
+            service.set_service_url(_base_url)
+            service.enable_shared_token_cache(path)
+            service.get_instance_state('e64c907a-e82f-46fd-addc-ccfafbd28b09')
+            services.append(service)
+        assert len([c for c in responses.calls if c.request.url == _token_url]) == 1
+        assert os.stat(path).st_mode & 0o777 == 0o600
+        assert 'apikey' not in Path(path).read_text()
+
+        # Other credentials have their own token
+        service = IbmAnalyticsEngineApiV3(authenticator=IAMAuthenticator('other'))
+        service.set_service_url(_base_url)
+        service.enable_shared_token_cache(path)
+        service.get_instance_state('e64c907a-e82f-46fd-addc-ccfafbd28b09')
+        assert len([c for c in responses.calls if c.request.url == _token_url]) == 2
+        assert len(json.loads(Path(path).read_text())) == 2
+
+        services[0].disable_shared_token_cache()
+        assert not hasattr(services[0].authenticator.token_manager.request_token, '__wrapped__')
+
+    def test_refresh(self, tmp_path):
+        """
+        Tokens close to their refresh time are fetched again.
+        """
+        cache = FileTokenCache(str(tmp_path / 'tokens.json'), margin=300)
+        responses_ = iter([_token_response(issued_ago=2600), _token_response(), _token_response()])
+
+        def request_token():
+            return json.loads(next(responses_)[2])
+
+        first = cache.request_token('key', 'access_token', request_token)
+        # The first token is 200 seconds before its refresh time.
+        second = cache.request_token('key', 'access_token', request_token)
+        assert second != first
+        assert cache.request_token('key', 'access_token', request_token) == second
+        assert (cache.hits, cache.misses) == (1, 2)
+
+    def test_processes(self, tmp_path):
+        """
+        Processes sharing the cache file fetch one token between them.
+        """
+        if 'fork' not in multiprocessing.get_all_start_methods():
+            pytest.skip('requires the fork start method')
+        path = str(tmp_path / 'tokens.json')
+        fetches_path = str(tmp_path / 'fetches')
+        with multiprocessing.get_context('fork').Pool(4) as pool:
+            tokens = pool.starmap(_fetch_token_in_process, [(path, fetches_path)] * 8)
+        assert len(set(tokens)) == 1
+        assert Path(fetches_path).read_text() == 'fetch\n'
+
+    def test_unreadable_cache(self, tmp_path):
+        """
+        A corrupt cache file is replaced.
+        """
+        path = tmp_path / 'tokens.json'
+        path.write_text('{not json')
+        cache = FileTokenCache(str(path))
+        response = cache.request_token('key', 'access_token', lambda: json.loads(_token_response()[2]))
+        assert json.loads(path.read_text()) == {'key': response}
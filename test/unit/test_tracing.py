@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+# (C) Copyright IBM Corp. 2024.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Unit Tests for OpenTelemetry tracing
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import json
+import threading
+import time
+
+from ibm_cloud_sdk_core import ApiException
+from ibm_cloud_sdk_core.authenticators.no_auth_authenticator import NoAuthAuthenticator
+import pytest
+import responses
+
+from iaesdk import tracing
+from iaesdk.ibm_analytics_engine_api_v2 import IbmAnalyticsEngineApiV2
+from iaesdk.ibm_analytics_engine_api_v3 import IbmAnalyticsEngineApiV3
+from iaesdk.tracing import request_attributes
+
+_base_url = 'https://api.us-south.ae.cloud.ibm.com'
+_instance_id = 'e64c907a-e82f-46fd-addc-ccfafbd28b09'
+_application_id = 'db933645-0b68-4dcb-80d8-7b71a6c8e542'
+_application_url = '{0}/v3/analytics_engines/{1}/spark_applications/{2}'.format(
+    _base_url, _instance_id, _application_id
+)
+
+
+@pytest.fixture
+def exporter():
+    """
+    An in-memory span exporter, and a tracer provider exporting to it.
+    """
+    sdk_trace = pytest.importorskip('opentelemetry.sdk.trace')
+    in_memory = pytest.importorskip('opentelemetry.sdk.trace.export.in_memory_span_exporter')
+    export = pytest.importorskip('opentelemetry.sdk.trace.export')
+    span_exporter = in_memory.InMemorySpanExporter()
+    provider = sdk_trace.TracerProvider()
+    provider.add_span_processor(export.SimpleSpanProcessor(span_exporter))
+    span_exporter.provider = provider
+    return span_exporter
+
+
+class TestTracing:
+    """
+    Test Class for OpenTelemetry tracing
+    """
+
+    def test_request_attributes(self):
+        """
+        Span attributes identify the operation, instance and application.
+        """
+        attributes = request_attributes({'method': 'GET', 'url': _application_url}, 'get_application')
+        assert attributes == {
+            'http.request.method': 'GET',
+            'url.full': _application_url,
+            'server.address': 'api.us-south.ae.cloud.ibm.com',
+            'iaesdk.operation': 'get_application',
+            'iaesdk.instance_id': _instance_id,
+            'iaesdk.application_id': _application_id,
+        }
+        attributes = request_attributes({'method': 'GET', 'url': _base_url + '/v2/analytics_engines/guid%2F1'}, None)
+        assert attributes['iaesdk.instance_id'] == 'guid/1'
+        assert 'iaesdk.operation' not in attributes
+        assert 'iaesdk.application_id' not in attributes
+
+    @pytest.mark.skipif(tracing.trace is not None, reason='opentelemetry-api is installed')
+    def test_not_installed(self):
+        """
+        Tracing requires opentelemetry-api.
+        """
+        service = IbmAnalyticsEngineApiV3(authenticator=NoAuthAuthenticator())
+        with pytest.raises(ImportError, match='opentelemetry-api is required'):
+            service.enable_tracing()
+
+    @responses.activate
+    def test_spans(self, exporter):
+        """
+        Each call has a span, and propagates its context.
+        """
+        responses.add(responses.GET, _application_url, body=json.dumps({'id': _application_id}), status=200)
+        responses.add(
+            responses.DELETE,
+            _application_url,
+            body=json.dumps({'errors': [{'message': 'not found'}]}),
+            content_type='application/json',
+            status=404,
+        )
+        service = IbmAnalyticsEngineApiV3(authenticator=NoAuthAuthenticator())
+        service.set_service_url(_base_url)
+        service.enable_tracing(exporter.provider)
+        service.get_application(_instance_id, _application_id)
+        with pytest.raises(ApiException):
+            service.delete_application(_instance_id, _application_id)
+
+        get_span, delete_span = exporter.get_finished_spans()
+        assert get_span.name == 'get_application'
+        assert get_span.kind.name == 'CLIENT'
+        assert get_span.attributes['iaesdk.instance_id'] == _instance_id
+        assert get_span.attributes['iaesdk.application_id'] == _application_id
+        assert get_span.attributes['http.response.status_code'] == 200
+        assert get_span.status.is_ok
+        traceparent = responses.calls[0].request.headers['traceparent']
+        assert traceparent.split('-')[1] == format(get_span.context.trace_id, '032x')
+        assert traceparent.split('-')[2] == format(get_span.context.span_id, '016x')
+
+        assert delete_span.name == 'delete_application'
+        assert delete_span.attributes['http.response.status_code'] == 404
+        assert not delete_span.status.is_ok
+
+        service.disable_tracing()
+        service.get_application(_instance_id, _application_id)
+        assert len(exporter.get_finished_spans()) == 2
+        assert 'traceparent' not in responses.calls[2].request.headers
+
+    @responses.activate
+    def test_coalesced(self, exporter):
+        """
+        Concurrent identical calls are still coalesced, each in its own span.
+        """
+        barrier = threading.Barrier(4)
+
+        def callback(request):  # pylint: disable=unused-argument
+            time.sleep(0.1)
+            return (200, {'Content-Type': 'application/json'}, '{"state": "Active"}')
+
+        def call(_):
+            barrier.wait()
+            return service.get_analytics_engine_state_by_id('guid').get_result()
+
+        responses.add_callback(responses.GET, _base_url + '/v2/analytics_engines/guid/state', callback=callback)
+        service = IbmAnalyticsEngineApiV2(authenticator=NoAuthAuthenticator())
+        service.set_service_url(_base_url)
+        service.enable_request_coalescing()
+        service.enable_tracing(exporter.provider)
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            assert list(executor.map(call, range(4))) == [{'state': 'Active'}] * 4
+        assert len(responses.calls) == 1
+        spans = exporter.get_finished_spans()
+        assert [span.name for span in spans] == ['get_analytics_engine_state_by_id'] * 4
+        assert {span.attributes['iaesdk.instance_id'] for span in spans} == {'guid'}
@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+# (C) Copyright IBM Corp. 2024.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Unit Tests for PooledTransport
+"""
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import threading
+import time
+
+from ibm_cloud_sdk_core.authenticators.no_auth_authenticator import NoAuthAuthenticator
+import pytest
+
+from iaesdk.ibm_analytics_engine_api_v2 import IbmAnalyticsEngineApiV2
+from iaesdk.ibm_analytics_engine_api_v3 import IbmAnalyticsEngineApiV3
+from iaesdk.transport import PooledTransport
+
+_instance_id = 'e64c907a-e82f-46fd-addc-ccfafbd28b09'
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """
+    Answers every GET with a small JSON body over a persistent connection, and
+    records the client address of each request.
+    """
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        self.server.clients.append(self.client_address)
+        body = json.dumps({'id': _instance_id, 'state': 'active'}).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        pass
+
+
+@pytest.fixture
+def server():
+    """
+    A local HTTP server; `server.clients` lists the client address of each request.
+    """
+    http_server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+    http_server.daemon_threads = True
+    http_server.clients = []
+    thread = threading.Thread(target=http_server.serve_forever, daemon=True)
+    thread.start()
+    yield http_server
+    http_server.shutdown()
+    http_server.server_close()
+
+
+def _new_service(server, cls=IbmAnalyticsEngineApiV3):
+    service = cls(authenticator=NoAuthAuthenticator())
+    service.set_service_url('http://127.0.0.1:{0}'.format(server.server_address[1]))
+    return service
+
+
+class TestPooledTransport:
+    """
+    Test Class for PooledTransport
+    """
+
+    def test_shared_transport(self, server):
+        """
+        Clients sharing a transport share its connections.
+        """
+        first = _new_service(server)
+        transport = first.configure_connection_pool(pool_maxsize=4)
+        second = _new_service(server)
+        second.set_transport(transport)
+
+        first.get_instance_state(_instance_id)
+        second.get_instance_state(_instance_id)
+        assert len(server.clients) == 2
+        assert len(set(server.clients)) == 1
+
+        # Without the transport, a client opens its own connection.
+        _new_service(server).get_instance_state(_instance_id)
+        assert len(set(server.clients)) == 2
+
+    def test_reconfigured(self, server):
+        """
+        Pool settings survive enabling retries and disabling SSL verification.
+        """
+        service = _new_service(server)
+        service.configure_connection_pool(pool_connections=2, pool_maxsize=32, pool_block=True)
+        service.enable_retries(max_retries=2)
+        service.set_disable_ssl_verification(True)
+
+        adapter = service.get_http_client().get_adapter('https://example.com')
+        assert adapter is service.http_adapter
+        assert adapter.max_retries.total == 2
+        assert adapter._pool_maxsize == 32
+        assert adapter._pool_block is True
+
+        service.disable_retries()
+        adapter = service.get_http_client().get_adapter('http://example.com')
+        assert adapter.max_retries.total == 0
+        assert adapter._pool_maxsize == 32
+
+        service.get_instance_state(_instance_id)
+        assert len(server.clients) == 1
+
+    def test_idle_timeout(self, server):
+        """
+        Connections idle for longer than idle_timeout are not reused.
+        """
+        service = _new_service(server, cls=IbmAnalyticsEngineApiV2)
+        service.configure_connection_pool(idle_timeout=0.2)
+        for _ in range(2):
+            service.get_analytics_engine_state_by_id('guid')
+        time.sleep(0.3)
+        service.get_analytics_engine_state_by_id('guid')
+        assert len(server.clients) == 3
+        assert server.clients[0] == server.clients[1] != server.clients[2]
+
+    def test_value_error(self):
+        """
+        PooledTransport() validates its settings
+        """
+        with pytest.raises(ValueError, match='pool_maxsize must be at least 1'):
+            PooledTransport(pool_maxsize=0)
+        with pytest.raises(ValueError, match='idle_timeout must be positive'):
+            PooledTransport(idle_timeout=0)
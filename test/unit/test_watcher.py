@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+# (C) Copyright IBM Corp. 2024.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Unit Tests for ApplicationStateWatcher
+"""
+
+import json
+import re
+import threading
+
+from ibm_cloud_sdk_core.authenticators.no_auth_authenticator import NoAuthAuthenticator
+import pytest
+import responses
+
+from iaesdk.ibm_analytics_engine_api_v3 import IbmAnalyticsEngineApiV3
+from iaesdk.watcher import ApplicationStateWatcher
+
+_service = IbmAnalyticsEngineApiV3(authenticator=NoAuthAuthenticator())
+_base_url = 'https://api.us-south.ae.cloud.ibm.com'
+_service.set_service_url(_base_url)
+
+_state_url = re.compile(_base_url + r'/v3/analytics_engines/([^/]+)/spark_applications/([^/]+)/state')
+_fast = {'poll_intervals': {'accepted': 0.001, 'running': 0.001}, 'default_poll_interval': 0.001}
+
+
+def _state_callback(sequences):
+    """
+    Return a responses callback that answers each application's state polls
+    with the next state of `sequences[application_id]`, repeating the last one.
+    """
+    lock = threading.Lock()
+    polls = {}
+
+    def callback(request):
+        application_id = _state_url.match(request.url).group(2)
+        with lock:
+            index = polls.get(application_id, 0)
+            polls[application_id] = index + 1
+        sequence = sequences[application_id]
+        if sequence is None:
+            return (404, {'Content-Type': 'application/json'}, json.dumps({'message': 'not found'}))
+        state = sequence[min(index, len(sequence) - 1)]
+        return (200, {'Content-Type': 'application/json'}, json.dumps({'id': application_id, 'state': state}))
+
+    callback.polls = polls
+    return callback
+
+
+class TestApplicationStateWatcher:
+    """
+    Test Class for ApplicationStateWatcher
+    """
+
+    @responses.activate
+    def test_events(self):
+        """
+        events() reports each state change until all applications are terminal.
+        """
+        callback = _state_callback(
+            {
+                'app-1': ['accepted', 'accepted', 'running', 'running', 'finished'],
+                'app-2': ['running', 'failed'],
+            }
+        )
+        responses.add_callback(responses.GET, _state_url, callback=callback)
+
+        received = []
+        watcher = ApplicationStateWatcher(
+            _service, [('instance', 'app-1'), ('instance', 'app-2')], on_event=received.append, **_fast
+        )
+        with watcher:
+            events = list(watcher.events(timeout=5))
+
+        transitions = [(e.application_id, e.previous_state, e.state) for e in events]
+        assert [t for t in transitions if t[0] == 'app-1'] == [
+            ('app-1', None, 'accepted'),
+            ('app-1', 'accepted', 'running'),
+            ('app-1', 'running', 'finished'),
+        ]
+        assert [t for t in transitions if t[0] == 'app-2'] == [
+            ('app-2', None, 'running'),
+            ('app-2', 'running', 'failed'),
+        ]
+        assert [e.terminal for e in events if e.application_id == 'app-2'] == [False, True]
+        assert len(received) == len(events)
+        assert watcher.states == {}
+        # Terminal applications are not polled again.
+        assert callback.polls == {'app-1': 5, 'app-2': 2}
+
+    @responses.activate
+    def test_adaptive_interval(self):
+        """
+        The poll interval grows while the state does not change.
+        """
+        responses.add_callback(responses.GET, _state_url, callback=_state_callback({'app-1': ['running']}))
+
+        watcher = ApplicationStateWatcher(
+            _service, [('instance', 'app-1')], poll_intervals={'running': 1.0}, max_poll_interval=3.0
+        )
+        watcher._poll(watcher._watches[('instance', 'app-1')])
+        assert watcher._watches[('instance', 'app-1')].interval == 1.0
+        watcher._poll(watcher._watches[('instance', 'app-1')])
+        assert watcher._watches[('instance', 'app-1')].interval == 1.5
+        for _ in range(5):
+            watcher._poll(watcher._watches[('instance', 'app-1')])
+        assert watcher._watches[('instance', 'app-1')].interval == 3.0
+
+    @responses.activate
+    def test_missing_application(self):
+        """
+        Applications that no longer exist are reported and dropped.
+        """
+        responses.add_callback(responses.GET, _state_url, callback=_state_callback({'gone': None}))
+
+        errors = []
+        watcher = ApplicationStateWatcher(
+            _service, [('instance', 'gone')], on_error=lambda *args: errors.append(args), **_fast
+        )
+        with watcher:
+            assert list(watcher.events(timeout=5)) == []
+        assert len(errors) == 1
+        assert errors[0][:2] == ('instance', 'gone')
+        assert errors[0][2].status_code == 404
+
+    @responses.activate
+    def test_poll_errors(self):
+        """
+        Responses without a state and failing callbacks do not lose the watch.
+        """
+        sequences = iter([{'id': 'app-1'}, {'id': 'app-1', 'state': 'running'}, {'id': 'app-1', 'state': 'finished'}])
+        responses.add_callback(
+            responses.GET,
+            _state_url,
+            callback=lambda request: (200, {'Content-Type': 'application/json'}, json.dumps(next(sequences))),
+        )
+
+        def on_event(event):
+            raise RuntimeError('callback failed')
+
+        errors = []
+        watcher = ApplicationStateWatcher(
+            _service,
+            [('instance', 'app-1')],
+            on_event=on_event,
+            on_error=lambda *args: errors.append(args),
+            **_fast,
+        )
+        with watcher:
+            events = list(watcher.events(timeout=5))
+        assert [event.state for event in events] == ['running', 'finished']
+        assert len(errors) == 1
+        assert isinstance(errors[0][2], ValueError)
+
+    @responses.activate
+    def test_max_queued_events(self):
+        """
+        Events that events() does not consume are bounded, dropping the oldest.
+        """
+        responses.add_callback(
+            responses.GET,
+            _state_url,
+            callback=_state_callback({'app-1': ['accepted', 'running', 'finished'], 'app-2': ['running']}),
+        )
+
+        watcher = ApplicationStateWatcher(_service, [('instance', 'app-1'), ('instance', 'app-2')], max_queued_events=2)
+        for _ in range(3):
+            watcher._poll(watcher._watches[('instance', 'app-1')])
+        watcher._poll(watcher._watches[('instance', 'app-2')])
+        assert [(e.application_id, e.state) for e in watcher.events(timeout=0)] == [
+            ('app-1', 'finished'),
+            ('app-2', 'running'),
+        ]
+
+        # Without a queue, events only go to on_event
+        received = []
+        watcher = ApplicationStateWatcher(
+            _service, [('instance', 'app-2')], max_queued_events=0, on_event=received.append
+        )
+        watcher._poll(watcher._watches[('instance', 'app-2')])
+        assert [event.state for event in received] == ['running']
+        assert not watcher._events
+
+    def test_readd(self):
+        """
+        An application removed and added again has a single scheduled poll.
+        """
+        watcher = ApplicationStateWatcher(_service, [('instance', 'app-1')])
+        watcher.remove('instance', 'app-1')
+        watcher.add('instance', 'app-1')
+        scheduled = [watch for _, _, watch in watcher._schedule if watcher._watches.get(('instance', 'app-1')) is watch]
+        assert len(scheduled) == 1
+
+    def test_events_timeout(self):
+        """
+        events() ends when no event arrives within the timeout.
+        """
+        watcher = ApplicationStateWatcher(_service, [('instance', 'app-1')])
+        assert list(watcher.events(timeout=0.01)) == []
+        assert watcher.states == {('instance', 'app-1'): None}
+
+    def test_value_error(self):
+        """
+        add() requires both identifiers, and the event queue a non-negative size.
+        """
+        watcher = ApplicationStateWatcher(_service)
+        with pytest.raises(ValueError, match='application_id must be provided'):
+            watcher.add('instance', None)
+        with pytest.raises(ValueError, match='max_queued_events must not be negative'):
+            ApplicationStateWatcher(_service, max_queued_events=-1)